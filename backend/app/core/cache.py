@@ -1,18 +1,39 @@
 """
 レスポンスキャッシュとパフォーマンス最適化機能
 Redis代替の高度なキャッシュシステム追加
+CACHE_REDIS_URL / REDIS_URL 設定時は L1（プロセス内）+ L2（Redis 互換）の 2 層でワーカー間共有
 """
 import hashlib
 import asyncio
 import pickle
 import gzip
-from typing import Dict, Any, Optional, List, Union
+import heapq
+import json
+import math
+import os
+import sys
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Set, Tuple, Union
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# Redis（L2）は任意依存
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None  # type: ignore
+    REDIS_AVAILABLE = False
+
+_L2_RAW = b"\x00"
+_L2_ZLIB = b"\x01"
+
 @dataclass
 class CacheEntry:
     """キャッシュエントリ"""
@@ -22,6 +43,8 @@ class CacheEntry:
     hit_count: int = 0
     size_bytes: int = 0
     tags: List[str] = field(default_factory=list)
+    deadline: float = 0.0  # time.monotonic() 基準の期限（内部判定用）
+    compressed: bool = False
     
     def is_expired(self) -> bool:
         return datetime.now() > self.expires_at
@@ -29,115 +52,140 @@ class CacheEntry:
     def increment_hits(self) -> None:
         self.hit_count += 1
 
+
+def _deep_sizeof(value: Any) -> int:
+    """コンテナを辿って sys.getsizeof を合計（pickle せずにメモリ使用量を見積もる）"""
+    seen: Set[int] = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
 class AdvancedCache:
-    """高度なキャッシュシステム（Redis代替）"""
+    """高度なキャッシュシステム（Redis代替）
+
+    - 追い出し: OrderedDict による LRU（get で末尾へ移動、先頭から追い出し。いずれも O(1)）
+    - 期限切れ: (期限, 世代, キー) のヒープで管理し、get/set のたびに期限到来分だけ同期的に除去
+    - メモリ: 値を辿った sys.getsizeof の合計（圧縮時は圧縮後のバイト数）で上限管理
+    """
     
     def __init__(self, default_ttl: int = 300, max_memory_mb: int = 100):
-        self.cache: Dict[str, CacheEntry] = {}
+        self.cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
         self.default_ttl = default_ttl
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.current_memory_usage = 0
         self.tags_index: Dict[str, set] = {}  # タグベースの無効化
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._generation = 0
         self.stats = {
             "hits": 0,
             "misses": 0,
             "evictions": 0,
             "memory_evictions": 0,
-            "tag_evictions": 0
+            "tag_evictions": 0,
+            "expirations": 0
         }
         # パフォーマンス最適化
         self.access_lock = False  # 簡易ロック
     
     async def get(self, key: str) -> Optional[Any]:
-        """キャッシュから値を取得（最適化版）"""
+        """キャッシュから値を取得（ヒット時は LRU の末尾へ移動）"""
         # 高速パスのチェック
         if self.access_lock:
             return None
-            
-        if key not in self.cache:
+        
+        entry = self.cache.get(key)
+        if entry is None:
             self.stats["misses"] += 1
             return None
-            
-        entry = self.cache[key]
         
-        # 期限切れチェック（最小限の処理）
-        if entry.is_expired():
-            # 非同期でクリーンアップ
-            asyncio.create_task(self._remove_entry(key))
+        now = time.monotonic()
+        if entry.deadline <= now:
+            self._discard(key)
+            self.stats["expirations"] += 1
             self.stats["misses"] += 1
             return None
         
-        # ヒット処理（最小限）
+        self.cache.move_to_end(key)
         entry.hit_count += 1
         self.stats["hits"] += 1
         
-        # 圧縮データの復元（最適化）
-        if isinstance(entry.data, bytes):
-            try:
-                return pickle.loads(gzip.decompress(entry.data))
-            except Exception:
-                return entry.data
+        # 圧縮データの復元
+        if entry.compressed:
+            return pickle.loads(gzip.decompress(entry.data))
         return entry.data
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[List[str]] = None, compress: bool = True) -> None:
-        """キャッシュに値を設定（最適化版）"""
+        """キャッシュに値を設定"""
         if self.access_lock:
             return
-            
+        
         ttl = ttl or self.default_ttl
         tags = tags or []
+        now = time.monotonic()
+        self.purge_expired(now)
         
-        # 既存エントリの高速削除
+        # 既存エントリはタグ索引ごと置き換える
         if key in self.cache:
-            old_entry = self.cache[key]
-            self.current_memory_usage -= old_entry.size_bytes
+            self._discard(key)
         
-        # データの圧縮（小さいデータは圧縮しない）
+        # データの圧縮（2KB 以上で、20% 以上縮む場合のみ。pickle は圧縮時の 1 回だけ）
         data_size = self._estimate_size(value)
-        if compress and data_size > 2048:  # 2KB以上で圧縮
+        stored_value = value
+        compressed = False
+        if compress and data_size > 2048:
             try:
-                serialized = pickle.dumps(value)
-                compressed_data = gzip.compress(serialized, compresslevel=1)  # 高速圧縮
-                if len(compressed_data) < data_size * 0.8:  # 20%以上削減できる場合のみ
+                compressed_data = gzip.compress(pickle.dumps(value), compresslevel=1)  # 高速圧縮
+                if len(compressed_data) < data_size * 0.8:
                     stored_value = compressed_data
                     data_size = len(compressed_data)
-                else:
-                    stored_value = value
+                    compressed = True
             except Exception:
-                stored_value = value
-        else:
-            stored_value = value
+                pass
         
-        # メモリ制限の高速チェック
-        if (self.current_memory_usage + data_size) > self.max_memory_bytes:
-            await self._ensure_memory_limit(data_size)
+        if data_size > self.max_memory_bytes:
+            return
         
-        # エントリ作成
-        now = datetime.now()
-        expires_at = now + timedelta(seconds=ttl)
+        # メモリ制限（LRU 追い出し）
+        if (self.current_memory_usage + data_size) > self.max_memory_bytes:
+            self._evict_until(data_size)
         
+        wall_now = datetime.now()
         entry = CacheEntry(
             data=stored_value,
-            created_at=now,
-            expires_at=expires_at,
+            created_at=wall_now,
+            expires_at=wall_now + timedelta(seconds=ttl),
             size_bytes=data_size,
-            tags=tags
+            tags=tags,
+            deadline=now + ttl,
+            compressed=compressed,
         )
         
         self.cache[key] = entry
         self.current_memory_usage += data_size
+        self._generation += 1
+        heapq.heappush(self._expiry_heap, (entry.deadline, self._generation, key))
         
-        # タグインデックス更新（非同期）
-        if tags:
-            for tag in tags:
-                if tag not in self.tags_index:
-                    self.tags_index[tag] = set()
-                self.tags_index[tag].add(key)
+        for tag in tags:
+            if tag not in self.tags_index:
+                self.tags_index[tag] = set()
+            self.tags_index[tag].add(key)
     
     async def delete(self, key: str) -> bool:
         """キャッシュから削除"""
         if key in self.cache:
-            await self._remove_entry(key)
+            self._discard(key)
             logger.debug(f"Cache deleted: {key}")
             return True
         return False
@@ -165,51 +213,69 @@ class AdvancedCache:
         """キャッシュをクリア"""
         self.cache.clear()
         self.tags_index.clear()
+        self._expiry_heap.clear()
         self.current_memory_usage = 0
-        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "memory_evictions": 0, "tag_evictions": 0}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "memory_evictions": 0, "tag_evictions": 0, "expirations": 0}
         logger.info("Cache cleared")
     
     async def _remove_entry(self, key: str) -> None:
         """エントリを削除（内部用）"""
-        if key in self.cache:
-            entry = self.cache[key]
-            self.current_memory_usage -= entry.size_bytes
-            
-            # タグインデックスから削除
-            for tag in entry.tags:
-                if tag in self.tags_index:
-                    self.tags_index[tag].discard(key)
-                    if not self.tags_index[tag]:
-                        del self.tags_index[tag]
-            
-            del self.cache[key]
+        self._discard(key)
     
-    async def _ensure_memory_limit(self, new_entry_size: int) -> None:
-        """メモリ制限を確保（LRU削除）"""
-        while (self.current_memory_usage + new_entry_size) > self.max_memory_bytes:
-            if not self.cache:
-                break
-            
-            # 最も古いエントリを削除（LRU）
-            oldest_key = next(iter(self.cache))
-            await self._remove_entry(oldest_key)
+    def _discard(self, key: str) -> None:
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return
+        self.current_memory_usage -= entry.size_bytes
+        for tag in entry.tags:
+            keys = self.tags_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags_index[tag]
+        # ヒープ上の項目は遅延削除（purge_expired で期限と一致しないものを読み捨てる）
+    
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """期限到来分だけヒープから取り出して削除（償却 O(log n)）"""
+        now = time.monotonic() if now is None else now
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry.deadline == deadline:
+                self._discard(key)
+                self.stats["expirations"] += 1
+                removed += 1
+        # 上書き・削除で死んだ項目が溜まりすぎたら作り直す
+        if len(heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [(e.deadline, i, k) for i, (k, e) in enumerate(self.cache.items())]
+            heapq.heapify(self._expiry_heap)
+        return removed
+    
+    def _evict_until(self, new_entry_size: int) -> None:
+        while self.cache and (self.current_memory_usage + new_entry_size) > self.max_memory_bytes:
+            oldest_key = next(iter(self.cache))  # 先頭 = 最も長く参照されていないエントリ
+            self._discard(oldest_key)
             self.stats["evictions"] += 1
             self.stats["memory_evictions"] += 1
     
+    async def _ensure_memory_limit(self, new_entry_size: int) -> None:
+        """メモリ制限を確保（LRU削除）"""
+        self.purge_expired()
+        self._evict_until(new_entry_size)
+    
     def _should_compress(self, value: Any) -> bool:
         """圧縮すべきかを判定"""
         estimated_size = self._estimate_size(value)
         return estimated_size > 1024  # 1KB以上は圧縮
     
     def _estimate_size(self, value: Any) -> int:
-        """値のサイズを推定"""
+        """値のサイズを推定（pickle せずにオブジェクトグラフを辿る）"""
+        if isinstance(value, (str, bytes)):
+            return len(value)
         try:
-            if isinstance(value, (str, bytes)):
-                return len(value)
-            elif isinstance(value, (list, dict)):
-                return len(pickle.dumps(value))
-            else:
-                return 1024  # デフォルト1KB
+            return _deep_sizeof(value)
         except Exception:
             return 1024
     
@@ -227,11 +293,286 @@ class AdvancedCache:
             **self.stats
         }
 
+def encode_cache_value(value: Any, tags: Optional[List[str]] = None) -> bytes:
+    """L2 保存形式: 1バイトのフラグ + UTF-8 JSON [値, タグ]（1KB 超は zlib 圧縮）
+
+    pickle は使わない（共有ストアの値を読み込み時に任意コード実行させないため）。
+    JSON 化できない値は TypeError / ValueError を送出する。
+    """
+    raw = json.dumps([value, tags or []], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) > 1024:
+        packed = zlib.compress(raw, 1)
+        if len(packed) < len(raw):
+            return _L2_ZLIB + packed
+    return _L2_RAW + raw
+
+
+def decode_cache_value(blob: bytes) -> Tuple[Any, List[str]]:
+    flag, body = blob[:1], blob[1:]
+    if flag == _L2_ZLIB:
+        body = zlib.decompress(body)
+    elif flag != _L2_RAW:
+        raise ValueError("unknown cache value format")
+    value, tags = json.loads(body.decode("utf-8"))
+    return value, list(tags)
+
+
+class TieredCache:
+    """L1（プロセス内 AdvancedCache）+ L2（Redis 互換ストア）の 2 層キャッシュ
+
+    - get: L1 → L2 の順に参照し、L2 ヒットは残り TTL（上限 l1_ttl）で L1 へ昇格
+    - set: 両層へ書き込み（L2 は SET EX で TTL を強制、タグはタグ毎の SET で索引）
+    - delete / delete_by_tags / clear: L2 から削除し、Pub/Sub で他ワーカーの L1 も無効化
+    - L2 障害時は l2_retry_seconds の間 L1 のみで動作（リクエストは失敗させない）
+    AdvancedCache と同じインターフェースなので QueryCache 等の self.cache に差し替え可能。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        namespace: str,
+        default_ttl: int = 300,
+        max_memory_mb: int = 100,
+        l1_ttl: Optional[int] = None,
+        l2_retry_seconds: float = 30.0,
+    ) -> None:
+        self.l1 = AdvancedCache(default_ttl=default_ttl, max_memory_mb=max_memory_mb)
+        self.client = client
+        self.default_ttl = default_ttl
+        self.l1_ttl = l1_ttl or default_ttl
+        self.l2_retry_seconds = l2_retry_seconds
+        self.prefix = f"gamechat:cache:{namespace}:"
+        self.tag_prefix = f"gamechat:cache-tag:{namespace}:"
+        self.channel = f"gamechat:cache-invalidate:{namespace}"
+        self.origin = uuid.uuid4().hex
+        self._l2_retry_at = 0.0
+        self._pubsub: Any = None
+        self._listener: Optional["asyncio.Task[None]"] = None
+        self.stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "l2_errors": 0,
+            "l2_skipped_values": 0,
+            "remote_invalidations": 0,
+        }
+
+    @property
+    def cache(self) -> "OrderedDict[str, CacheEntry]":
+        return self.l1.cache
+
+    # --- L2 の健全性 ---
+
+    def _l2_available(self) -> bool:
+        return time.monotonic() >= self._l2_retry_at
+
+    def _l2_failed(self, action: str, error: BaseException) -> None:
+        self.stats["l2_errors"] += 1
+        self._l2_retry_at = time.monotonic() + self.l2_retry_seconds
+        logger.warning(f"TieredCache: L2 {action} 失敗 -> {self.l2_retry_seconds}秒間 L1 のみ", exc_info=error)
+
+    # --- 取得 / 保存 ---
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.l1.get(key)
+        if value is not None:
+            self.stats["l1_hits"] += 1
+            return value
+        if not self._l2_available():
+            self.stats["misses"] += 1
+            return None
+        try:
+            await self.start()
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(self.prefix + key)
+            pipe.pttl(self.prefix + key)
+            blob, pttl = await pipe.execute()
+        except Exception as e:
+            self._l2_failed("get", e)
+            self.stats["misses"] += 1
+            return None
+        if blob is None:
+            self.stats["misses"] += 1
+            return None
+        try:
+            value, tags = decode_cache_value(blob)
+        except Exception as e:
+            logger.warning("TieredCache: L2 値の復元失敗（ミス扱い）", exc_info=e)
+            self.stats["misses"] += 1
+            return None
+        self.stats["l2_hits"] += 1
+        remaining = math.ceil(pttl / 1000) if pttl and pttl > 0 else self.l1_ttl
+        await self.l1.set(key, value, ttl=max(1, min(self.l1_ttl, remaining)), tags=tags, compress=False)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[List[str]] = None, compress: bool = True) -> None:
+        ttl = ttl or self.default_ttl
+        tags = tags or []
+        await self.l1.set(key, value, ttl=min(ttl, self.l1_ttl), tags=tags, compress=compress)
+        if not self._l2_available():
+            return
+        try:
+            blob = encode_cache_value(value, tags)
+        except (TypeError, ValueError):
+            # JSON 化できない値は L1 のみ
+            self.stats["l2_skipped_values"] += 1
+            return
+        try:
+            await self.start()
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(self.prefix + key, blob, ex=ttl)
+            for tag in tags:
+                pipe.sadd(self.tag_prefix + tag, key)
+                pipe.expire(self.tag_prefix + tag, max(ttl, 86400))
+            await pipe.execute()
+        except Exception as e:
+            self._l2_failed("set", e)
+
+    # --- 無効化（他ワーカーへ伝播） ---
+
+    async def delete(self, key: str) -> bool:
+        deleted = await self.l1.delete(key)
+        if self._l2_available():
+            try:
+                deleted = bool(await self.client.delete(self.prefix + key)) or deleted
+                await self._publish({"keys": [key]})
+            except Exception as e:
+                self._l2_failed("delete", e)
+        return deleted
+
+    async def delete_by_tags(self, tags: Union[str, List[str]]) -> int:
+        if isinstance(tags, str):
+            tags = [tags]
+        deleted = await self.l1.delete_by_tags(tags)
+        if not self._l2_available():
+            return deleted
+        try:
+            keys: Set[str] = set()
+            for tag in tags:
+                members = await self.client.smembers(self.tag_prefix + tag)
+                keys.update(m.decode("utf-8") if isinstance(m, bytes) else m for m in members)
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.delete(self.prefix + key)
+            for tag in tags:
+                pipe.delete(self.tag_prefix + tag)
+            results = await pipe.execute()
+            deleted = max(deleted, sum(int(r) for r in results[:len(keys)]))
+            await self._publish({"tags": tags})
+        except Exception as e:
+            self._l2_failed("delete_by_tags", e)
+        return deleted
+
+    async def clear(self) -> None:
+        await self.l1.clear()
+        if not self._l2_available():
+            return
+        try:
+            for pattern in (self.prefix + "*", self.tag_prefix + "*"):
+                batch: List[Any] = []
+                async for name in self.client.scan_iter(match=pattern, count=500):
+                    batch.append(name)
+                    if len(batch) >= 500:
+                        await self.client.delete(*batch)
+                        batch = []
+                if batch:
+                    await self.client.delete(*batch)
+            await self._publish({"clear": True})
+        except Exception as e:
+            self._l2_failed("clear", e)
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        await self.client.publish(self.channel, json.dumps({**message, "origin": self.origin}))
+
+    async def _apply_invalidation(self, message: Dict[str, Any]) -> None:
+        if message.get("origin") == self.origin:
+            return
+        self.stats["remote_invalidations"] += 1
+        if message.get("clear"):
+            await self.l1.clear()
+            return
+        for key in message.get("keys") or []:
+            await self.l1.delete(key)
+        if message.get("tags"):
+            await self.l1.delete_by_tags(message["tags"])
+
+    # --- 無効化メッセージの購読 ---
+
+    async def start(self) -> None:
+        """無効化チャネルを購読（現在のイベントループで未購読の場合のみ。購読完了まで待つ）"""
+        loop = asyncio.get_running_loop()
+        if self._listener is not None and not self._listener.done() and self._listener.get_loop() is loop:
+            return
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        self._pubsub = pubsub
+        self._listener = loop.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub: Any) -> None:
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message or message.get("type") != "message":
+                    continue
+                try:
+                    data = message["data"]
+                    payload = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+                    await self._apply_invalidation(payload)
+                except Exception as e:
+                    logger.warning("TieredCache: 無効化メッセージの処理失敗", exc_info=e)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._l2_failed("subscribe", e)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        return self.l1.purge_expired(now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.l1.get_stats(), "backend": "redis", "l2": dict(self.stats)}
+
+
+def build_cache(namespace: str, default_ttl: int = 300, max_memory_mb: int = 100) -> Union[AdvancedCache, TieredCache]:
+    """キャッシュバックエンドを環境変数で選択
+
+    CACHE_REDIS_URL（未設定なら REDIS_URL）が設定され redis が導入済みなら TieredCache、
+    それ以外はプロセス内 AdvancedCache。CACHE_BACKEND=memory で強制的にプロセス内のみ。
+    """
+    url = os.getenv("CACHE_REDIS_URL") or os.getenv("REDIS_URL")
+    if not url or os.getenv("CACHE_BACKEND", "auto").lower() == "memory":
+        return AdvancedCache(default_ttl=default_ttl, max_memory_mb=max_memory_mb)
+    if not REDIS_AVAILABLE:
+        logger.warning("redis 未導入のためプロセス内キャッシュのみで動作")
+        return AdvancedCache(default_ttl=default_ttl, max_memory_mb=max_memory_mb)
+    client = aioredis.from_url(url, socket_connect_timeout=2, socket_timeout=2)
+    return TieredCache(
+        client,
+        namespace,
+        default_ttl=default_ttl,
+        max_memory_mb=max_memory_mb,
+        l1_ttl=int(os.getenv("CACHE_L1_TTL", "60")),
+    )
+
 class QueryCache:
     """クエリ応答専用キャッシュ（高速化）"""
     
     def __init__(self) -> None:
-        self.cache = AdvancedCache(default_ttl=1200, max_memory_mb=150)  # 20分、150MB
+        self.cache = build_cache("query", default_ttl=1200, max_memory_mb=150)  # 20分、150MB
         self._key_cache: Dict[str, str] = {}  # キー生成のキャッシュ
     
     def _generate_key(self, question: str, top_k: int = 50) -> str:
@@ -294,7 +635,7 @@ class SearchResultCache:
     """検索結果専用キャッシュ"""
     
     def __init__(self) -> None:
-        self.cache = AdvancedCache(default_ttl=1800, max_memory_mb=100)  # 30分
+        self.cache = build_cache("search", default_ttl=1800, max_memory_mb=100)  # 30分
     
     def _generate_search_key(self, query: str, query_type: str) -> str:
         """検索キーを生成"""
@@ -329,7 +670,7 @@ class FastQueryCache(QueryCache):
     """高速化されたクエリキャッシュ（シンプル版）"""
     
     def __init__(self) -> None:
-        self.cache = AdvancedCache(default_ttl=600, max_memory_mb=100)  # 10分
+        self.cache = build_cache("fast_query", default_ttl=600, max_memory_mb=100)  # 10分
         self._enabled = True
     
     async def get_cached_response(self, question: str, top_k: int = 50) -> Optional[Dict[str, Any]]:
@@ -436,6 +777,9 @@ async def cleanup_expired_cache() -> None:
             # 期限切れエントリをチェック
             await asyncio.sleep(300)  # 5分ごと
             
+            for cache in (query_cache.cache, search_cache.cache, fast_query_cache.cache):
+                cache.purge_expired()
+            
             # 統計ログ出力
             query_stats = await query_cache.get_stats()
             logger.info(f"Query cache stats: {query_stats}")
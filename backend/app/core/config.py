@@ -110,6 +110,8 @@ class Settings:
         self.DATA_DIR = _get_data_dir()
         self.DATA_FILE_PATH = os.path.join(self.DATA_DIR, "data.json")
         self.EMBEDDING_FILE_PATH = os.path.join(self.DATA_DIR, "embedding_list.jsonl")
+        # embedding_list をバイナリ化したもの（scripts/data-processing/build_embedding_index.py で生成、memmap で共有）
+        self.EMBEDDING_INDEX_FILE_PATH = os.path.join(self.DATA_DIR, "embedding_index.bin")
         self.QUERY_DATA_FILE_PATH = os.path.join(self.DATA_DIR, "query_data.json")
         self.CONVERTED_DATA_FILE_PATH = os.path.join(self.DATA_DIR, "convert_data.json")
 
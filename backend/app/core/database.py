@@ -3,12 +3,13 @@ Database connection pool and management for production environment.
 """
 import os
 import asyncio
+import functools
 import logging
-from typing import Optional, Dict, Any, AsyncGenerator
+from typing import Optional, Dict, Any, AsyncGenerator, Callable, List, Set
 from contextlib import asynccontextmanager
 import time
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +18,49 @@ class ConnectionPoolConfig:
     """Connection pool configuration."""
     min_connections: int = 5
     max_connections: int = 20
-    connection_timeout: int = 30
+    connection_timeout: float = 30
     idle_timeout: int = 300
     retry_attempts: int = 3
     retry_delay: float = 1.0
 
 class UpstashVectorPool:
-    """Upstash Vector connection pool manager."""
+    """Upstash Vector connection pool manager.
+
+    Index (sync httpx client) instances are leased one at a time and all blocking
+    calls run on the pool executor, so the event loop is never blocked. When the
+    pool is saturated, callers wait (up to ``connection_timeout``) for a release.
+    """
     
-    def __init__(self, config: Optional[ConnectionPoolConfig] = None):
+    def __init__(
+        self,
+        config: Optional[ConnectionPoolConfig] = None,
+        url: Optional[str] = None,
+        token: Optional[str] = None,
+    ):
         self.config = config or ConnectionPoolConfig()
-        self.url = os.getenv("UPSTASH_VECTOR_REST_URL")
-        self.token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+        self.url = url or os.getenv("UPSTASH_VECTOR_REST_URL")
+        self.token = token or os.getenv("UPSTASH_VECTOR_REST_TOKEN")
         self.pool: Dict[str, Dict[str, Any]] = {}
         self.pool_lock = asyncio.Lock()
-        self.executor = ThreadPoolExecutor(max_workers=self.config.max_connections)
+        self._available = asyncio.Condition(self.pool_lock)
+        self.executor = self._make_executor()
         self._initialized = False
+        self._creating = 0
+        self._next_id = 0
+        self._waiting = 0
+        # Releases scheduled from executor threads (kept referenced until they run)
+        self._release_tasks: Set["asyncio.Task[None]"] = set()
+        self._metrics: Dict[str, float] = {
+            "acquisitions": 0,
+            "saturation_waits": 0,
+            "acquire_timeouts": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "connections_created": 0,
+            "connection_failures": 0,
+            "errors": 0,
+            "peak_in_use": 0,
+        }
         
         if not self.url or not self.token:
             logger.warning("Upstash Vector credentials not found")
@@ -46,15 +74,26 @@ class UpstashVectorPool:
             logger.info("Initializing Upstash Vector connection pool")
             
             # Create initial connections
-            for i in range(self.config.min_connections):
-                connection_id = f"conn_{i}"
-                connection = await self._create_connection(connection_id)
+            for _ in range(self.config.min_connections):
+                connection = await self._create_connection(self._new_connection_id())
                 if connection:
-                    self.pool[connection_id] = connection
+                    self.pool[connection["id"]] = connection
             
             self._initialized = True
             logger.info(f"Initialized {len(self.pool)} connections in Upstash Vector pool")
     
+    def _make_executor(self) -> ThreadPoolExecutor:
+        # One worker per connection: each leased Index runs at most one blocking call
+        return ThreadPoolExecutor(
+            max_workers=self.config.max_connections,
+            thread_name_prefix="upstash-vector",
+        )
+    
+    def _new_connection_id(self) -> str:
+        connection_id = f"conn_{self._next_id}"
+        self._next_id += 1
+        return connection_id
+    
     async def _create_connection(self, connection_id: str) -> Optional[Dict[str, Any]]:
         """Create a new connection to Upstash Vector."""
         try:
@@ -72,7 +111,7 @@ class UpstashVectorPool:
             index = Index(url=self.url, token=self.token)
             
             # Test the connection
-            await asyncio.get_event_loop().run_in_executor(
+            await asyncio.get_running_loop().run_in_executor(
                 self.executor,
                 lambda: index.info()
             )
@@ -85,67 +124,173 @@ class UpstashVectorPool:
                 "in_use": False,
                 "error_count": 0
             }
+            self._metrics["connections_created"] += 1
             
             logger.debug(f"Created Upstash Vector connection: {connection_id}")
             return connection
             
         except Exception as e:
+            self._metrics["connection_failures"] += 1
             logger.error(f"Failed to create Upstash Vector connection {connection_id}: {e}")
             return None
     
+    async def _acquire(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Lease an idle connection, create one, or wait until one is released."""
+        timeout = self.config.connection_timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+        waited = False
+        connection: Optional[Dict[str, Any]] = None
+        create_id = None
+        
+        async with self._available:
+            while True:
+                for conn in self.pool.values():
+                    if not conn["in_use"]:
+                        connection = conn
+                        break
+                if connection:
+                    connection["in_use"] = True
+                    break
+                # If no available connection and pool not at max, create new one
+                if len(self.pool) + self._creating < self.config.max_connections:
+                    self._creating += 1
+                    create_id = self._new_connection_id()
+                    break
+                if not waited:
+                    waited = True
+                    self._metrics["saturation_waits"] += 1
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._metrics["acquire_timeouts"] += 1
+                    raise TimeoutError("Timed out waiting for an Upstash Vector connection")
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(self._available.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiting -= 1
+        
+        if create_id:
+            # Create outside the lock so other callers are not serialized behind the handshake
+            new_connection = await self._create_connection(create_id)
+            async with self._available:
+                self._creating -= 1
+                if new_connection:
+                    new_connection["in_use"] = True
+                    self.pool[create_id] = new_connection
+                    connection = new_connection
+                else:
+                    self._available.notify()
+        if connection is None:
+            raise Exception("No available connections in pool")
+        
+        wait_seconds = time.perf_counter() - started
+        connection["last_used"] = time.time()
+        self._metrics["acquisitions"] += 1
+        self._metrics["total_wait_seconds"] += wait_seconds
+        self._metrics["max_wait_seconds"] = max(self._metrics["max_wait_seconds"], wait_seconds)
+        in_use = sum(1 for conn in self.pool.values() if conn["in_use"])
+        self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], in_use)
+        return connection
+    
+    async def _release(self, connection: Dict[str, Any]) -> None:
+        async with self._available:
+            if connection["id"] in self.pool:
+                connection["in_use"] = False
+                connection["last_used"] = time.time()
+            self._available.notify()
+    
     @asynccontextmanager
-    async def get_connection(self) -> AsyncGenerator[Any, None]:
-        """Get a connection from the pool."""
+    async def get_connection(self, timeout: Optional[float] = None) -> AsyncGenerator[Any, None]:
+        """Get a connection from the pool (waits while the pool is saturated)."""
         if not self._initialized:
             await self.initialize()
         
-        connection = None
-        connection_id = None
+        connection = await self._acquire(timeout)
         
         try:
-            # Get available connection
-            async with self.pool_lock:
-                for conn_id, conn in self.pool.items():
-                    if not conn["in_use"]:
-                        conn["in_use"] = True
-                        conn["last_used"] = time.time()
-                        connection = conn
-                        connection_id = conn_id
-                        break
-                
-                # If no available connection and pool not at max, create new one
-                if not connection and len(self.pool) < self.config.max_connections:
-                    new_conn_id = f"conn_{len(self.pool)}"
-                    new_connection = await self._create_connection(new_conn_id)
-                    if new_connection:
-                        new_connection["in_use"] = True
-                        self.pool[new_conn_id] = new_connection
-                        connection = new_connection
-                        connection_id = new_conn_id
-            
-            if not connection:
-                raise Exception("No available connections in pool")
-            
             yield connection["index"]
             
         except Exception as e:
-            logger.error(f"Error using connection {connection_id}: {e}")
-            # Mark connection as having an error
-            if connection:
-                connection["error_count"] += 1
-                # Remove connection if too many errors
-                if connection["error_count"] > self.config.retry_attempts:
-                    async with self.pool_lock:
-                        if connection_id in self.pool:
-                            del self.pool[connection_id]
-                            logger.warning(f"Removed faulty connection {connection_id}")
+            await self._record_error(connection, e)
             raise
         finally:
             # Release connection
-            if connection and connection_id:
-                async with self.pool_lock:
-                    if connection_id in self.pool:
-                        self.pool[connection_id]["in_use"] = False
+            await self._release(connection)
+    
+    async def _record_error(self, connection: Dict[str, Any], error: BaseException) -> None:
+        connection_id = connection["id"]
+        logger.error(f"Error using connection {connection_id}: {error}")
+        self._metrics["errors"] += 1
+        # Mark connection as having an error
+        connection["error_count"] += 1
+        # Remove connection if too many errors
+        if connection["error_count"] > self.config.retry_attempts:
+            async with self._available:
+                if connection_id in self.pool:
+                    del self.pool[connection_id]
+                    logger.warning(f"Removed faulty connection {connection_id}")
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking client call on the pool executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def query(self, **kwargs: Any) -> Any:
+        """Run ``Index.query`` on a pooled connection off the event loop.
+
+        The connection is released when the executor call finishes, not when the
+        caller stops waiting: a caller timeout (``asyncio.wait_for``) cancels the
+        await but cannot stop the thread, and the connection stays leased until
+        the blocking call returns.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        connection = await self._acquire()
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(functools.partial(connection["index"].query, **kwargs))
+        future.add_done_callback(
+            lambda done: self._call_soon(loop, self._finish_query, connection, done)
+        )
+        return await asyncio.wrap_future(future)
+    
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[..., Any], *args: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # Loop already closed (shutdown); the pool is being discarded
+            pass
+    
+    def _finish_query(self, connection: Dict[str, Any], done: "Future[Any]") -> None:
+        async def finish() -> None:
+            error = None if done.cancelled() else done.exception()
+            if error is not None:
+                await self._record_error(connection, error)
+            await self._release(connection)
+        
+        task = asyncio.ensure_future(finish())
+        self._release_tasks.add(task)
+        task.add_done_callback(self._release_tasks.discard)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool saturation metrics (cheap, no I/O)."""
+        in_use = sum(1 for conn in self.pool.values() if conn["in_use"])
+        acquisitions = self._metrics["acquisitions"]
+        return {
+            **self._metrics,
+            "initialized": self._initialized,
+            "pool_size": len(self.pool),
+            "in_use": in_use,
+            "idle": len(self.pool) - in_use,
+            "waiting": self._waiting,
+            "max_connections": self.config.max_connections,
+            "utilization": in_use / self.config.max_connections if self.config.max_connections else 0.0,
+            "avg_wait_ms": (self._metrics["total_wait_seconds"] / acquisitions * 1000) if acquisitions else 0.0,
+        }
     
     async def cleanup_idle_connections(self) -> None:
         """Clean up idle connections."""
@@ -153,16 +298,16 @@ class UpstashVectorPool:
         idle_threshold = current_time - self.config.idle_timeout
         
         async with self.pool_lock:
-            connections_to_remove = []
+            connections_to_remove: List[str] = []
             
             for conn_id, connection in self.pool.items():
                 if (not connection["in_use"] and 
                     connection["last_used"] < idle_threshold and 
-                    len(self.pool) > self.config.min_connections):
+                    len(self.pool) - len(connections_to_remove) > self.config.min_connections):
                     connections_to_remove.append(conn_id)
             
             for conn_id in connections_to_remove:
-                del self.pool[conn_id]
+                self._close_index(self.pool.pop(conn_id)["index"])
                 logger.debug(f"Removed idle connection {conn_id}")
     
     async def health_check(self) -> Dict[str, Any]:
@@ -178,9 +323,9 @@ class UpstashVectorPool:
                 try:
                     if not connection["in_use"]:
                         # Quick health check
-                        await asyncio.get_event_loop().run_in_executor(
+                        await asyncio.get_running_loop().run_in_executor(
                             self.executor,
-                            lambda: connection["index"].info()
+                            connection["index"].info
                         )
                         healthy_connections += 1
                 except Exception as e:
@@ -190,16 +335,31 @@ class UpstashVectorPool:
             "status": "healthy" if healthy_connections > 0 else "unhealthy",
             "total_connections": total_connections,
             "healthy_connections": healthy_connections,
-            "pool_utilization": f"{(total_connections / self.config.max_connections) * 100:.1f}%"
+            "pool_utilization": f"{(total_connections / self.config.max_connections) * 100:.1f}%",
+            "metrics": self.get_metrics(),
         }
     
+    @staticmethod
+    def _close_index(index: Any) -> None:
+        # upstash_vector.Index has no public close(); release its httpx keep-alive connections
+        client = getattr(index, "_client", None)
+        try:
+            if client is not None:
+                client.close()
+        except Exception:
+            pass
+    
     async def close(self) -> None:
         """Close all connections in the pool."""
         async with self.pool_lock:
             logger.info(f"Closing {len(self.pool)} connections")
+            for connection in self.pool.values():
+                self._close_index(connection["index"])
             self.pool.clear()
         
-        self.executor.shutdown(wait=True)
+        # Swap in a fresh (lazily threaded) executor so the pool can be re-initialized
+        executor, self.executor = self.executor, self._make_executor()
+        executor.shutdown(wait=False)
         self._initialized = False
 
 class DatabaseManager:
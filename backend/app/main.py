@@ -1,16 +1,35 @@
 import time
+import asyncio
 import logging
 from typing import Any, AsyncGenerator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import rag
 from .core.config import settings
+from .services.service_container import get_default_container, reset_default_container
 
 app_start_time = time.time()
 
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logging.info("MVP backend starting")
+    # ワーカー毎に1度だけ外部サービスを構築・ウォームアップし、以降のリクエストで共有
+    services = get_default_container()
+    await services.warmup()
+    # カードデータのホットリロード（CARD_DATA_RELOAD_ENABLED=true のとき。版は読み込み前に記録）
+    card_reloader = await rag.create_card_index_reloader()
+    await asyncio.to_thread(rag._mvp_load_card_index)
+    if card_reloader is not None:
+        card_reloader.start()
+    app.state.services = services
+    app.state.card_reloader = card_reloader
     yield
+    if card_reloader is not None:
+        await card_reloader.stop()
+    app.state.services = None
+    app.state.card_reloader = None
+    container = reset_default_container()
+    if container is not None:
+        await container.close()
     logging.info("MVP backend stopped")
 
 app = FastAPI(title="GameChat AI API (MVP)", version="0.1.0", lifespan=lifespan)
@@ -28,4 +47,17 @@ app.add_middleware(
 async def health() -> dict[str, Any]:
     return {"status": "ok", "service": "gamechat-ai-backend", "version": "0.1.0"}
 
+@app.get("/health/detailed")
+async def health_detailed() -> dict[str, Any]:
+    # 外部I/Oなし: ワーカー内サービスの状態と Upstash 接続プールの飽和メトリクス
+    services = getattr(app.state, "services", None) or get_default_container()
+    card_reloader = getattr(app.state, "card_reloader", None)
+    return {
+        "status": "ok",
+        "uptime_seconds": time.time() - app_start_time,
+        "services": services.get_info(),
+        "vector_pool": services.vector_service.get_pool_metrics(),
+        "card_reloader": card_reloader.get_stats() if card_reloader is not None else None,
+    }
+
 app.include_router(rag.router)
\ No newline at end of file
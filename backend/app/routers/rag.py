@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Body
-from typing import Dict, Any, List
+from fastapi import APIRouter, Body, Depends
+from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel
-import json
+import asyncio
 import threading
 import logging
 from ..services.embedding_service import EmbeddingService
 from ..services.vector_service import VectorService
 from ..services.llm_service import LLMService
 from ..services.storage_service import StorageService
+from ..services.card_data_reloader import CardDataReloader
+from ..services.json_stream import JsonContainerStream
+from ..services.response_cache import ChatResponseCache
+from ..services.service_container import get_embedding_service, get_vector_service, get_llm_service, get_response_cache
 import os
 
 logger = logging.getLogger(__name__)
@@ -19,6 +23,7 @@ router = APIRouter()
 # MVP シンプルチャット (/chat)
 #  - 認証 / reCAPTCHA / ハイブリッド検索を排除
 #  - Embedding + Vector 検索 + 最小カード情報 + スタブLLM
+#  - 応答はワーカー内でキャッシュし、同時の同一質問は 1 本のパイプラインを共有
 ############################
 
 class MVPChatRequest(BaseModel):
@@ -29,6 +34,11 @@ class MVPChatRequest(BaseModel):
 _mvp_card_index_lock = threading.Lock()
 _mvp_card_index: Dict[str, Dict[str, Any]] | None = None
 
+MVP_CARD_INDEX_FILE_KEYS = ("convert_data", "data")
+# 索引に残すフィールド（効果の 2 つ目以降・QA 等は読み込み時に捨てる）
+MVP_CARD_INDEX_FIELDS = frozenset({"title", "name", "effect_1", "rarity", "class", "cost", "attack", "hp"})
+
+
 def _mvp_load_card_index() -> Dict[str, Dict[str, Any]]:
     global _mvp_card_index
     if _mvp_card_index is not None:
@@ -36,46 +46,104 @@ def _mvp_load_card_index() -> Dict[str, Dict[str, Any]]:
     with _mvp_card_index_lock:
         if _mvp_card_index is not None:
             return _mvp_card_index
-        storage = StorageService()
-        paths = [storage.get_file_path("convert_data"), storage.get_file_path("data")]
-        idx: Dict[str, Dict[str, Any]] = {}
-        for p in paths:
-            if not p or not os.path.exists(p):
-                continue
-            try:
-                with open(p, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, list):
-                    for item in data:
-                        if not isinstance(item, dict):
-                            continue
-                        title = item.get("title") or item.get("name")
-                        if title and title not in idx:
-                            idx[title] = {k: v for k, v in item.items() if k in {"title","name","effect_1","rarity","class","cost","attack","hp"}}
-                elif isinstance(data, dict):
-                    for k, v in data.items():
-                        if isinstance(v, dict):
-                            title = v.get("title") or k
-                            if title and title not in idx:
-                                idx[title] = {kk: vv for kk, vv in v.items() if kk in {"title","name","effect_1","rarity","class","cost","attack","hp"}}
-            except Exception:
-                continue
-        _mvp_card_index = idx
+        _mvp_card_index = _mvp_build_card_index()
         return _mvp_card_index
 
+
+def _mvp_build_card_index() -> Dict[str, Dict[str, Any]]:
+    """convert_data / data をカード 1 件ずつ読み、必要なフィールドだけの索引を作る（ファイル全体は保持しない）"""
+    storage = StorageService()
+    paths = [storage.get_file_path(key) for key in MVP_CARD_INDEX_FILE_KEYS]
+    idx: Dict[str, Dict[str, Any]] = {}
+    for p in paths:
+        if not p or not os.path.exists(p):
+            continue
+        # 読み込み途中で壊れていたファイルの分は採用しない（従来の json.load と同じくファイル単位）
+        file_idx: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                for key, item in JsonContainerStream(f):
+                    if not isinstance(item, dict):
+                        continue
+                    title = item.get("title") or (item.get("name") if key is None else key)
+                    if title and title not in idx and title not in file_idx:
+                        file_idx[title] = {k: v for k, v in item.items() if k in MVP_CARD_INDEX_FIELDS}
+        except Exception:
+            continue
+        idx.update(file_idx)
+    return idx
+
+
+def _mvp_card_index_version() -> Optional[str]:
+    """カード索引の元ファイルの版（ファイル毎の版を連結。どれも取得できなければ None）"""
+    storage = StorageService()
+    versions = [storage.get_data_version(key) for key in MVP_CARD_INDEX_FILE_KEYS]
+    if all(version is None for version in versions):
+        return None
+    return "|".join(version or "" for version in versions)
+
+
+async def _mvp_reload_card_index() -> None:
+    """カード索引を別スレッドで作り直し、完成後に参照を差し替える（読み取り側は待たない）"""
+    global _mvp_card_index
+    idx = await asyncio.to_thread(_mvp_build_card_index)
+    if not idx:
+        # 読み込みに失敗した（空になった）場合は直前の索引を使い続ける
+        raise RuntimeError("カード索引の再構築結果が空のため差し替えを中止しました")
+    _mvp_card_index = idx
+
+
+async def create_card_index_reloader() -> Optional[CardDataReloader]:
+    """CARD_DATA_RELOAD_ENABLED=true のとき、カード索引のホットリロードを作る（索引の読み込み前に呼ぶ）"""
+    interval = CardDataReloader.interval_from_env()
+    if interval is None:
+        return None
+    # 読み込み前の版を基準にする（起動中に更新されたら最初の確認で再読み込みされる）
+    version = await asyncio.to_thread(_mvp_card_index_version)
+    return CardDataReloader("mvp_card_index", _mvp_card_index_version, _mvp_reload_card_index, interval, current_version=version)
+
 @router.post("/chat")
-async def chat(req: MVPChatRequest = Body(...)) -> Dict[str, Any]:
+async def chat(
+    req: MVPChatRequest = Body(...),
+    embedding_service: EmbeddingService = Depends(get_embedding_service),
+    vector_service: VectorService = Depends(get_vector_service),
+    llm_service: LLMService = Depends(get_llm_service),
+    response_cache: ChatResponseCache = Depends(get_response_cache),
+) -> Dict[str, Any]:
     question = (req.message or "").strip()
     if not question:
         return {"answer": "質問を入力してください。", "context": None}
 
-    embedding_service = EmbeddingService()
-    vector_service = VectorService()
-    llm_service = LLMService()
+    top_k = req.top_k or 5
+    with_context = bool(req.with_context)
+    response, cache_meta = await response_cache.get_or_compute(
+        question,
+        top_k,
+        with_context,
+        lambda: _mvp_chat_pipeline(question, top_k, with_context, embedding_service, vector_service, llm_service),
+    )
+    response["cache"] = cache_meta
+    return response
+
+
+async def _mvp_chat_pipeline(
+    question: str,
+    top_k: int,
+    with_context: bool,
+    embedding_service: EmbeddingService,
+    vector_service: VectorService,
+    llm_service: LLMService,
+) -> Tuple[Dict[str, Any], bool]:
+    """Embedding → Vector → LLM。(応答, キャッシュ可否) を返す
 
+    フォールバック経由の応答（各サービスが劣化を報告した場合・ここで例外を拾った場合）はキャッシュしない。
+    """
+    cacheable = True
+    # サービスはワーカー共有（service_container）。リクエスト毎のクライアント構築は行わない
     # Embedding 取得（サービス内でモック/フォールバック可能）
     try:
-        embedding = await embedding_service.get_embedding(question)
+        embedding, degraded = await embedding_service.get_embedding_with_status(question)
+        cacheable = cacheable and not degraded
         if not embedding:
             raise ValueError("empty embedding")
     except Exception as e:
@@ -83,35 +151,40 @@ async def chat(req: MVPChatRequest = Body(...)) -> Dict[str, Any]:
         import hashlib
         h = hashlib.sha256(question.encode()).digest()
         embedding = [(b - 128) / 128 for b in h][:128]
+        cacheable = False
 
     # Vector search
     try:
-        titles: List[str] = await vector_service.search(embedding, top_k=req.top_k or 5)
+        titles, degraded = await vector_service.search_with_status(embedding, top_k=top_k)
+        cacheable = cacheable and not degraded
     except Exception as e:
         logger.warning("/chat: Vector 検索失敗 -> 空リスト", exc_info=e)
         titles = []
+        cacheable = False
 
     context_items: List[Dict[str, Any]] = []
-    if titles and req.with_context:
+    if titles and with_context:
         idx = _mvp_load_card_index()
         for t in titles:
             item = idx.get(t)
             if item:
                 context_items.append(item)
-            if len(context_items) >= (req.top_k or 5):
+            if len(context_items) >= top_k:
                 break
 
     try:
-        answer = await llm_service.generate_answer(question, context_items)
+        answer, degraded = await llm_service.generate_answer_with_status(question, context_items)
+        cacheable = cacheable and not degraded
     except Exception:
         answer = (f"{len(context_items)}件のカード情報を参照しました。質問: {question}" if context_items else
                   "検索結果が得られませんでした。別の聞き方を試してください。")
+        cacheable = False
 
     return {
         "answer": answer,
-        "context": context_items if req.with_context else None,
+        "context": context_items if with_context else None,
         "retrieved_titles": titles
-    }
+    }, cacheable
 
 
 ############################
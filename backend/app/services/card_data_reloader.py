@@ -0,0 +1,98 @@
+"""
+カードデータのホットリロード（変更検知 → バックグラウンド再構築 → 参照の差し替え）
+
+一定間隔でデータの版（ローカルファイルは更新時刻とサイズ、Cloud Storage は generation）を確認し、
+変わっていれば reload を実行する。reload は新しいデータ・索引一式を別スレッドで構築し、
+完成後に参照 1 つを差し替える（DatabaseService.reload_data_async / routers.rag の MVP カード索引）。
+読み取り側は差し替えを待たず、常にどちらか一方の版を見る。
+
+環境変数:
+- CARD_DATA_RELOAD_ENABLED: "true" で有効（既定は無効）
+- CARD_DATA_RELOAD_INTERVAL_SECONDS: 版の確認間隔（秒、既定 30）
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Optional
+import os
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CardDataReloader:
+    """データの版を定期的に確認し、変わっていれば reload する"""
+
+    def __init__(
+        self,
+        name: str,
+        version: Callable[[], Optional[str]],
+        reload: Callable[[], Awaitable[Any]],
+        interval_seconds: float = 30.0,
+        current_version: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.version = version
+        self.reload = reload
+        self.interval_seconds = interval_seconds
+        # 公開中のデータの版（None: 不明。版を取得できた時点で再読み込みする）
+        self.current_version = current_version
+        self.stats: Dict[str, Any] = {"checks": 0, "reloads": 0, "failures": 0, "last_reload_seconds": None}
+        self._lock = asyncio.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @staticmethod
+    def interval_from_env() -> Optional[float]:
+        """確認間隔（無効なら None）"""
+        if os.getenv("CARD_DATA_RELOAD_ENABLED", "false").lower() != "true":
+            return None
+        return max(1.0, float(os.getenv("CARD_DATA_RELOAD_INTERVAL_SECONDS", "30")))
+
+    async def check(self) -> bool:
+        """版が変わっていれば reload する（reload した場合 True）"""
+        async with self._lock:
+            self.stats["checks"] += 1
+            # 版の取得も I/O（stat / GCS メタデータ）のためスレッドで行う
+            version = await asyncio.to_thread(self.version)
+            if version is None or version == self.current_version:
+                return False
+            started = time.perf_counter()
+            await self.reload()
+            self.current_version = version
+            self.stats["reloads"] += 1
+            self.stats["last_reload_seconds"] = time.perf_counter() - started
+            logger.info("CardDataReloader(%s): 再読み込み完了 version=%s", self.name, version)
+            return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.check()
+            except Exception as e:
+                # 失敗しても直前のデータを使い続け、次回の確認で再試行する
+                self.stats["failures"] += 1
+                logger.warning("CardDataReloader(%s): 再読み込み失敗", self.name, exc_info=e)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "current_version": self.current_version,
+            **self.stats,
+        }
@@ -0,0 +1,488 @@
+"""
+DatabaseService 用の列指向カードインデックス
+
+reload_data 時に 1 度だけ構築し、検索・統計はリスト走査ではなく NumPy のマスク演算で行う。
+
+- 数値列（cost / hp / attack）: int64 配列 + 変換可否マスク
+  （従来の `int(item.get(field, 0))` と同じ規則: キー欠落は 0、int() で失敗する値は無効）
+- カテゴリ列（class / rarity / type / name）: カテゴリ表 + int32 コード
+  （値は `str(item[field])`、キー欠落は専用カテゴリ None）
+- 転置インデックス（posting list）: カテゴリ値毎・keywords の各要素（小文字化）毎の昇順行番号配列。
+  複数条件は小さい posting list から順に積集合を取るため、フィルタの計算量は結果件数に比例する
+- 整列済み数値索引（SortedValues）: cost / hp / attack（`float(item[field])`）と effect_1〜5 のダメージ値を
+  (値, 行) の昇順に並べたもの。最大・最小・上位 N・範囲は二分探索で求める
+- 全文検索用の文字 n-gram インデックス（text_index.NgramIndex）: 初回利用時に構築し、
+  再構築時はテキストが変わっていなければ直前のものを引き継ぐ
+- ページネーション: 並び順毎の全行整列ビューを保持し、クエリ毎の整列済み結果行を LRU でキャッシュする
+  （続くページは結果行の切り出しのみ）
+- 判定結果は従来のループ実装と同じになるよう、比較・部分一致はカテゴリ表側で 1 回だけ行う
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+import re
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    NUMPY_AVAILABLE = False
+
+from .text_index import NgramIndex, build_searchable_text
+
+NUMERIC_FIELDS = ("cost", "hp", "attack")
+CATEGORICAL_FIELDS = ("class", "rarity", "type", "name")
+SEARCH_TEXT_FIELDS = ("name", "effect_1", "effect_2", "class", "type")
+EFFECT_FIELDS = ("effect_1", "effect_2", "effect_3", "effect_4", "effect_5")
+DAMAGE_PATTERN = re.compile(r"(\d+)ダメージ")
+# float64 で整数を誤差なく表せる上限（これを超える値を含む索引は使わない）
+EXACT_FLOAT_LIMIT = 2 ** 53
+MEMO_MAX_ENTRIES = 256
+# ページネーション用に保持する（クエリ, 並び順）毎の結果行配列の数
+PAGE_CACHE_MAX_ENTRIES = 32
+
+
+def union_rows(postings: Sequence[Any]) -> Any:
+    """昇順行番号配列の和集合（昇順・重複なし）"""
+    if not postings:
+        return np.empty(0, dtype=np.int64)
+    if len(postings) == 1:
+        return postings[0]
+    return np.unique(np.concatenate(postings))
+
+
+def intersect_rows(a: Any, b: Any) -> Any:
+    """昇順行番号配列の積集合。小さい側の各要素を大きい側で二分探索する（O(小 log 大)）"""
+    if a.size > b.size:
+        a, b = b, a
+    if a.size == 0:
+        return a
+    positions = np.searchsorted(b, a)
+    found = positions < b.size
+    found[found] = b[positions[found]] == a[found]
+    return a[found]
+
+
+def group_rows(codes: Any, groups: int) -> List[Any]:
+    """コード配列 → コード毎の昇順行番号配列"""
+    order = np.argsort(codes, kind="stable").astype(np.int64)
+    bounds = np.cumsum(np.bincount(codes, minlength=groups))[:-1]
+    return np.split(order, bounds) if groups else []
+
+
+def parse_float(value: Any) -> Optional[float]:
+    """`_extract_numeric_field` と同じ規則（None・float() 失敗は None）"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def effect_damages(item: Dict[str, Any]) -> List[int]:
+    """effect_1〜5 それぞれの最初の「Nダメージ」の N"""
+    damages = []
+    for field in EFFECT_FIELDS:
+        if field in item and item[field]:
+            match = DAMAGE_PATTERN.search(str(item[field]))
+            if match:
+                damages.append(int(match.group(1)))
+    return damages
+
+
+def parse_int(value: Any) -> Optional[int]:
+    """`int(value)` が成功すればその値、失敗すれば None"""
+    try:
+        return int(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+class NumericColumn:
+    """int64 値 + 有効マスク"""
+
+    def __init__(self, values: Any, valid: Any, complete: bool = True) -> None:
+        self.values = values
+        self.valid = valid
+        # complete=False: int() は成功するが int64 に収まらない値がある（その行は valid=False）
+        self.complete = complete
+
+    @classmethod
+    def build(cls, cards: Sequence[Dict[str, Any]], field: str) -> "NumericColumn":
+        n = len(cards)
+        values = np.zeros(n, dtype=np.int64)
+        valid = np.zeros(n, dtype=bool)
+        complete = True
+        for i, item in enumerate(cards):
+            parsed = parse_int(item.get(field, 0))
+            if parsed is None:
+                continue
+            if -(2 ** 63) <= parsed < 2 ** 63:
+                values[i] = parsed
+                valid[i] = True
+            else:
+                complete = False
+        return cls(values, valid, complete)
+
+    def between(self, low: Optional[int], high: Optional[int]) -> Any:
+        """low <= 値 <= high（None は無制限）かつ有効な行"""
+        mask = self.valid.copy()
+        if low is not None:
+            mask &= self.values >= low
+        if high is not None:
+            mask &= self.values <= high
+        return mask
+
+    def between_rows(self, rows: Any, low: Optional[int], high: Optional[int]) -> Any:
+        """between を指定行だけで評価したマスク（rows と同じ長さ）"""
+        values = self.values[rows]
+        mask = self.valid[rows]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+
+
+class CategoricalColumn:
+    """カテゴリ表（出現順）+ 行毎のコード"""
+
+    def __init__(self, categories: List[Optional[str]], codes: Any) -> None:
+        self.categories = categories
+        self.codes = codes
+        self.lookup = {c: i for i, c in enumerate(categories)}
+        self.postings = group_rows(codes, len(categories))
+        self._ranks: Dict[str, Any] = {}
+
+    @classmethod
+    def build(cls, cards: Sequence[Dict[str, Any]], field: str) -> "CategoricalColumn":
+        lookup: Dict[Optional[str], int] = {}
+        codes = np.empty(len(cards), dtype=np.int32)
+        for i, item in enumerate(cards):
+            value = str(item[field]) if field in item else None
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            codes[i] = code
+        return cls(list(lookup), codes)
+
+    def label(self, code: int, missing: str = "") -> str:
+        value = self.categories[code]
+        return missing if value is None else value
+
+    def _rows_for(self, selected: Iterable[int]) -> Any:
+        return union_rows([self.postings[i] for i in selected])
+
+    def equals(self, value: str, missing: str = "") -> Any:
+        """`str(item.get(field, missing)) == value` の行番号（昇順）"""
+        return self._rows_for(i for i in range(len(self.categories)) if self.label(i, missing) == value)
+
+    def contains(self, needle: str, missing: str = "") -> Any:
+        """`needle in str(item.get(field, missing))` の行番号（昇順）"""
+        return self._rows_for(i for i in range(len(self.categories)) if needle in self.label(i, missing))
+
+    def sort_ranks(self, missing: str = "") -> Any:
+        """行毎の文字列順位（同じ文字列は同順位）。初回のみ計算"""
+        ranks = self._ranks.get(missing)
+        if ranks is None:
+            labels = [self.label(i, missing) for i in range(len(self.categories))]
+            position = {label: rank for rank, label in enumerate(sorted(set(labels)))}
+            table = np.array([position[label] for label in labels], dtype=np.int64)
+            ranks = self._ranks[missing] = table[self.codes]
+        return ranks
+
+
+class SortedValues:
+    """(値, 行) を値の昇順・同値は行の昇順に並べた索引
+
+    1 行が複数の値を持ってもよい（ダメージ値）。NaN を含む場合は usable=False（従来処理を使う）。
+    """
+
+    def __init__(self, values: Any, rows: Any) -> None:
+        order = np.lexsort((rows, values))
+        self.values = values[order]
+        self.rows = rows[order]
+        self.usable = not bool(np.isnan(self.values).any())
+        self._descending_rows: Optional[Any] = None
+
+    @classmethod
+    def from_field(cls, cards: Sequence[Dict[str, Any]], field: str) -> "SortedValues":
+        values, rows = [], []
+        for i, item in enumerate(cards):
+            value = parse_float(item.get(field))
+            if value is not None:
+                values.append(value)
+                rows.append(i)
+        return cls(np.array(values, dtype=np.float64), np.array(rows, dtype=np.int64))
+
+    @classmethod
+    def from_damages(cls, damages: Sequence[Sequence[int]]) -> "SortedValues":
+        values = [value for row_values in damages for value in row_values]
+        rows = [i for i, row_values in enumerate(damages) for _ in row_values]
+        index = cls(np.array(values, dtype=np.float64), np.array(rows, dtype=np.int64))
+        index.usable = index.usable and all(abs(value) <= EXACT_FLOAT_LIMIT for value in values)
+        return index
+
+    @property
+    def size(self) -> int:
+        return int(self.values.size)
+
+    def max_rows(self) -> Any:
+        """最大値を持つ行（行の昇順）"""
+        if not self.size:
+            return self.rows
+        return self.rows[np.searchsorted(self.values, self.values[-1], side="left"):]
+
+    def min_rows(self) -> Any:
+        """最小値を持つ行（行の昇順）"""
+        if not self.size:
+            return self.rows
+        return self.rows[:np.searchsorted(self.values, self.values[0], side="right")]
+
+    def top_rows(self, count: int) -> Any:
+        """値の降順（同値は行の昇順）で先頭 count 行"""
+        if self._descending_rows is None:
+            order = np.lexsort((self.rows, -self.values))
+            self._descending_rows = self.rows[order]
+        return self._descending_rows[:max(count, 0)]
+
+    def range_positions(
+        self, low: float, high: float, include_low: bool = True, include_high: bool = True
+    ) -> Tuple[int, int]:
+        """low〜high の値が並ぶ区間 [start, stop)（二分探索）"""
+        start = int(np.searchsorted(self.values, low, side="left" if include_low else "right"))
+        stop = int(np.searchsorted(self.values, high, side="right" if include_high else "left"))
+        return start, max(start, stop)
+
+    def range_rows(self, low: float, high: float, include_low: bool = True, include_high: bool = True) -> Any:
+        """low〜high の値を持つ行（昇順・重複なし）"""
+        start, stop = self.range_positions(low, high, include_low, include_high)
+        return np.unique(self.rows[start:stop])
+
+
+class KeywordPostings:
+    """keywords の各要素（`str(k).lower()`）→ その要素を持つカードの行番号（keywords が list のカードのみ）"""
+
+    def __init__(self, cards: Sequence[Dict[str, Any]]) -> None:
+        rows: Dict[str, List[int]] = {}
+        for i, item in enumerate(cards):
+            keywords = item.get("keywords", [])
+            if not isinstance(keywords, list):
+                continue
+            for keyword in keywords:
+                posting = rows.setdefault(str(keyword).lower(), [])
+                if not posting or posting[-1] != i:
+                    posting.append(i)
+        self.postings = {term: np.array(posting, dtype=np.int64) for term, posting in rows.items()}
+
+    def containing(self, needle: str) -> Any:
+        """`needle.lower()` を部分文字列に含む要素を 1 つ以上持つ行番号（昇順）"""
+        needle = needle.lower()
+        return union_rows([posting for term, posting in self.postings.items() if needle in term])
+
+
+class CardIndex:
+    """カードリストの列指向ビュー（構築後は読み取り専用として扱う）"""
+
+    def __init__(self, cards: List[Dict[str, Any]], previous: Optional["CardIndex"] = None) -> None:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for CardIndex")
+        self.cards = cards
+        self.size = len(cards)
+        self.numeric = {field: NumericColumn.build(cards, field) for field in NUMERIC_FIELDS}
+        self.categorical = {field: CategoricalColumn.build(cards, field) for field in CATEGORICAL_FIELDS}
+        self.keywords = KeywordPostings(cards)
+        self.sorted_values = {field: SortedValues.from_field(cards, field) for field in NUMERIC_FIELDS}
+        self.sorted_values["damage"] = SortedValues.from_damages([effect_damages(item) for item in cards])
+        self.row_of = {id(item): i for i, item in enumerate(cards)}
+        # クエリ文字列毎の判定結果（マスク等）。索引と同じ寿命で、件数は MEMO_MAX_ENTRIES まで
+        self._memo: Dict[Any, Any] = {}
+        # n-gram インデックスは初回利用時に構築（直前の索引で構築済みのものは引き継ぎ候補）
+        self._text_indexes: Dict[str, NgramIndex] = {}
+        self._previous_text_indexes = dict(previous._text_indexes) if previous is not None else {}
+        self._text_failures: Optional[Any] = None
+        # (sort_by, descending) → 全行の整列ビュー（数値列に変換不能な値があれば None）
+        self._sorted_views: Dict[Tuple[str, bool], Optional[Any]] = {}
+        # (クエリ, sort_by, descending) → 整列済みの結果行
+        self._page_cache: "OrderedDict[Tuple[str, Optional[str], bool], Any]" = OrderedDict()
+        # 部分一致検索用: 小文字化した name / effect_1 / effect_2 / class / type を "\x00" で連結
+        # （区切り文字を含まないクエリはフィールドを跨いで一致しないので、従来の各フィールド判定と同じ）
+        self.search_text = [
+            "\x00".join(str(item.get(field, "")).lower() for field in SEARCH_TEXT_FIELDS)
+            for item in cards
+        ]
+
+    def is_current(self, cards: Any) -> bool:
+        """data_cache が差し替え・追加削除されていないか（同一リスト・同件数）"""
+        return cards is self.cards and len(cards) == self.size
+
+    def select(self, rows: Any, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """昇順行番号配列を offset / limit で切り出してカードに戻す"""
+        rows = rows[offset:] if limit is None else rows[offset:offset + limit]
+        return [self.cards[i] for i in rows.tolist()]
+
+    def take(self, rows: Any) -> List[Dict[str, Any]]:
+        return [self.cards[i] for i in rows.tolist()]
+
+    def _text_index(self, name: str, build_texts: Callable[[], List[str]]) -> NgramIndex:
+        index = self._text_indexes.get(name)
+        if index is None:
+            index = NgramIndex.build(build_texts(), self._previous_text_indexes.pop(name, None))
+            self._text_indexes[name] = index
+        return index
+
+    @property
+    def search_ngrams(self) -> NgramIndex:
+        """search_text（ページネーション検索の対象）の n-gram インデックス"""
+        return self._text_index("search", lambda: self.search_text)
+
+    @property
+    def full_text(self) -> NgramIndex:
+        """build_searchable_text（小文字化）の n-gram インデックス。テキストを作れない行は空文字"""
+        def build_texts() -> List[str]:
+            texts, failures = [], []
+            for i, item in enumerate(self.cards):
+                try:
+                    texts.append(build_searchable_text(item).lower())
+                except Exception:
+                    texts.append("")
+                    failures.append(i)
+            self._text_failures = set(failures)
+            return texts
+
+        return self._text_index("full", build_texts)
+
+    def build_text_indexes(self) -> None:
+        """全文・ページネーション検索の n-gram インデックスを前倒しで構築（初回利用時の構築を避ける）"""
+        self.full_text  # noqa: B018
+        self.search_ngrams  # noqa: B018
+
+    def text_failed(self, row: int) -> bool:
+        """build_searchable_text が例外になる行か（従来処理に任せる）"""
+        if self._text_failures is None:
+            self.full_text  # noqa: B018 - 構築時に失敗行が決まる
+        return row in (self._text_failures or set())
+
+    def sorted_field(self, field: str) -> Optional[SortedValues]:
+        """field の整列済み索引（未対応フィールド・NaN を含む場合は None）"""
+        index = self.sorted_values.get(field)
+        return index if index is not None and index.usable else None
+
+    def memoize(self, key: Any, compute: Callable[[], Any]) -> Any:
+        if key in self._memo:
+            return self._memo[key]
+        if len(self._memo) >= MEMO_MAX_ENTRIES:
+            self._memo.clear()
+        value = self._memo[key] = compute()
+        return value
+
+    def filter_rows(
+        self,
+        class_filter: Optional[str] = None,
+        rarity_filter: Optional[str] = None,
+        cost_min: Optional[int] = None,
+        cost_max: Optional[int] = None,
+        hp_min: Optional[int] = None,
+        hp_max: Optional[int] = None,
+        attack_min: Optional[int] = None,
+        attack_max: Optional[int] = None,
+        type_filter: Optional[str] = None,
+        keywords_filter: Optional[List[str]] = None,
+    ) -> Any:
+        """search_by_filters と同じ条件の行番号（昇順）
+
+        カテゴリ・キーワード条件は posting list の積集合（小さい順）で絞り込み、
+        数値範囲は残った候補行の列値だけを比較する。カテゴリ条件が無い場合のみ数値列全体を走査する。
+        """
+        postings = []
+        if class_filter:
+            postings.append(self.categorical["class"].equals(class_filter))
+        if rarity_filter:
+            postings.append(self.categorical["rarity"].equals(rarity_filter))
+        if type_filter:
+            postings.append(self.categorical["type"].contains(type_filter))
+        for keyword in keywords_filter or []:
+            postings.append(self.keywords.containing(keyword))
+
+        ranges = [
+            (self.numeric[field], low, high)
+            for field, low, high in (("cost", cost_min, cost_max), ("hp", hp_min, hp_max), ("attack", attack_min, attack_max))
+            if low is not None or high is not None
+        ]
+        if not postings:
+            mask = np.ones(self.size, dtype=bool)
+            for column, low, high in ranges:
+                mask &= column.between(low, high)
+            return np.flatnonzero(mask)
+
+        postings.sort(key=len)
+        rows = postings[0]
+        for posting in postings[1:]:
+            if rows.size == 0:
+                break
+            rows = intersect_rows(rows, posting)
+        for column, low, high in ranges:
+            if rows.size == 0:
+                break
+            rows = rows[column.between_rows(rows, low, high)]
+        return rows
+
+    def text_rows(self, query_lower: str) -> Any:
+        """name / effect_1 / effect_2 / class / type のいずれかに部分一致する行（昇順）"""
+        if "\x00" in query_lower:
+            return np.flatnonzero(np.array([
+                any(query_lower in str(item.get(field, "")).lower() for field in SEARCH_TEXT_FIELDS)
+                for item in self.cards
+            ], dtype=bool))
+        return self.search_ngrams.rows_containing(query_lower)
+
+    def sort_rows(self, rows: Any, sort_by: str, descending: bool) -> Any:
+        """行番号列を sort_by で安定ソート（数値列に変換不能な値があれば従来どおり並べ替えない）"""
+        if sort_by in self.numeric:
+            column = self.numeric[sort_by]
+            if not column.valid[rows].all():
+                return rows
+            keys = column.values[rows]
+        else:
+            keys = self.categorical[sort_by].sort_ranks()[rows]
+        order = np.argsort(-keys if descending else keys, kind="stable")
+        return rows[order]
+
+    def sorted_view(self, sort_by: str, descending: bool) -> Optional[Any]:
+        """全行を sort_by で安定ソートした行番号（初回のみ計算。数値列に変換不能な値があれば None）"""
+        key = (sort_by, descending)
+        if key not in self._sorted_views:
+            column = self.numeric.get(sort_by)
+            if column is not None and not column.valid.all():
+                self._sorted_views[key] = None
+            else:
+                self._sorted_views[key] = self.sort_rows(np.arange(self.size, dtype=np.int64), sort_by, descending)
+        return self._sorted_views[key]
+
+    def ordered_rows(self, query_lower: str, sort_by: Optional[str], descending: bool) -> Any:
+        """search_cards_with_pagination の結果行（部分一致 → 安定ソート）。クエリ・並び順毎にキャッシュする
+
+        整列ビューを結果行のマスクで絞り込むと、結果行だけを安定ソートした場合と同じ順序になる。
+        """
+        key = (query_lower, sort_by, descending)
+        rows = self._page_cache.get(key)
+        if rows is not None:
+            self._page_cache.move_to_end(key)
+            return rows
+        rows = self.text_rows(query_lower) if query_lower else np.arange(self.size, dtype=np.int64)
+        if sort_by is not None:
+            view = self.sorted_view(sort_by, descending)
+            if view is None:
+                rows = self.sort_rows(rows, sort_by, descending)
+            elif rows.size == self.size:
+                rows = view
+            else:
+                selected = np.zeros(self.size, dtype=bool)
+                selected[rows] = True
+                rows = view[selected[view]]
+        self._page_cache[key] = rows
+        if len(self._page_cache) > PAGE_CACHE_MAX_ENTRIES:
+            self._page_cache.popitem(last=False)
+        return rows
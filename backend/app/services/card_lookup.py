@@ -0,0 +1,72 @@
+"""
+カード ID・正規化済みカード名のハッシュ索引
+
+bulk_get_card_details / get_card_by_id の「識別子 × 全カード」の走査を辞書引きに置き換える。
+- キーは従来の比較と同じ: ID は `str(item.get("id", ""))`、名前は `_normalize_title(str(item.get("name", "")))`
+- 同じキーのカードが複数ある場合は data_cache で先に現れるカード（従来の走査で最初に一致するカード）
+- スナップショットの構築時に作る。add_cards / update_card は写し（copy）に add / replace で反映する
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class CardLookup:
+    """id / 正規化済み name → カード"""
+
+    FIELDS = ("id", "name")
+
+    def __init__(self, cards: List[Dict[str, Any]], normalize_title: Callable[[str], str]) -> None:
+        self.cards = cards
+        self.size = len(cards)
+        self.normalize_title = normalize_title
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        for item in cards:
+            self.by_id.setdefault(str(item.get("id", "")), item)
+            self.by_name.setdefault(normalize_title(str(item.get("name", ""))), item)
+
+    def is_current(self, cards: Any) -> bool:
+        """data_cache が差し替え・追加削除されていないか（同一リスト・同件数）"""
+        return cards is self.cards and len(cards) == self.size
+
+    def copy(self, cards: List[Dict[str, Any]]) -> "CardLookup":
+        """cards（この索引のカードリストを写して変更したもの）用の写し"""
+        lookup = CardLookup.__new__(CardLookup)
+        lookup.cards = cards
+        lookup.size = self.size
+        lookup.normalize_title = self.normalize_title
+        lookup.by_id = dict(self.by_id)
+        lookup.by_name = dict(self.by_name)
+        return lookup
+
+    def add(self, item: Dict[str, Any]) -> None:
+        """data_cache の末尾に追加されたカード（既存のキーは先に現れたカードのまま）"""
+        self.by_id.setdefault(str(item.get("id", "")), item)
+        self.by_name.setdefault(self.normalize_title(str(item.get("name", ""))), item)
+        self.size += 1
+
+    def replace(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """old を id・名前が同じ new に置き換える"""
+        id_key = str(old.get("id", ""))
+        if self.by_id.get(id_key) is old:
+            self.by_id[id_key] = new
+        name_key = self.normalize_title(str(old.get("name", "")))
+        if self.by_name.get(name_key) is old:
+            self.by_name[name_key] = new
+
+    def get(self, identifier: Any, by_field: str = "id") -> Optional[Dict[str, Any]]:
+        if by_field == "id":
+            return self.by_id.get(str(identifier))
+        if by_field == "name":
+            return self.by_name.get(self.normalize_title(str(identifier)))
+        return None
+
+    def get_many(self, identifiers: Sequence[Any], by_field: str = "id") -> List[Optional[Dict[str, Any]]]:
+        """識別子と同じ順序・同じ件数（見つからない識別子は None）"""
+        if by_field == "id":
+            by_id = self.by_id
+            return [by_id.get(str(identifier)) for identifier in identifiers]
+        if by_field == "name":
+            by_name, normalize = self.by_name, self.normalize_title
+            return [by_name.get(normalize(str(identifier))) for identifier in identifiers]
+        return [None] * len(identifiers)
@@ -0,0 +1,159 @@
+"""
+DatabaseService のカードデータと派生索引一式（スナップショット）
+
+reload_data / reload_data_async はカード読み込みと全索引の構築を新しいスナップショット上で済ませてから、
+DatabaseService._snapshot への 1 回の代入で公開する。読み取り側は常にどちらか一方の版の
+カード・title_to_data・索引・統計の組を見る（構築途中の状態や新旧の混在は見えない）。
+- 公開後のスナップショットは変更しない。add_cards / update_card / remove_cards も
+  with_added / with_updated / with_removed でカードリスト・辞書・統計・索引を写した新しいスナップショットを作り、差し替える
+- 構築はスレッドから行ってよい（DatabaseService の状態に触れない）
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import time
+
+from .card_index import CardIndex, NUMPY_AVAILABLE, effect_damages
+from .card_lookup import CardLookup
+from .card_statistics import CardStatistics
+
+
+class CardSnapshot:
+    """ある版のカードリストと、それに対応する索引（build で構築する）"""
+
+    __slots__ = (
+        "cards", "title_to_data", "effect_damage_cache",
+        "card_index", "card_lookup", "card_statistics",
+        "version", "built_at",
+    )
+
+    def __init__(
+        self,
+        cards: List[Dict[str, Any]],
+        title_to_data: Dict[str, Dict[str, Any]],
+        effect_damage_cache: Dict[int, Tuple[Dict[str, Any], List[int]]],
+        card_index: Optional[CardIndex],
+        card_lookup: CardLookup,
+        card_statistics: CardStatistics,
+        version: Optional[str] = None,
+    ) -> None:
+        self.cards = cards
+        self.title_to_data = title_to_data
+        self.effect_damage_cache = effect_damage_cache
+        self.card_index = card_index
+        self.card_lookup = card_lookup
+        self.card_statistics = card_statistics
+        self.version = version
+        self.built_at = time.time()
+
+    @classmethod
+    def build(
+        cls,
+        cards: List[Dict[str, Any]],
+        normalize_title: Callable[[str], str],
+        version: Optional[str] = None,
+        previous: Optional["CardSnapshot"] = None,
+        title_to_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        card_lookup: Optional[CardLookup] = None,
+        card_statistics: Optional[CardStatistics] = None,
+    ) -> "CardSnapshot":
+        """全索引を構築済みのスナップショット
+
+        previous の n-gram インデックスと効果ダメージの解析結果は引き継ぎ候補（同じテキスト・同じカードなら再利用）。
+        title_to_data / card_lookup / card_statistics は cards に合わせて差分更新済みのものがあれば渡す。
+        """
+        if title_to_data is None:
+            title_to_data = {}
+            for item in cards:
+                # nameフィールドがキー（正規化処理を強化）
+                name = item.get("name")
+                if name:
+                    title_to_data[normalize_title(str(name))] = item
+        # 効果のダメージ値はカード毎に 1 度だけ解析する
+        parsed = previous.effect_damage_cache if previous is not None else {}
+        effect_damage_cache = {}
+        for item in cards:
+            cached = parsed.get(id(item))
+            effect_damage_cache[id(item)] = cached if cached is not None and cached[0] is item else (item, effect_damages(item))
+        card_index = None
+        if NUMPY_AVAILABLE:
+            card_index = CardIndex(cards, previous=previous.card_index if previous is not None else None)
+            # n-gram インデックスも公開前に構築する（公開後の最初の検索が構築を待たないように）
+            card_index.build_text_indexes()
+        return cls(
+            cards,
+            title_to_data,
+            effect_damage_cache,
+            card_index,
+            card_lookup if card_lookup is not None else CardLookup(cards, normalize_title),
+            card_statistics if card_statistics is not None else CardStatistics.build(cards, card_index),
+            version=version,
+        )
+
+    def with_added(self, items: Sequence[Dict[str, Any]], normalize_title: Callable[[str], str]) -> "CardSnapshot":
+        """items を末尾に追加したスナップショット（統計・id / 名前の索引は写しに差分で反映）"""
+        cards = self.cards + list(items)
+        title_to_data = dict(self.title_to_data)
+        lookup = self.card_lookup.copy(cards)
+        stats = self.card_statistics.copy(cards)
+        for item in items:
+            stats.add(item)
+            lookup.add(item)
+            name = item.get("name")
+            if name:
+                title_to_data[normalize_title(str(name))] = item
+        return self.build(cards, normalize_title, self.version, self, title_to_data, lookup, stats)
+
+    def with_updated(
+        self, card_id: str, changes: Dict[str, Any], normalize_title: Callable[[str], str]
+    ) -> Tuple["CardSnapshot", Optional[Dict[str, Any]]]:
+        """ID が一致する最初のカードを changes を反映した写しに置き換えたスナップショットと、その写し
+
+        見つからなければ (self, None)。元のカード辞書は変更しない。
+        """
+        item = self.card_lookup.get(card_id, "id")
+        if item is None:
+            return self, None
+        updated = {**item, **changes}
+        cards = [updated if card is item else card for card in self.cards]
+        stats = self.card_statistics.copy(cards)
+        stats.remove(item)
+        stats.add(updated)
+        title_to_data = {title: updated if card is item else card for title, card in self.title_to_data.items()}
+        lookup: Optional[CardLookup] = None
+        if all(item.get(field) == updated.get(field) for field in CardLookup.FIELDS):
+            lookup = self.card_lookup.copy(cards)
+            lookup.replace(item, updated)
+        else:
+            # id・名前が変わった場合は同じキーを持つ別のカードが繰り上がるため、索引は作り直す
+            old_name = normalize_title(str(item.get("name") or ""))
+            if title_to_data.get(old_name) is updated:
+                del title_to_data[old_name]
+            if updated.get("name"):
+                title_to_data[normalize_title(str(updated["name"]))] = updated
+        return self.build(cards, normalize_title, self.version, self, title_to_data, lookup, stats), updated
+
+    def with_removed(self, card_ids: Sequence[str], normalize_title: Callable[[str], str]) -> Tuple["CardSnapshot", int]:
+        """ID が一致するカードをすべて除いたスナップショットと削除件数"""
+        targets = {str(card_id) for card_id in card_ids}
+        cards = [item for item in self.cards if str(item.get("id", "")) not in targets]
+        removed = len(self.cards) - len(cards)
+        if not removed:
+            return self, 0
+        stats = self.card_statistics.copy(cards)
+        title_to_data = dict(self.title_to_data)
+        for item in self.cards:
+            if str(item.get("id", "")) not in targets:
+                continue
+            stats.remove(item)
+            name = normalize_title(str(item.get("name") or ""))
+            if title_to_data.get(name) is item:
+                del title_to_data[name]
+        return self.build(cards, normalize_title, self.version, self, title_to_data, None, stats), removed
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "built_at": self.built_at,
+            "cards": len(self.cards),
+            "indexed": self.card_index is not None,
+        }
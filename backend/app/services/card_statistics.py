@@ -0,0 +1,132 @@
+"""
+get_statistics の集計（クラス・レアリティ・コストのヒストグラム、HP・攻撃力の範囲）
+
+reload_data で 1 度だけ構築し、add_cards / update_card / remove_cards では写し（copy）をカード単位の差分で更新する。
+get_statistics は保持している集計を返すだけ（カタログの件数に依存しない）。
+- 構築: CardIndex があればカテゴリコードの np.bincount / 数値列の np.unique、なければカード毎の加算
+- 集計の定義は従来の走査と同じ: クラス・レアリティは `str(item.get(field, "不明"))`、
+  コストは `int(item.get("cost", 0))` が成功した値、HP・攻撃力は正の値の最小・最大（なければ 0）
+- 範囲は値毎の件数で保持し、最小・最大の値を持つ最後のカードが削除されたときだけ残りの値から求め直す
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+
+from .card_index import NUMPY_AVAILABLE, np, parse_int
+
+RANGE_FIELDS = ("hp", "attack")
+
+
+def _increment(counts: Dict[Any, int], key: Any, delta: int) -> None:
+    count = counts.get(key, 0) + delta
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+class CardStatistics:
+    """カード集合の統計（差分更新可能）"""
+
+    def __init__(self, cards: List[Dict[str, Any]]) -> None:
+        self.cards = cards
+        self.size = 0
+        self.classes: Dict[str, int] = {}
+        self.rarities: Dict[str, int] = {}
+        self.cost_distribution: Dict[int, int] = {}
+        # 正の値 → 件数
+        self.range_values: Dict[str, Dict[int, int]] = {field: {} for field in RANGE_FIELDS}
+        self.ranges: Dict[str, Dict[str, int]] = {field: {"min": 0, "max": 0} for field in RANGE_FIELDS}
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def build(cls, cards: List[Dict[str, Any]], index: Any = None) -> "CardStatistics":
+        """cards の統計（index は同じ cards の CardIndex。あれば列をまとめて数える）"""
+        stats = cls(cards)
+        if index is not None and NUMPY_AVAILABLE:
+            stats._count_columns(index)
+        else:
+            for item in cards:
+                stats._apply(item, 1)
+        stats.size = len(cards)
+        return stats
+
+    def is_current(self, cards: Any) -> bool:
+        """data_cache が差し替え・追加削除されていないか（同一リスト・同件数）"""
+        return cards is self.cards and len(cards) == self.size
+
+    def copy(self, cards: List[Dict[str, Any]]) -> "CardStatistics":
+        """cards（この統計のカードリストを写して変更したもの）用の写し"""
+        stats = CardStatistics(cards)
+        stats.size = self.size
+        stats.classes = dict(self.classes)
+        stats.rarities = dict(self.rarities)
+        stats.cost_distribution = dict(self.cost_distribution)
+        stats.range_values = {field: dict(values) for field, values in self.range_values.items()}
+        stats.ranges = {field: dict(current) for field, current in self.ranges.items()}
+        return stats
+
+    def add(self, item: Dict[str, Any]) -> None:
+        self._apply(item, 1)
+        self.size += 1
+
+    def remove(self, item: Dict[str, Any]) -> None:
+        self._apply(item, -1)
+        self.size -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """get_statistics の戻り値（変更がなければ前回組み立てた内容の写し）"""
+        if self._snapshot is None:
+            self._snapshot = {
+                "total_cards": self.size,
+                "classes": dict(self.classes),
+                "rarities": dict(self.rarities),
+                "cost_distribution": dict(self.cost_distribution),
+                "hp_range": dict(self.ranges["hp"]),
+                "attack_range": dict(self.ranges["attack"]),
+            }
+        snapshot = self._snapshot
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in snapshot.items()}
+
+    def _apply(self, item: Dict[str, Any], delta: int) -> None:
+        self._snapshot = None
+        _increment(self.classes, str(item.get("class", "不明")), delta)
+        _increment(self.rarities, str(item.get("rarity", "不明")), delta)
+        cost = parse_int(item.get("cost", 0))
+        if cost is not None:
+            _increment(self.cost_distribution, cost, delta)
+        for field in RANGE_FIELDS:
+            value = parse_int(item.get(field, 0))
+            if value is None or value <= 0:
+                continue
+            values = self.range_values[field]
+            _increment(values, value, delta)
+            current = self.ranges[field]
+            if delta > 0:
+                if len(values) == 1 or value < current["min"]:
+                    current["min"] = value
+                current["max"] = max(current["max"], value)
+            elif value not in values and value in (current["min"], current["max"]):
+                current["min"] = min(values, default=0)
+                current["max"] = max(values, default=0)
+
+    def _count_columns(self, index: Any) -> None:
+        """CardIndex の列から一括集計（カテゴリは出現順、件数は bincount）"""
+        for field, counts in (("class", self.classes), ("rarity", self.rarities)):
+            column = index.categorical[field]
+            totals = np.bincount(column.codes, minlength=len(column.categories))
+            for code in np.flatnonzero(totals).tolist():
+                label = column.label(code, missing="不明")
+                counts[label] = counts.get(label, 0) + int(totals[code])
+        cost = index.numeric["cost"]
+        values = cost.values[cost.valid]
+        if values.size:
+            distinct, first, value_counts = np.unique(values, return_index=True, return_counts=True)
+            for i in np.argsort(first, kind="stable").tolist():
+                self.cost_distribution[int(distinct[i])] = int(value_counts[i])
+        for field in RANGE_FIELDS:
+            column = index.numeric[field]
+            positive = column.values[column.valid & (column.values > 0)]
+            if positive.size:
+                distinct, value_counts = np.unique(positive, return_counts=True)
+                self.range_values[field] = dict(zip(distinct.tolist(), value_counts.tolist()))
+                self.ranges[field] = {"min": int(distinct[0]), "max": int(distinct[-1])}
@@ -1,13 +1,65 @@
 import re
 import os
 import json
+import time
+import base64
 import asyncio
-from typing import List, Dict, Any, Optional
+import operator
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Callable, Generic, Iterator, Optional, Tuple, TypeVar, overload
 from ..core.logging import GameChatLogger
 from ..core.config import settings
 from ..core.exceptions import DatabaseServiceException
+from .card_lookup import CardLookup
+from .card_index import CardIndex, effect_damages, np
+from .card_statistics import CardStatistics
+from .card_snapshot import CardSnapshot
+from .card_data_reloader import CardDataReloader
+from .json_stream import JsonContainerStream
+from .filter_plan import EFFECT_TERM_SEPARATOR, FilterPlan, compile_filter_plan, fallback_plan, iter_matches
+from .text_index import bm25_weights, build_searchable_text
+from .query_analysis_cache import QueryAnalysisCache
+from .query_rule_parser import RuleBasedQueryParser
+
+
+T = TypeVar("T")
+
+
+class _SnapshotField(Generic[T]):
+    """現在のスナップショット（DatabaseService._snapshot）の属性への読み取り専用アクセサ
+
+    公開済みのスナップショットは変更しない。カードの差し替えは data / add_cards 等で新しいスナップショットを公開する。
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+
+    @overload
+    def __get__(self, obj: None, owner: Any) -> "_SnapshotField[T]": ...
+
+    @overload
+    def __get__(self, obj: "DatabaseService", owner: Any) -> T: ...
+
+    def __get__(self, obj: Optional["DatabaseService"], owner: Any) -> Any:
+        if obj is None:
+            return self
+        return getattr(obj._snapshot, self.field)
+
+    def __set__(self, obj: "DatabaseService", value: T) -> None:
+        # 未定義だとインスタンス属性が作られ、以後スナップショットの差し替えが見えなくなるため明示的に拒否する
+        raise AttributeError(f"{self.field} は読み取り専用です（新しいスナップショットを公開してください）")
+
 
 class DatabaseService:
+    # クエリ解析に使うモデル（プロンプト版数の一部としてキャッシュキーに含める）
+    QUERY_ANALYSIS_MODEL = "gpt-4o-mini"
+    # 一括解析モードでシステムプロンプトの後に付ける指示
+    QUERY_ANALYSIS_BATCH_INSTRUCTION = """
+【一括解析】
+ユーザーメッセージは複数のクエリを並べた JSON 配列です。各クエリを上記の形式で個別に解析し、
+{"analyses": [クエリ1の解析結果, クエリ2の解析結果, ...]} の形で、入力と同じ順序・同じ件数で返してください。
+"""
+
     # 集約クエリパターン定数
     AGGREGATION_PATTERNS = {
         'max': r'(一番高い|最大|最高|トップ)\s*(HP|ダメージ|攻撃力|コスト)',
@@ -22,6 +74,55 @@ class DatabaseService:
         'approximate': r'約(\d+)|(\d+)程度|およそ(\d+)|(\d+)くらい'
     }
     
+    # 正規表現レジストリ: すべてクラス定義時に 1 度だけコンパイルする（カード毎・呼び出し毎に re.compile のキャッシュを引かない）
+    AGGREGATION_REGEXES = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in AGGREGATION_PATTERNS.items()}
+    COMPLEX_NUMERIC_REGEXES = {name: re.compile(pattern) for name, pattern in COMPLEX_NUMERIC_PATTERNS.items()}
+    # _match_filterable_fallback のキーワード形式
+    COST_PREFIX_REGEX = re.compile(r"コスト(\d+)")  # "コストN"
+    COST_SUFFIX_REGEX = re.compile(r"(\d+)コスト")  # "Nコスト"
+    HP_KEYWORD_REGEX = re.compile(r"(HP|体力)(が)?(\d+)(以上|以下|未満|超|等しい)?")
+    ATTACK_KEYWORD_REGEX = re.compile(r"(攻撃|ダメージ)(\d+)(以上|以下|未満|超)?")
+    # _split_keywords の HP 条件
+    HP_SPLIT_REGEX = re.compile(r'(HP|体力)(が)?(\d+)(のエルフ|のドラゴン|の\w+)?')
+    # スコア計算のキーワード中の「N以上」等
+    NUMBER_CONDITION_REGEX = re.compile(r'(\d+)(以上|以下|未満|超)?')
+    # _normalize_title で除去する空白（全角・改行を含む）と記号
+    TITLE_NOISE_REGEX = re.compile(r"[\s\u3000（）()・]+")
+    # _split_query_to_keywords: (フィールド, 試す順のパターン)
+    QUERY_KEYWORD_REGEXES = (
+        ("コスト", tuple(re.compile(p) for p in (r'コスト(\d+)', r'(\d+)コスト', r'コストが(\d+)'))),
+        ("攻撃", tuple(re.compile(p) for p in (r'攻撃力が(\d+)', r'攻撃力(\d+)', r'攻撃(\d+)', r'ダメージ(\d+)'))),
+        ("HP", tuple(re.compile(p) for p in (r'HPが(\d+)', r'HP(\d+)', r'体力が(\d+)', r'体力(\d+)'))),
+    )
+    # _get_mock_query_analysis
+    MOCK_COST_REGEX = re.compile(r'(\d+)コスト|コスト(\d+)')
+    MOCK_HP_REGEX = re.compile(r'HP(\d+)(以上|以下)|体力(\d+)(以上|以下)')
+    MOCK_ATTACK_REGEX = re.compile(r'攻撃(\d+)(以上|以下)|ダメージ(\d+)(以上|以上)')
+    MOCK_RANGE_REGEXES = (
+        ("hp", re.compile(r'HP(\d+)から(\d+)の間')),
+        ("attack", re.compile(r'攻撃力(\d+)～(\d+)')),
+        ("cost", re.compile(r'コスト(\d+)-(\d+)')),
+        ("attack", re.compile(r'ダメージ(\d+)から(\d+)の間')),
+    )
+    MOCK_MULTIPLE_REGEXES = (
+        ("attack", re.compile(r'攻撃力(\d+)または(\d+)')),
+        ("attack", re.compile(r'攻撃力(\d+)か(\d+)')),
+        ("hp", re.compile(r'HP(\d+)または(\d+)')),
+        ("hp", re.compile(r'HP(\d+)か(\d+)')),
+        ("cost", re.compile(r'コスト(\d+)または(\d+)')),
+        ("cost", re.compile(r'コスト(\d+)か(\d+)')),
+    )
+    MOCK_APPROXIMATE_REGEXES = (
+        ("hp", re.compile(r'約HP(\d+)|HP(\d+)程度')),
+        ("attack", re.compile(r'約攻撃力(\d+)|攻撃力(\d+)程度')),
+        ("cost", re.compile(r'約コスト(\d+)|コスト(\d+)程度')),
+    )
+    NUMERIC_COMPARATORS = {"以上": operator.ge, "以下": operator.le, "未満": operator.lt, "超": operator.gt}
+    # キーワード毎の解析結果メモの上限
+    KEYWORD_MEMO_MAX_ENTRIES = 1024
+    # search_cards_with_pagination で並べ替えに使えるフィールド
+    PAGINATION_SORT_FIELDS = ("name", "cost", "hp", "attack", "class", "rarity")
+
     # フィールドマッピング辞書（多様な表現に対応）
     FIELD_MAPPINGS = {
         'cost': ['コスト', 'cost', 'マナコスト', 'マナ', 'mana'],
@@ -32,6 +133,15 @@ class DatabaseService:
         'rarity': ['レアリティ', 'rarity', '希少度'],
         'type': ['タイプ', 'type', '種族', '属性']
     }
+
+    # カード・索引は現在のスナップショットに保持し、reload_data はスナップショットごと差し替える
+    data_cache = _SnapshotField[List[Dict[str, Any]]]("cards")
+    title_to_data = _SnapshotField[Dict[str, Dict[str, Any]]]("title_to_data")
+    _effect_damage_cache = _SnapshotField[Dict[int, Tuple[Dict[str, Any], List[int]]]]("effect_damage_cache")
+    _card_index = _SnapshotField[Optional[CardIndex]]("card_index")
+    _card_lookup = _SnapshotField[CardLookup]("card_lookup")
+    _card_statistics = _SnapshotField[CardStatistics]("card_statistics")
+
     def __init__(self, data_path: Optional[str] = None):
         import os
         
@@ -46,16 +156,32 @@ class DatabaseService:
             base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
             self.data_path = os.path.join(base_dir, 'data/data.json')
         self.debug = False  # デバッグフラグ（パフォーマンス向上のため無効化）
+        # カードリスト・title_to_data・列指向インデックス・id / 名前の索引・統計の組（card_snapshot 参照）。
+        # reload_data は新しいスナップショットを構築し終えてから、この参照の代入 1 回で公開する
+        self._snapshot = CardSnapshot.build([], self._normalize_title)
+        # add_cards_async / update_card_async / remove_cards_async の直列化（同じ版から派生した更新の取りこぼしを防ぐ）
+        self._snapshot_update_lock = asyncio.Lock()
         
         # LLM初期化
         self._init_llm()
+        # LLM クエリ解析結果のキャッシュ（QUERY_ANALYSIS_CACHE_ENABLED=false で無効）
+        self.query_analysis_cache: Optional[QueryAnalysisCache] = QueryAnalysisCache.from_env()
+        self.query_analysis_version = QueryAnalysisCache.prompt_version(
+            self.query_analysis_prompt, self.QUERY_ANALYSIS_MODEL
+        )
+        # 定型クエリを LLM なしで解析する高速経路（QUERY_RULE_PARSER_ENABLED=false で無効）
+        self.query_rule_parser: Optional[RuleBasedQueryParser] = RuleBasedQueryParser.from_env()
+        # キーワード別解析の同時実行数・全体の期限（秒）・一括解析モード
+        self.query_analysis_concurrency = max(1, int(os.getenv("QUERY_ANALYSIS_CONCURRENCY", "4")))
+        self.query_analysis_deadline = float(os.getenv("QUERY_ANALYSIS_DEADLINE_SECONDS", "15"))
+        self.query_analysis_batch = os.getenv("QUERY_ANALYSIS_BATCH", "false").lower() == "true"
+        # _parse_fallback_keyword のキーワード毎の解析結果（KEYWORD_MEMO_MAX_ENTRIES 件で全消去）
+        self._fallback_keyword_memo: Dict[str, Dict[str, Any]] = {}
         
         # テストモードの場合はファイル読み込みをスキップ
         if is_test_mode:
             # テスト用の空データで初期化
             self.storage_service = None
-            self.data_cache: List[Dict[str, Any]] = []
-            self.title_to_data: Dict[str, Dict[str, Any]] = {}
             # dataプロパティも空で初期化（テストで上書きされる）
             self.data = []
         else:
@@ -64,16 +190,22 @@ class DatabaseService:
                 def __init__(self, file_path: str) -> None:
                     self.file_path = file_path
                 def load_data(self) -> list[dict[str, Any]]:
-                    import json
                     try:
+                        # ファイル全体を文字列として保持せず、カード 1 件ずつ読み込む
                         with open(self.file_path, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            return data if isinstance(data, list) else []
+                            stream = JsonContainerStream(f)
+                            return list(stream.values()) if stream.kind == "array" else []
                     except Exception as e:
                         print(f"[ERROR] データファイルの読み込みに失敗: {e}")
                         return []
                 def load_json_data(self) -> list[dict[str, Any]]:
                     return self.load_data()
+                def get_data_version(self) -> Optional[str]:
+                    try:
+                        stat = os.stat(self.file_path)
+                    except OSError:
+                        return None
+                    return f"{stat.st_mtime_ns}:{stat.st_size}"
 
             self.storage_service = JsonFileStorageService(self.data_path)
             self.reload_data()
@@ -337,15 +469,15 @@ cardsテーブル
     
     @data.setter
     def data(self, value: List[Dict[str, Any]]) -> None:
-        """テスト用のdataプロパティセッター"""
-        self.data_cache = value
+        """テスト用のdataプロパティセッター（索引を構築した新しいスナップショットを公開）"""
         # title_to_dataマッピングも更新
-        self.title_to_data = {}
+        title_to_data = {}
         if value:
             for item in value:
                 title = item.get("title") or item.get("name")
                 if title:
-                    self.title_to_data[title] = item
+                    title_to_data[title] = item
+        self._publish_snapshot(CardSnapshot.build(value, self._normalize_title, previous=self._snapshot, title_to_data=title_to_data))
 
     def _detect_aggregation_query(self, query: str) -> Dict[str, Any]:
         """集約クエリの検出"""
@@ -357,8 +489,8 @@ cardsテーブル
         }
         
         # 各パターンをチェック
-        for agg_type, pattern in self.AGGREGATION_PATTERNS.items():
-            match = re.search(pattern, query, re.IGNORECASE)
+        for agg_type, pattern in self.AGGREGATION_REGEXES.items():
+            match = pattern.search(query)
             if match:
                 aggregation_info["is_aggregation"] = True
                 aggregation_info["aggregation_type"] = agg_type  # str を代入
@@ -483,11 +615,8 @@ cardsテーブル
             "approximate_conditions": []
         }
         
-        import re
-        
         # 範囲指定パターンの検出
-        range_pattern = self.COMPLEX_NUMERIC_PATTERNS['range']
-        for match in re.finditer(range_pattern, query):
+        for match in self.COMPLEX_NUMERIC_REGEXES['range'].finditer(query):
             # パターンに応じて数値を抽出
             if match.group(1) and match.group(2):  # "NからMの間"
                 min_val, max_val = int(match.group(1)), int(match.group(2))
@@ -512,8 +641,7 @@ cardsテーブル
             })
         
         # 複数値パターンの検出
-        multiple_pattern = self.COMPLEX_NUMERIC_PATTERNS['multiple']
-        for match in re.finditer(multiple_pattern, query):
+        for match in self.COMPLEX_NUMERIC_REGEXES['multiple'].finditer(query):
             if match.group(1) and match.group(2):  # "NまたはM"
                 val1, val2 = int(match.group(1)), int(match.group(2))
             elif match.group(3) and match.group(4):  # "NかM"
@@ -529,8 +657,7 @@ cardsテーブル
             })
         
         # 近似値パターンの検出
-        approximate_pattern = self.COMPLEX_NUMERIC_PATTERNS['approximate']
-        for match in re.finditer(approximate_pattern, query):
+        for match in self.COMPLEX_NUMERIC_REGEXES['approximate'].finditer(query):
             if match.group(1):  # "約N"
                 value = int(match.group(1))
             elif match.group(2):  # "N程度"
@@ -613,22 +740,81 @@ cardsテーブル
         
         return False
 
+    def _match_complex_numeric_indexed(self, item: Dict[str, Any], keyword: str) -> Optional[bool]:
+        """複雑な数値条件（範囲・複数値・近似値）のいずれかに一致するかを索引で判定
+
+        キーワード毎の一致行マスクを索引にメモ化する。索引が使えない場合は None（従来の判定を使う）。
+        """
+        index = self._get_card_index()
+        if index is None:
+            return None
+        row = index.row_of.get(id(item))
+        if row is None:
+            return None
+        mask = index.memoize(("complex_numeric", keyword), lambda: self._complex_numeric_mask(index, keyword))
+        return None if mask is None else bool(mask[row])
+
+    def _complex_numeric_mask(self, index: CardIndex, keyword: str) -> Optional[Any]:
+        """_match_complex_numeric_condition をカード全件に適用した結果と同じマスク（対応外の条件があれば None）"""
+        conditions = self._parse_complex_numeric_conditions(keyword)
+        mask = np.zeros(index.size, dtype=bool)
+        typed = [("range", c) for c in conditions["range_conditions"]]
+        typed += [("multiple", c) for c in conditions["multiple_conditions"]]
+        typed += [("approximate", c) for c in conditions["approximate_conditions"]]
+        for condition_type, condition in typed:
+            field = condition.get("field", "unknown")
+            if field == "unknown":
+                continue
+            sorted_values = index.sorted_field(field)
+            if sorted_values is None:
+                return None
+            try:
+                if condition_type == "range":
+                    mask[sorted_values.range_rows(float(condition["min_value"]), float(condition["max_value"]))] = True
+                elif condition_type == "multiple":
+                    for value in condition["values"]:
+                        if float(value) != value:
+                            return None
+                        mask[sorted_values.range_rows(float(value), float(value))] = True
+                else:
+                    # |値 - target| <= tolerance は浮動小数の丸めがあるため、広めの区間を二分探索で取り出して厳密に判定
+                    target = float(condition["value"])
+                    tolerance = float(condition["tolerance"])
+                    margin = 2 * tolerance + 1
+                    start, stop = sorted_values.range_positions(target - margin, target + margin)
+                    values = sorted_values.values[start:stop]
+                    mask[sorted_values.rows[start:stop][np.abs(values - target) <= tolerance]] = True
+            except (ValueError, TypeError, OverflowError):
+                return None
+        return mask
+
     async def _analyze_query_with_llm(self, query: str) -> Dict[str, Any]:
-        """LLMを使用してクエリを解析し、構造化された検索条件を抽出"""
+        """LLMを使用してクエリを解析し、構造化された検索条件を抽出
+
+        ルールベース解析で十分な確信度が得られたクエリは LLM を呼ばない。
+        同じクエリ（正規化後）・同じプロンプト版数の解析結果は query_analysis_cache から返す。
+        """
         if self.is_mocked or self.llm_client is None:
             # モック環境の場合はダミーデータを返す
             return self._get_mock_query_analysis(query)
+
+        parser = self.query_rule_parser
+        if parser is not None:
+            rule_analysis = parser.try_parse(query)
+            if rule_analysis is not None:
+                if self.debug:
+                    print(f"[DEBUG] ルールベース解析を採用: {rule_analysis}")
+                return rule_analysis
+
+        cache = self.query_analysis_cache
+        if cache is not None:
+            cached = await cache.get(query, self.query_analysis_version)
+            if cached is not None:
+                return cached
         
         try:
-            response = self.llm_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": self.query_analysis_prompt},
-                    {"role": "user", "content": query}
-                ],
-                temperature=0.1,
-                max_tokens=500
-            )
+            started = time.perf_counter()
+            response = await self._create_query_analysis_completion(self.query_analysis_prompt, query, 500)
             
             content = response.choices[0].message.content
             if content is None:
@@ -640,13 +826,27 @@ cardsテーブル
             
             # JSONをパース
             analysis_result: dict[str, Any] = json.loads(content)
+            if cache is not None:
+                await cache.put(query, self.query_analysis_version, analysis_result, time.perf_counter() - started)
             return analysis_result
             
         except Exception as e:
             if self.debug:
                 print(f"[DEBUG] LLMクエリ解析エラー: {e}")
-            # エラー時はフォールバックとしてダミーデータを返す
+            # エラー時はフォールバックとしてダミーデータを返す（キャッシュしない）
             return self._get_mock_query_analysis(query)
+
+    def get_query_rule_parser_stats(self) -> Dict[str, Any]:
+        """ルールベース解析の採用率（LLM を呼ばずに済んだ割合）"""
+        if self.query_rule_parser is None:
+            return {"enabled": False}
+        return self.query_rule_parser.get_stats()
+
+    def get_query_analysis_cache_stats(self) -> Dict[str, Any]:
+        """クエリ解析キャッシュのヒット率・節約できた LLM 待ち時間"""
+        if self.query_analysis_cache is None:
+            return {"enabled": False}
+        return self.query_analysis_cache.get_stats()
     
     def _get_mock_query_analysis(self, query: str) -> Dict[str, Any]:
         """テスト・モック環境用のクエリ解析（拡張版）"""
@@ -666,23 +866,21 @@ cardsテーブル
             "qa_search": ""
         }
         
-        import re
-        
         # コスト検出
-        cost_match = re.search(r'(\d+)コスト|コスト(\d+)', query)
+        cost_match = self.MOCK_COST_REGEX.search(query)
         if cost_match:
             cost_val = int(cost_match.group(1) or cost_match.group(2))
             conditions["cost"] = {"value": cost_val, "operator": "等しい"}
         
         # HP検出
-        hp_match = re.search(r'HP(\d+)(以上|以下)|体力(\d+)(以上|以下)', query)
+        hp_match = self.MOCK_HP_REGEX.search(query)
         if hp_match:
             hp_val = int(hp_match.group(1) or hp_match.group(3))
             operator = hp_match.group(2) or hp_match.group(4)
             conditions["hp"] = {"value": hp_val, "operator": operator}
         
         # 攻撃力・ダメージ検出
-        attack_match = re.search(r'攻撃(\d+)(以上|以下)|ダメージ(\d+)(以上|以上)', query)
+        attack_match = self.MOCK_ATTACK_REGEX.search(query)
         if attack_match:
             attack_val = int(attack_match.group(1) or attack_match.group(3))
             operator = attack_match.group(2) or attack_match.group(4) or "以上"
@@ -754,61 +952,27 @@ cardsテーブル
         
         # Phase 2: 複雑な数値パターンの検出（モック環境用）
         # 範囲指定パターンの検出
-        range_patterns = [
-            r'HP(\d+)から(\d+)の間',
-            r'攻撃力(\d+)～(\d+)',
-            r'コスト(\d+)-(\d+)',
-            r'ダメージ(\d+)から(\d+)の間'
-        ]
-        for pattern in range_patterns:
-            match = re.search(pattern, query)
+        for field, pattern in self.MOCK_RANGE_REGEXES:
+            match = pattern.search(query)
             if match:
                 min_val, max_val = int(match.group(1)), int(match.group(2))
-                if 'HP' in pattern:
-                    conditions["hp"] = {"value": min_val, "operator": "範囲", "max_value": max_val}
-                elif '攻撃力' in pattern or 'ダメージ' in pattern:
-                    conditions["attack"] = {"value": min_val, "operator": "範囲", "max_value": max_val}
-                elif 'コスト' in pattern:
-                    conditions["cost"] = {"value": min_val, "operator": "範囲", "max_value": max_val}
+                conditions[field] = {"value": min_val, "operator": "範囲", "max_value": max_val}
                 break
         
         # 複数値パターンの検出
-        multiple_patterns = [
-            r'攻撃力(\d+)または(\d+)',
-            r'攻撃力(\d+)か(\d+)',
-            r'HP(\d+)または(\d+)',
-            r'HP(\d+)か(\d+)',
-            r'コスト(\d+)または(\d+)',
-            r'コスト(\d+)か(\d+)'
-        ]
-        for pattern in multiple_patterns:
-            match = re.search(pattern, query)
+        for field, pattern in self.MOCK_MULTIPLE_REGEXES:
+            match = pattern.search(query)
             if match:
                 val1, val2 = int(match.group(1)), int(match.group(2))
-                if '攻撃力' in pattern:
-                    conditions["attack"] = {"value": val1, "operator": "複数値", "additional_values": [val2]}
-                elif 'HP' in pattern:
-                    conditions["hp"] = {"value": val1, "operator": "複数値", "additional_values": [val2]}
-                elif 'コスト' in pattern:
-                    conditions["cost"] = {"value": val1, "operator": "複数値", "additional_values": [val2]}
+                conditions[field] = {"value": val1, "operator": "複数値", "additional_values": [val2]}
                 break
         
         # 近似値パターンの検出
-        approximate_patterns = [
-            r'約HP(\d+)|HP(\d+)程度',
-            r'約攻撃力(\d+)|攻撃力(\d+)程度',
-            r'約コスト(\d+)|コスト(\d+)程度'
-        ]
-        for pattern in approximate_patterns:
-            match = re.search(pattern, query)
+        for field, pattern in self.MOCK_APPROXIMATE_REGEXES:
+            match = pattern.search(query)
             if match:
                 value = int(match.group(1) or match.group(2))
-                if 'HP' in pattern:
-                    conditions["hp"] = {"value": value, "operator": "近似"}
-                elif '攻撃力' in pattern:
-                    conditions["attack"] = {"value": value, "operator": "近似"}
-                elif 'コスト' in pattern:
-                    conditions["cost"] = {"value": value, "operator": "近似"}
+                conditions[field] = {"value": value, "operator": "近似"}
                 break
         
         return {
@@ -908,13 +1072,12 @@ cardsテーブル
             print(f"[DEBUG] スマート検索クエリ解析結果: {query_analysis}")
         
         results = []
-        for item in self.data_cache:
-            if await self._match_filterable_llm(item, query_analysis):
-                name = item.get("name")
-                if name:
-                    results.append(name)
-                if len(results) >= top_k:
-                    break
+        for item in self._iter_plan_matches([compile_filter_plan(query_analysis)]):
+            name = item.get("name")
+            if name:
+                results.append(name)
+            if len(results) >= top_k:
+                break
         
         return results
 
@@ -937,7 +1100,6 @@ cardsテーブル
     
     def _split_query_to_keywords(self, query: str) -> list[str]:
         """クエリを検索可能なキーワードに分割（改善版）"""
-        import re
         keywords = []
         
         # 1. クラス名を抽出
@@ -946,46 +1108,13 @@ cardsテーブル
             if cls in query:
                 keywords.append(cls)
         
-        # 2. コスト条件を抽出
-        cost_patterns = [
-            r'コスト(\d+)',
-            r'(\d+)コスト',
-            r'コストが(\d+)'
-        ]
-        for pattern in cost_patterns:
-            match = re.search(pattern, query)
-            if match:
-                cost_val = match.group(1)
-                keywords.append(f'コスト{cost_val}')
-                break
-        
-        # 3. 攻撃力条件を抽出
-        attack_patterns = [
-            r'攻撃力が(\d+)',
-            r'攻撃力(\d+)',
-            r'攻撃(\d+)',
-            r'ダメージ(\d+)'
-        ]
-        for pattern in attack_patterns:
-            match = re.search(pattern, query)
-            if match:
-                attack_val = match.group(1)
-                keywords.append(f'攻撃{attack_val}')
-                break
-        
-        # 4. HP条件を抽出
-        hp_patterns = [
-            r'HPが(\d+)',
-            r'HP(\d+)',
-            r'体力が(\d+)',
-            r'体力(\d+)'
-        ]
-        for pattern in hp_patterns:
-            match = re.search(pattern, query)
-            if match:
-                hp_val = match.group(1)
-                keywords.append(f'HP{hp_val}')
-                break
+        # 2〜4. コスト・攻撃力・HP条件を抽出（フィールド毎に最初に一致したパターンのみ）
+        for label, patterns in self.QUERY_KEYWORD_REGEXES:
+            for pattern in patterns:
+                match = pattern.search(query)
+                if match:
+                    keywords.append(f'{label}{match.group(1)}')
+                    break
         
         # 5. レアリティを抽出
         rarities = ["レジェンド", "ゴールドレア", "シルバーレア", "ブロンズレア"]
@@ -1005,29 +1134,83 @@ cardsテーブル
     def reload_data(self) -> None:
         """
         データを再読み込みし、キャッシュとtitle_to_dataを構築
+
+        カードと全索引を新しいスナップショット上で構築してから差し替えるため、
+        読み取り側に構築途中の状態は見えない。失敗した場合は直前のデータをそのまま使い続ける。
         """
+        self._publish_snapshot(self._build_snapshot())
+
+    async def reload_data_async(self) -> None:
+        """reload_data の非同期版（読み込み・索引構築は別スレッドで行い、イベントループを止めない）"""
+        snapshot = await asyncio.to_thread(self._build_snapshot)
+        # 公開（参照の代入）は呼び出し元のイベントループ上で行う
+        self._publish_snapshot(snapshot)
+
+    def _build_snapshot(self) -> CardSnapshot:
         try:
+            # 読み込み前に版を記録する（読み込み中に更新されたら次回の確認で再読み込みされる）
+            version = self.data_version()
             data = self._load_data()
-            self.data_cache = data
-            self.title_to_data = {}
-            
-            # インデックス構築
-            for item in data:
-                # nameフィールドがキー（正規化処理を強化）
-                name = item.get("name")
-                if name:
-                    norm_name = self._normalize_title(str(name))
-                    self.title_to_data[norm_name] = item
-                    
-            if self.debug:
-                print(f"[DEBUG] データリロード完了: {len(data)}件のカード, {len(self.title_to_data)}件のインデックス")
-                
+            return CardSnapshot.build(data, self._normalize_title, version=version, previous=getattr(self, "_snapshot", None))
         except Exception as e:
             print(f"[ERROR] データリロード失敗: {e}")
-            self.data_cache = []
-            self.title_to_data = {}
             raise DatabaseServiceException(f"データベースの初期化に失敗しました: {e}")
 
+    def _publish_snapshot(self, snapshot: CardSnapshot) -> None:
+        self._snapshot = snapshot
+        if self.debug:
+            print(f"[DEBUG] データリロード完了: {len(snapshot.cards)}件のカード, {len(snapshot.title_to_data)}件のインデックス")
+
+    def data_version(self) -> Optional[str]:
+        """データファイルの版（ファイルは更新時刻とサイズ、Cloud Storage は generation）。取得できなければ None"""
+        storage = getattr(self, "storage_service", None)
+        if storage is None or not hasattr(storage, "get_data_version"):
+            return None
+        version: Optional[str] = storage.get_data_version()
+        return version
+
+    def create_data_reloader(self, interval_seconds: float = 30.0) -> CardDataReloader:
+        """データファイルの更新を検知して reload_data_async を実行するホットリロード（start() で開始）"""
+        return CardDataReloader(
+            "database_service",
+            self.data_version,
+            self.reload_data_async,
+            interval_seconds,
+            current_version=self._snapshot.version,
+        )
+
+    def get_snapshot_info(self) -> dict[str, Any]:
+        """公開中のスナップショットの版・構築時刻・件数"""
+        return self._snapshot.get_info()
+
+    def _get_card_index(self, rebuild: bool = False) -> Optional[CardIndex]:
+        """現在の data_cache に対応する列指向インデックス（numpy 未導入なら None = 従来の走査）
+
+        rebuild=True は索引を作り直したスナップショットを公開する（計測用）。
+        """
+        if rebuild:
+            self._rebuild_snapshot()
+        return self._card_index
+
+    def _get_card_lookup(self, rebuild: bool = False) -> CardLookup:
+        """現在の data_cache に対応する id / 正規化済み name の索引"""
+        if rebuild:
+            self._rebuild_snapshot()
+        return self._card_lookup
+
+    def _get_card_statistics(self, rebuild: bool = False) -> CardStatistics:
+        """現在の data_cache の統計（索引があれば列から一括集計）"""
+        if rebuild:
+            self._rebuild_snapshot()
+        return self._card_statistics
+
+    def _rebuild_snapshot(self) -> None:
+        snapshot = self._snapshot
+        # 直前の n-gram インデックスは引き継がない（構築をやり直す）
+        self._publish_snapshot(
+            CardSnapshot.build(snapshot.cards, self._normalize_title, version=snapshot.version, title_to_data=snapshot.title_to_data)
+        )
+
     def validate_data_integrity(self) -> dict[str, Any]:
         """データ整合性チェック"""
         if not hasattr(self, "data_cache") or not self.data_cache:
@@ -1102,38 +1285,138 @@ cardsテーブル
             if self.debug:
                 print(f"[DEBUG] LLMベース検索エラー、キーワード別解析にフォールバック: {e}")
         
-        # フォールバック: 各キーワードに対してLLM解析を1回だけ実行
-        keyword_analyses = {}
+        # フォールバック: 各キーワードに対してLLM解析を1回だけ実行（並列・全体期限付き）
+        keyword_analyses = await self._analyze_keywords_with_llm(keywords)
+        
+        # 全てのキーワードに対してマッチング判定（AND条件）
+        plans = []
         for kw in keywords:
-            try:
-                keyword_analyses[kw] = await self._analyze_query_with_llm(kw)
-                if self.debug:
-                    print(f"[DEBUG] キーワード解析完了: {kw}")
-            except Exception as e:
-                if self.debug:
-                    print(f"[DEBUG] キーワード解析エラー: {kw}, {e}")
-                keyword_analyses[kw] = {}
+            if keyword_analyses.get(kw) is not None:
+                # LLM解析結果を使用
+                plans.append(compile_filter_plan(keyword_analyses[kw]))
+            else:
+                # フォールバック処理を使用
+                plans.append(fallback_plan(partial(self._match_filterable_fallback, keyword=kw)))
         
         results = []
-        for item in self.data_cache:
-            # 全てのキーワードに対してマッチング判定（AND条件）
-            match_flags = []
-            for kw in keywords:
-                if keyword_analyses[kw] is not None:
-                    # LLM解析結果を使用
-                    match_result = await self._match_filterable_llm(item, keyword_analyses[kw])
-                else:
-                    # フォールバック処理を使用
-                    match_result = self._match_filterable_fallback(item, kw)
-                match_flags.append(match_result)
-            
-            if all(match_flags):
-                results.append(item)
-                if len(results) >= top_k:
-                    break
+        for item in self._iter_plan_matches(plans):
+            results.append(item)
+            if len(results) >= top_k:
+                break
         
         return results
 
+    async def _analyze_keywords_with_llm(self, keywords: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """キーワード毎の LLM 解析
+
+        同時実行数を query_analysis_concurrency に制限して並列に解析し、全体で query_analysis_deadline 秒を超えたら
+        打ち切る。期限内に終わらなかったキーワードは None（呼び出し側でルールベース判定にフォールバック）。
+        query_analysis_batch が有効なら、未キャッシュのキーワードをまとめて 1 回の completion で解析する。
+        """
+        unique = list(dict.fromkeys(keywords))
+        if not unique:
+            return {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.query_analysis_deadline
+        if self.query_analysis_batch and len(unique) > 1:
+            try:
+                batch = await asyncio.wait_for(self._analyze_queries_batch_with_llm(unique), self.query_analysis_deadline)
+                if batch is not None:
+                    return dict(zip(unique, batch))
+            except asyncio.TimeoutError:
+                if self.debug:
+                    print(f"[DEBUG] 一括キーワード解析が期限切れ: {unique}")
+                return {kw: None for kw in unique}
+
+        semaphore = asyncio.BoundedSemaphore(self.query_analysis_concurrency)
+
+        async def analyze(kw: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    analysis = await self._analyze_query_with_llm(kw)
+                    if self.debug:
+                        print(f"[DEBUG] キーワード解析完了: {kw}")
+                    return analysis
+                except Exception as e:
+                    if self.debug:
+                        print(f"[DEBUG] キーワード解析エラー: {kw}, {e}")
+                    return {}
+
+        tasks = {kw: asyncio.ensure_future(analyze(kw)) for kw in unique}
+        done, pending = await asyncio.wait(tasks.values(), timeout=max(0.0, deadline - loop.time()))
+        for task in pending:
+            task.cancel()
+        if pending and self.debug:
+            print(f"[DEBUG] キーワード解析が期限切れ: {[kw for kw, task in tasks.items() if task in pending]}")
+        return {kw: task.result() if task in done else None for kw, task in tasks.items()}
+
+    async def _analyze_queries_batch_with_llm(self, queries: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """複数クエリを 1 回の completion で解析（ルールベースで解析できるクエリ・キャッシュ済みのクエリは送らない）
+
+        応答が解釈できない・件数が合わない場合は None（呼び出し側でクエリ毎の解析に切り替える）。
+        """
+        if self.is_mocked or self.llm_client is None:
+            return [self._get_mock_query_analysis(query) for query in queries]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        # _analyze_query_with_llm と同じく、ルールベース解析 → キャッシュ → LLM の順
+        parser = self.query_rule_parser
+        if parser is not None:
+            for query in dict.fromkeys(queries):
+                rule_analysis = parser.try_parse(query)
+                if rule_analysis is not None:
+                    results[query] = rule_analysis
+        cache = self.query_analysis_cache
+        if cache is not None:
+            for query in queries:
+                if query in results:
+                    continue
+                cached = await cache.get(query, self.query_analysis_version)
+                if cached is not None:
+                    results[query] = cached
+        missing = [query for query in queries if query not in results]
+        if missing:
+            try:
+                started = time.perf_counter()
+                response = await self._create_query_analysis_completion(
+                    self.query_analysis_prompt + self.QUERY_ANALYSIS_BATCH_INSTRUCTION,
+                    json.dumps(missing, ensure_ascii=False),
+                    min(4000, 500 * len(missing)),
+                )
+                content = response.choices[0].message.content
+                analyses = json.loads(content.strip())["analyses"] if content else None
+                if not isinstance(analyses, list) or len(analyses) != len(missing):
+                    raise ValueError(f"一括解析の件数が一致しません: {len(missing)}件")
+                latency = (time.perf_counter() - started) / len(missing)
+            except Exception as e:
+                if self.debug:
+                    print(f"[DEBUG] 一括クエリ解析エラー: {e}")
+                return None
+            for query, analysis in zip(missing, analyses):
+                results[query] = analysis if isinstance(analysis, dict) else {}
+                if cache is not None and isinstance(analysis, dict):
+                    await cache.put(query, self.query_analysis_version, analysis, latency)
+        return [results[query] for query in queries]
+
+    async def _create_query_analysis_completion(self, system_prompt: str, user_content: str, max_tokens: int) -> Any:
+        """クエリ解析用の completion（同期クライアントをスレッドで実行し、イベントループを塞がない）"""
+        client = self.llm_client
+        if client is None:
+            raise RuntimeError("LLM クライアントが初期化されていません")
+
+        def create() -> Any:
+            return client.chat.completions.create(
+                model=self.QUERY_ANALYSIS_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                temperature=0.1,
+                max_tokens=max_tokens
+            )
+
+        return await asyncio.to_thread(create)
+
     async def _search_filterable_llm(self, query: str, top_k: int = 10) -> list[dict[str, Any]]:
         """LLMを使用したフィルタ検索（集約クエリ対応版）"""
         
@@ -1150,14 +1433,19 @@ cardsテーブル
             print(f"[DEBUG] クエリ解析結果: {query_analysis}")
         
         results = []
-        for item in self.data_cache:
-            if await self._match_filterable_llm(item, query_analysis):
-                results.append(item)
-                if len(results) >= top_k:
-                    break
+        for item in self._iter_plan_matches([compile_filter_plan(query_analysis)]):
+            results.append(item)
+            if len(results) >= top_k:
+                break
         
         return results
 
+    def _iter_plan_matches(self, plans: List[FilterPlan]) -> Iterator[Dict[str, Any]]:
+        """コンパイル済みプランに一致するカードを data_cache 順に返す（_match_filterable_llm の全件適用と同じ）"""
+        if self.debug:
+            print(f"[DEBUG] フィルタ実行計画: {[plan.describe() for plan in plans]}")
+        return iter_matches(plans, self.data_cache, self._get_card_index())
+
     async def _handle_aggregation_query(self, query: str, aggregation_result: Dict[str, Any], top_k: int = 10) -> list[dict[str, Any]]:
         """集約クエリの処理"""
         try:
@@ -1178,6 +1466,20 @@ cardsテーブル
                     print(f"[DEBUG] 無効なフィールドです: {field}. 有効なフィールド: {valid_fields}")
                 return []
             
+            # 整列済み索引があれば最大・最小は端の同値区間、上位Nは降順列の先頭を返す
+            index = self._get_card_index()
+            sorted_values = index.sorted_field(field) if index is not None else None
+            if index is not None and sorted_values is not None and agg_type in ("max", "min", "top_n"):
+                if agg_type == "max":
+                    rows = sorted_values.max_rows()
+                elif agg_type == "min":
+                    rows = sorted_values.min_rows()
+                else:
+                    rows = sorted_values.top_rows(count if count > 0 else top_k)
+                if self.debug:
+                    print(f"[DEBUG] 集約クエリ結果(索引): {len(rows)}件 (タイプ: {agg_type}, フィールド: {field})")
+                return index.take(rows)
+            
             # 該当フィールドが存在するアイテムのみを対象とする
             valid_items = [item for item in self.data_cache if self._extract_numeric_field(item, field) is not None]
             
@@ -1255,8 +1557,7 @@ cardsテーブル
             effect_condition = conditions.get("effect", "")
             if effect_condition:
                 # 区切り文字で分割（'と' '、' '・' ',' ' '）し空要素除去
-                import re
-                raw_terms = re.split(r"[、・,\s]+|と", effect_condition)
+                raw_terms = EFFECT_TERM_SEPARATOR.split(effect_condition)
                 effect_terms = [t.strip() for t in raw_terms if t.strip()]
                 if not effect_terms:
                     effect_terms = [effect_condition]
@@ -1503,33 +1804,39 @@ cardsテーブル
             # どれも一致しない
             return False
         
-        # Phase 2: 複雑な数値パターンのチェック
-        complex_conditions = self._parse_complex_numeric_conditions(keyword)
+        # Phase 2: 複雑な数値パターンのチェック（索引があればキーワード毎に 1 回だけ二分探索で判定）
+        indexed_match = self._match_complex_numeric_indexed(item, keyword)
+        if indexed_match:
+            if self.debug:
+                print(f"[DEBUG] 複雑な数値条件一致(索引): {keyword}")
+            return True
+        parsed = self._parse_fallback_keyword(keyword)
+        complex_conditions = parsed["complex"] if indexed_match is None else {}
         
         # 範囲条件のチェック
-        for range_condition in complex_conditions["range_conditions"]:
+        for range_condition in complex_conditions.get("range_conditions", []):
             if self._match_complex_numeric_condition(item, range_condition, "range"):
                 if self.debug:
                     print(f"[DEBUG] 範囲条件一致: {range_condition}")
                 return True
         
         # 複数値条件のチェック
-        for multiple_condition in complex_conditions["multiple_conditions"]:
+        for multiple_condition in complex_conditions.get("multiple_conditions", []):
             if self._match_complex_numeric_condition(item, multiple_condition, "multiple"):
                 if self.debug:
                     print(f"[DEBUG] 複数値条件一致: {multiple_condition}")
                 return True
         
         # 近似値条件のチェック
-        for approximate_condition in complex_conditions["approximate_conditions"]:
+        for approximate_condition in complex_conditions.get("approximate_conditions", []):
             if self._match_complex_numeric_condition(item, approximate_condition, "approximate"):
                 if self.debug:
                     print(f"[DEBUG] 近似値条件一致: {approximate_condition}")
                 return True
         
         # コスト条件判定: "コストN" または "Nコスト" → item["cost"] == N
-        m1 = re.match(r"コスト(\d+)", keyword)  # "コストN" 形式
-        m2 = re.match(r"(\d+)コスト", keyword)  # "Nコスト" 形式
+        m1 = parsed["cost_prefix"]  # "コストN" 形式
+        m2 = parsed["cost_suffix"]  # "Nコスト" 形式
         if m1 or m2:
             try:
                 if m1:
@@ -1586,7 +1893,7 @@ cardsテーブル
                 return result
         
         # HP条件判定: "HP数値", "HP数値以上/以下/未満/超", "体力数値", "HPが数値"
-        hp_match = re.match(r"(HP|体力)(が)?(\d+)(以上|以下|未満|超|等しい)?", keyword)
+        hp_match = parsed["hp"]
         if hp_match:
             try:
                 hp_val = int(hp_match.group(3))
@@ -1615,7 +1922,7 @@ cardsテーブル
                 return False
         
         # 攻撃力・ダメージ条件判定: "攻撃数値以上/以下" "ダメージ数値以上/以下"
-        attack_match = re.match(r"(攻撃|ダメージ)(\d+)(以上|以下|未満|超)?", keyword)
+        attack_match = parsed["attack"]
         if attack_match:
             try:
                 attack_val = int(attack_match.group(2))
@@ -1724,6 +2031,23 @@ cardsテーブル
             print(f"[DEBUG] マッチしなかった: {keyword}")
         return False
 
+    def _parse_fallback_keyword(self, keyword: str) -> Dict[str, Any]:
+        """_match_filterable_fallback 用のキーワード解析結果（キーワード毎に 1 度だけ正規表現を評価してメモ化）"""
+        memo = self._fallback_keyword_memo
+        parsed = memo.get(keyword)
+        if parsed is None:
+            parsed = {
+                "complex": self._parse_complex_numeric_conditions(keyword),
+                "cost_prefix": self.COST_PREFIX_REGEX.match(keyword),
+                "cost_suffix": self.COST_SUFFIX_REGEX.match(keyword),
+                "hp": self.HP_KEYWORD_REGEX.match(keyword),
+                "attack": self.ATTACK_KEYWORD_REGEX.match(keyword),
+            }
+            if len(memo) >= self.KEYWORD_MEMO_MAX_ENTRIES:
+                memo.clear()
+            memo[keyword] = parsed
+        return parsed
+
     def _normalize_keyword(self, keyword: str) -> str:
         """キーワードの正規化（前後空白除去など）"""
         return keyword.strip()
@@ -1736,8 +2060,7 @@ cardsテーブル
             parts = []
             
             # HP条件の抽出
-            hp_pattern = r'(HP|体力)(が)?(\d+)(のエルフ|のドラゴン|の\w+)?'
-            hp_match = re.search(hp_pattern, keyword)
+            hp_match = self.HP_SPLIT_REGEX.search(keyword)
             if hp_match:
                 hp_part = hp_match.group(1) + (hp_match.group(2) or "") + hp_match.group(3)
                 parts.append(hp_part)
@@ -1764,103 +2087,92 @@ cardsテーブル
         # 型チェック用のダミー実装（mypyエラー回避）
         return []
 
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _keyword_numeric_conditions(keywords: Tuple[str, ...]) -> Tuple[Tuple[int, str], ...]:
+        """キーワード中の「N」「N以上」等（比較語が無ければ「以上」）。スコア計算でカード毎に再解析しないようメモ化"""
+        conditions = []
+        for kw in keywords:
+            m = DatabaseService.NUMBER_CONDITION_REGEX.search(kw)
+            if m:
+                conditions.append((int(m.group(1)), m.group(2) or '以上'))
+        return tuple(conditions)
+
+    def _effect_damages(self, item: Dict[str, Any]) -> List[int]:
+        """effect_1〜5 の「Nダメージ」の N（スナップショットの構築時に全カード分を解析済み。それ以外のカードはここで解析）"""
+        # カード自体も保持しているため、id の再利用で別カードの値を返すことはない
+        cached = self._effect_damage_cache.get(id(item))
+        if cached is not None and cached[0] is item:
+            return cached[1]
+        return effect_damages(item)
+
     def _calculate_hp_score(self, item: Dict[str, Any], keywords: List[str]) -> tuple[float, bool]:
         score = 0.0
         matched = False
         has_hp_keyword = any("hp" in kw.lower() or "体力" in kw.lower() or "ヒットポイント" in kw for kw in keywords)
-        hp_conditions = []
-        for kw in keywords:
-            m = re.search(r'(\d+)(以上|以下|未満|超)?', kw)
-            if m:
-                value = int(m.group(1))
-                cond = m.group(2) or '以上'
-                hp_conditions.append((value, cond))
+        hp_conditions = self._keyword_numeric_conditions(tuple(keywords)) if has_hp_keyword else ()
         if has_hp_keyword and hp_conditions:
             try:
                 hp_value = int(item["hp"]) if "hp" in item and item["hp"] else 0
                 for num, cond in hp_conditions:
-                    if cond == "以上":
-                        if hp_value >= num:
-                            score = 2.0
-                            matched = True
-                            if getattr(self, 'debug', False):
-                                GameChatLogger.log_debug("database_service", f"    HPマッチ: {hp_value} >= {num} -> +2.0")
-                            break
-                    elif cond == "以下":
-                        if hp_value <= num:
-                            score = 2.0
-                            matched = True
-                            if getattr(self, 'debug', False):
-                                GameChatLogger.log_debug("database_service", f"    HPマッチ: {hp_value} <= {num} -> +2.0")
-                            break
-                    elif cond == "未満":
-                        if hp_value < num:
-                            score = 2.0
-                            matched = True
-                            if getattr(self, 'debug', False):
-                                GameChatLogger.log_debug("database_service", f"    HPマッチ: {hp_value} < {num} -> +2.0")
-                            break
-                    elif cond == "超":
-                        if hp_value > num:
-                            score = 2.0
-                            matched = True
-                            if getattr(self, 'debug', False):
-                                GameChatLogger.log_debug("database_service", f"    HPマッチ: {hp_value} > {num} -> +2.0")
-                            break
+                    compare = self.NUMERIC_COMPARATORS.get(cond)
+                    if compare is not None and compare(hp_value, num):
+                        score = 2.0
+                        matched = True
+                        if getattr(self, 'debug', False):
+                            GameChatLogger.log_debug("database_service", f"    HPマッチ: {hp_value} {cond} {num} -> +2.0")
+                        break
             except (ValueError, TypeError):
                 pass
         return score, matched
 
     def _calculate_damage_score(self, item: Dict[str, Any], keywords: List[str], hp_matched: bool) -> tuple[float, bool]:
-        score = 0.0
-        matched = False
         has_damage_keyword = any(kw.lower() in ["ダメージ", "技", "攻撃"] for kw in keywords)
-        # 正規表現で「xx以上」「xx以下」などの数値条件を抽出
-        damage_conditions = []
-        for kw in keywords:
-            m = re.search(r'(\d+)(以上|以下|未満|超)?', kw)
-            if m:
-                value = int(m.group(1))
-                cond = m.group(2) or '以上'  # デフォルトは「以上」
-                damage_conditions.append((value, cond))
-        if has_damage_keyword and damage_conditions and not hp_matched:
-            for ef in ["effect_1", "effect_2", "effect_3", "effect_4", "effect_5"]:
-                if ef in item and item[ef]:
-                    m = re.search(r"(\d+)ダメージ", str(item[ef]))
-                    if m:
-                        damage_value = int(m.group(1))
-                        for num, cond in damage_conditions:
-                            if cond == "以上":
-                                if damage_value >= num:
-                                    score = 2.0
-                                    matched = True
-                                    if self.debug:
-                                        GameChatLogger.log_debug("database_service", f"    ダメージマッチ: {damage_value} >= {num} -> +2.0")
-                                    break
-                            elif cond == "以下":
-                                if damage_value <= num:
-                                    score = 2.0
-                                    matched = True
-                                    if self.debug:
-                                        GameChatLogger.log_debug("database_service", f"    ダメージマッチ: {damage_value} <= {num} -> +2.0")
-                                    break
-                            elif cond == "未満":
-                                if damage_value < num:
-                                    score = 2.0
-                                    matched = True
-                                    if self.debug:
-                                        GameChatLogger.log_debug("database_service", f"    ダメージマッチ: {damage_value} < {num} -> +2.0")
-                                    break
-                            elif cond == "超":
-                                if damage_value > num:
-                                    score = 2.0
-                                    matched = True
-                                    if self.debug:
-                                        GameChatLogger.log_debug("database_service", f"    ダメージマッチ: {damage_value} > {num} -> +2.0")
-                                    break
-                        if matched:
-                            break
-        return score, matched
+        if not has_damage_keyword or hp_matched:
+            return 0.0, False
+        # 「xx以上」「xx以下」などの数値条件
+        damage_conditions = list(self._keyword_numeric_conditions(tuple(keywords)))
+        if not damage_conditions:
+            return 0.0, False
+        indexed_match = self._match_damage_conditions_indexed(item, damage_conditions)
+        if indexed_match is not None:
+            if indexed_match and self.debug:
+                GameChatLogger.log_debug("database_service", f"    ダメージマッチ(索引): {damage_conditions} -> +2.0")
+            return (2.0, True) if indexed_match else (0.0, False)
+        for damage_value in self._effect_damages(item):
+            for num, cond in damage_conditions:
+                compare = self.NUMERIC_COMPARATORS.get(cond)
+                if compare is not None and compare(damage_value, num):
+                    if self.debug:
+                        GameChatLogger.log_debug("database_service", f"    ダメージマッチ: {damage_value} {cond} {num} -> +2.0")
+                    return 2.0, True
+        return 0.0, False
+
+    def _match_damage_conditions_indexed(self, item: Dict[str, Any], damage_conditions: List[tuple[int, str]]) -> Optional[bool]:
+        """効果のダメージ値がいずれかの条件を満たすかを damage 索引で判定（索引が使えない場合は None）"""
+        index = self._get_card_index()
+        row = index.row_of.get(id(item)) if index is not None else None
+        if index is None or row is None:
+            return None
+        damage = index.sorted_field("damage")
+        if damage is None or any(abs(num) > 2 ** 53 for num, _ in damage_conditions):
+            return None
+
+        def build_mask() -> Any:
+            bounds = {
+                "以上": lambda num: (num, float("inf"), True, True),
+                "以下": lambda num: (float("-inf"), num, True, True),
+                "未満": lambda num: (float("-inf"), num, True, False),
+                "超": lambda num: (num, float("inf"), False, True),
+            }
+            mask = np.zeros(index.size, dtype=bool)
+            for num, cond in damage_conditions:
+                if cond in bounds:
+                    mask[damage.range_rows(*bounds[cond](float(num)))] = True
+            return mask
+
+        mask = index.memoize(("damage", tuple(damage_conditions)), build_mask)
+        return bool(mask[row])
 
     def _calculate_type_score(self, item: Dict[str, Any], keywords: List[str]) -> tuple[float, bool]:
         score = 0.0
@@ -1879,6 +2191,19 @@ cardsテーブル
         return score, matched
 
     def _calculate_text_score(self, item: Dict[str, Any], keywords: List[str]) -> float:
+        # 索引があればキーワード列毎に全カードのスコアを n-gram インデックスで 1 度だけ求める
+        # スコアは従来どおり一致キーワード毎に +0.5（HP・タイプ等の加点との釣り合いを保つため BM25 は使わない）
+        index = self._get_card_index()
+        row = index.row_of.get(id(item)) if index is not None else None
+        if index is not None and row is not None and not index.text_failed(row):
+            def build_scores() -> Any:
+                scores = np.zeros(index.size, dtype=np.float64)
+                for keyword in keywords:
+                    scores[index.full_text.rows_containing(keyword.lower())] += 0.5
+                return scores
+
+            return float(index.memoize(("text_score", tuple(keywords)), build_scores)[row])
+        
         score = 0.0
         searchable_text = self._build_searchable_text(item).lower()
         for keyword in keywords:
@@ -1890,24 +2215,41 @@ cardsテーブル
         return score
 
     def _build_searchable_text(self, item: Dict[str, Any]) -> str:
-        fields = [
-            "id", "name", "class", "rarity", "cost", "attack", "hp", "type", 
-            "effect_1", "effect_2", "effect_3", "effect_4", "effect_5", 
-            "cv", "illustrator", "crest"
-        ]
-        text = []
-        for field in fields:
-            if field in item and item[field]:
-                text.append(str(item[field]))
-        # keywords, qaも追加
-        if "keywords" in item and isinstance(item["keywords"], list):
-            text.extend([str(k) for k in item["keywords"]])
-        if "qa" in item and isinstance(item["qa"], list):
-            for qa_item in item["qa"]:
-                if isinstance(qa_item, dict):
-                    text.append(qa_item.get("question", ""))
-                    text.append(qa_item.get("answer", ""))
-        return " ".join(text)
+        return build_searchable_text(item)
+
+    def search_text(self, query: str, top_k: int = 10) -> list[dict[str, Any]]:
+        """全文キーワード検索（空白区切りの語のいずれかを含むカードを BM25 の降順で返す）
+
+        対象は _build_searchable_text のテキスト（小文字化）。同点は data_cache 順。
+        """
+        if not hasattr(self, "data_cache") or not self.data_cache:
+            self.reload_data()
+        terms = [term for term in query.lower().split() if term]
+        if not terms or top_k <= 0:
+            return []
+        
+        index = self._get_card_index()
+        if index is not None:
+            rows, scores = index.full_text.bm25(terms)
+            order = np.lexsort((rows, -scores))[:top_k]
+            return index.take(rows[order])
+        
+        texts = []
+        for item in self.data_cache:
+            try:
+                texts.append(build_searchable_text(item).lower())
+            except Exception:
+                texts.append("")
+        if not texts:
+            return []
+        average_length = sum(len(text) for text in texts) / len(texts)
+        totals = [0.0] * len(texts)
+        for term in dict.fromkeys(terms):
+            matched = [i for i, text in enumerate(texts) if term in text]
+            for i in matched:
+                totals[i] += float(bm25_weights(texts[i].count(term), len(texts[i]), len(matched), len(texts), average_length))
+        ranked = sorted((i for i, text in enumerate(texts) if any(term in text for term in terms)), key=lambda i: -totals[i])
+        return [self.data_cache[i] for i in ranked[:top_k]]
 
     def _calculate_combo_bonus(self, type_matched: bool, damage_matched: bool, hp_matched: bool) -> float:
         if type_matched and (damage_matched or hp_matched):
@@ -2011,10 +2353,7 @@ cardsテーブル
         if not hasattr(self, "data_cache") or not self.data_cache:
             self.reload_data()
         
-        for item in self.data_cache:
-            if str(item.get("id", "")) == str(card_id):
-                return item
-        return None
+        return self._get_card_lookup().get(card_id, "id")
 
     def get_all_cards(self, limit: Optional[int] = None, offset: int = 0) -> list[dict[str, Any]]:
         """全カード取得（ページネーション対応）"""
@@ -2048,6 +2387,14 @@ cardsテーブル
         if not hasattr(self, "data_cache") or not self.data_cache:
             self.reload_data()
         
+        index = self._get_card_index()
+        if index is not None:
+            rows = index.filter_rows(
+                class_filter, rarity_filter, cost_min, cost_max, hp_min, hp_max,
+                attack_min, attack_max, type_filter, keywords_filter,
+            )
+            return index.select(rows, offset, limit)
+        
         results = []
         for item in self.data_cache:
             # クラスフィルタ
@@ -2102,9 +2449,11 @@ cardsテーブル
                 item_keywords = item.get("keywords", [])
                 if not isinstance(item_keywords, list):
                     continue
-                for keyword in keywords_filter:
-                    if not any(keyword.lower() in str(k).lower() for k in item_keywords):
-                        continue
+                if not all(
+                    any(keyword.lower() in str(k).lower() for k in item_keywords)
+                    for keyword in keywords_filter
+                ):
+                    continue
                         
             results.append(item)
             
@@ -2129,13 +2478,8 @@ cardsテーブル
         """
         カード名の正規化（空白・全角スペース・改行・記号除去など）
         """
-        import re
-        normalized = title.strip()
-        normalized = re.sub(r"[\s\u3000]+", "", normalized)  # 空白・全角スペース除去
-        normalized = re.sub(r"[\r\n]+", "", normalized)      # 改行除去
-        normalized = re.sub(r"[（）()・・]+", "", normalized)   # 一部記号除去
-        normalized = normalized.replace("　", "")
-        return normalized
+        # 空白・全角スペース・改行・一部記号を 1 回の置換で除去
+        return self.TITLE_NOISE_REGEX.sub("", title)
 
     def bulk_get_card_details(self, identifiers: list[str], by_field: str = "id") -> list[dict[str, Any]]:
         """複数カードの一括取得（IDまたは名前で検索）"""
@@ -2143,29 +2487,78 @@ cardsテーブル
             self.reload_data()
             
         results = []
-        for identifier in identifiers:
-            found = False
-            for item in self.data_cache:
-                if by_field == "id" and str(item.get("id", "")) == str(identifier):
-                    results.append(item)
-                    found = True
-                    break
-                elif by_field == "name":
-                    norm_identifier = self._normalize_title(str(identifier))
-                    norm_item_name = self._normalize_title(str(item.get("name", "")))
-                    if norm_identifier == norm_item_name:
-                        results.append(item)
-                        found = True
-                        break
-            if not found and self.debug:
+        for identifier, item in zip(identifiers, self.lookup_cards(identifiers, by_field)):
+            if item is not None:
+                results.append(item)
+            elif self.debug:
                 print(f"[DEBUG] カードが見つかりません: {identifier} (by_{by_field})")
         return results
 
+    def lookup_cards(self, identifiers: list[Any], by_field: str = "id") -> list[Optional[dict[str, Any]]]:
+        """識別子（ID または名前）をまとめて解決する
+
+        戻り値は identifiers と同じ順序・同じ件数で、見つからない識別子は None。
+        名前は _normalize_title で正規化して比較する（識別子毎に 1 回）。
+        """
+        if not hasattr(self, "data_cache") or not self.data_cache:
+            self.reload_data()
+        return self._get_card_lookup().get_many(identifiers, by_field)
+
+    def add_cards(self, cards: list[dict[str, Any]]) -> int:
+        """カードを末尾に追加したスナップショットを公開する（統計・id / 名前の索引は差分更新、列指向インデックスは構築し直す）
+
+        公開中のスナップショットは変更しない。索引の構築はこのスレッドで行うため、イベントループからは add_cards_async を使う。
+        """
+        self._publish_snapshot(self._snapshot.with_added(cards, self._normalize_title))
+        return len(cards)
+
+    def update_card(self, card_id: str, changes: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """ID が一致する最初のカードを changes を反映した写しに置き換え、その写しを返す（見つからなければ None）"""
+        snapshot, item = self._snapshot.with_updated(card_id, changes, self._normalize_title)
+        if item is not None:
+            self._publish_snapshot(snapshot)
+        return item
+
+    def remove_cards(self, card_ids: list[str]) -> int:
+        """ID が一致するカードをすべて削除し、削除件数を返す"""
+        snapshot, removed = self._snapshot.with_removed(card_ids, self._normalize_title)
+        if removed:
+            self._publish_snapshot(snapshot)
+        return removed
+
+    async def add_cards_async(self, cards: list[dict[str, Any]]) -> int:
+        """add_cards の非同期版（新しいスナップショットの構築は別スレッドで行い、イベントループを止めない）"""
+        async with self._snapshot_update_lock:
+            snapshot = await asyncio.to_thread(self._snapshot.with_added, cards, self._normalize_title)
+            # 公開（参照の代入）は呼び出し元のイベントループ上で行う
+            self._publish_snapshot(snapshot)
+        return len(cards)
+
+    async def update_card_async(self, card_id: str, changes: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """update_card の非同期版"""
+        async with self._snapshot_update_lock:
+            snapshot, item = await asyncio.to_thread(self._snapshot.with_updated, card_id, changes, self._normalize_title)
+            if item is not None:
+                self._publish_snapshot(snapshot)
+        return item
+
+    async def remove_cards_async(self, card_ids: list[str]) -> int:
+        """remove_cards の非同期版"""
+        async with self._snapshot_update_lock:
+            snapshot, removed = await asyncio.to_thread(self._snapshot.with_removed, card_ids, self._normalize_title)
+            if removed:
+                self._publish_snapshot(snapshot)
+        return removed
+
     def get_cards_by_class(self, class_name: str, limit: Optional[int] = None) -> list[dict[str, Any]]:
         """クラス別カード取得"""
         if not hasattr(self, "data_cache") or not self.data_cache:
             self.reload_data()
             
+        index = self._get_card_index()
+        if index is not None:
+            return index.select(index.categorical["class"].equals(class_name), limit=max(limit, 1) if limit else None)
+            
         results = []
         for item in self.data_cache:
             if str(item.get("class", "")) == class_name:
@@ -2179,6 +2572,10 @@ cardsテーブル
         if not hasattr(self, "data_cache") or not self.data_cache:
             self.reload_data()
             
+        index = self._get_card_index()
+        if index is not None:
+            return index.select(index.categorical["rarity"].equals(rarity), limit=max(limit, 1) if limit else None)
+            
         results = []
         for item in self.data_cache:
             if str(item.get("rarity", "")) == rarity:
@@ -2188,85 +2585,54 @@ cardsテーブル
         return results
 
     def get_statistics(self) -> dict[str, Any]:
-        """データベース統計情報取得"""
+        """データベース統計情報取得（reload_data 時に集計済みの値を返す）"""
         if not hasattr(self, "data_cache") or not self.data_cache:
             self.reload_data()
-            
-        stats: dict[str, Any] = {
-            "total_cards": len(self.data_cache),
-            "classes": {},
-            "rarities": {},
-            "cost_distribution": {},
-            "hp_range": {"min": float("inf"), "max": 0},
-            "attack_range": {"min": float("inf"), "max": 0}
-        }
-        
-        for item in self.data_cache:
-            # クラス統計
-            class_name = str(item.get("class", "不明"))
-            classes_dict = stats["classes"]
-            assert isinstance(classes_dict, dict)
-            classes_dict[class_name] = classes_dict.get(class_name, 0) + 1
-            
-            # レアリティ統計
-            rarity = str(item.get("rarity", "不明"))
-            rarities_dict = stats["rarities"]
-            assert isinstance(rarities_dict, dict)
-            rarities_dict[rarity] = rarities_dict.get(rarity, 0) + 1
-            
-            # コスト統計
-            try:
-                cost = int(item.get("cost", 0))
-                cost_dist_dict = stats["cost_distribution"]
-                assert isinstance(cost_dist_dict, dict)
-                cost_dist_dict[cost] = cost_dist_dict.get(cost, 0) + 1
-            except (ValueError, TypeError):
-                pass
-                
-            # HP範囲
-            try:
-                hp = int(item.get("hp", 0))
-                if hp > 0:
-                    hp_range_dict = stats["hp_range"]
-                    assert isinstance(hp_range_dict, dict)
-                    hp_range_dict["min"] = min(hp_range_dict["min"], hp)
-                    hp_range_dict["max"] = max(hp_range_dict["max"], hp)
-            except (ValueError, TypeError):
-                pass
-                
-            # 攻撃力範囲
-            try:
-                attack = int(item.get("attack", 0))
-                if attack > 0:
-                    attack_range_dict = stats["attack_range"]
-                    assert isinstance(attack_range_dict, dict)
-                    attack_range_dict["min"] = min(attack_range_dict["min"], attack)
-                    attack_range_dict["max"] = max(attack_range_dict["max"], attack)
-            except (ValueError, TypeError):
-                pass
-        
-        # 無限大値の修正
-        hp_range_dict = stats["hp_range"]
-        assert isinstance(hp_range_dict, dict)
-        if hp_range_dict["min"] == float("inf"):
-            hp_range_dict["min"] = 0
-        
-        attack_range_dict = stats["attack_range"]
-        assert isinstance(attack_range_dict, dict)
-        if attack_range_dict["min"] == float("inf"):
-            attack_range_dict["min"] = 0
-            
-        return stats
+        return self._get_card_statistics().snapshot()
 
     def search_cards_with_pagination(self, 
                                    query: str = "", 
                                    page: int = 1, 
                                    page_size: int = 20,
                                    sort_by: str = "name",
-                                   sort_order: str = "asc") -> dict[str, Any]:
-        """ページネーション付き検索"""
+                                   sort_order: str = "asc",
+                                   cursor: Optional[str] = None) -> dict[str, Any]:
+        """ページネーション付き検索
+
+        結果の pagination.next_cursor（不透明なトークン）を cursor に渡すと、直前のページの続きを返す。
+        query・sort_by・sort_order・page_size はカーソル作成時の値を使い、page は無視する。
+        データが再読み込みされていても、直前のページの最後のカードの次から再開する（offset のずれが起きない）。
+        """
         if not hasattr(self, "data_cache") or not self.data_cache:
             self.reload_data()
+
+        state = self._decode_page_cursor(cursor) if cursor else None
+        if state is not None:
+            query, sort_by, sort_order, page_size = state["q"], state["s"], state["o"], state["n"]
+            
+        index = self._get_card_index()
+        if index is not None:
+            # 並び順毎の整列ビュー・クエリ毎の結果行は索引にキャッシュされ、続くページは切り出しのみ
+            rows = index.ordered_rows(
+                query.lower(),
+                sort_by if sort_by in self.PAGINATION_SORT_FIELDS else None,
+                sort_order == "desc",
+            )
+            total_count = int(rows.size)
+
+            def position_of(card_id: str) -> Optional[int]:
+                item = self._get_card_lookup().get(card_id, "id")
+                row = index.row_of.get(id(item)) if item is not None else None
+                positions = np.flatnonzero(rows == row) if row is not None else np.empty(0, dtype=np.int64)
+                return int(positions[0]) if len(positions) else None
+
+            if state is not None:
+                start_index = self._cursor_start(state, total_count, lambda i: index.cards[int(rows[i])], position_of)
+            else:
+                start_index = (page - 1) * page_size
+            page_cards = index.take(rows[start_index:start_index + page_size])
+            return self._pagination_result(page_cards, page, page_size, total_count,
+                                           start_index if state is not None else None, (query, sort_by, sort_order))
             
         # 検索実行
         if query:
@@ -2284,7 +2650,7 @@ cardsテーブル
             filtered_cards = self.data_cache.copy()
         
         # ソート
-        if sort_by in ["name", "cost", "hp", "attack", "class", "rarity"]:
+        if sort_by in self.PAGINATION_SORT_FIELDS:
             reverse = (sort_order == "desc")
             try:
                 if sort_by in ["cost", "hp", "attack"]:
@@ -2297,11 +2663,42 @@ cardsテーブル
         
         # ページネーション計算
         total_count = len(filtered_cards)
-        total_pages = (total_count + page_size - 1) // page_size
-        start_index = (page - 1) * page_size
+        if state is not None:
+            def position_in_list(card_id: str) -> Optional[int]:
+                return next((i for i, item in enumerate(filtered_cards) if self._cursor_card_id(item) == card_id), None)
+            start_index = self._cursor_start(state, total_count, filtered_cards.__getitem__, position_in_list)
+        else:
+            start_index = (page - 1) * page_size
         end_index = start_index + page_size
         page_cards = filtered_cards[start_index:end_index]
-        
+        return self._pagination_result(page_cards, page, page_size, total_count,
+                                       start_index if state is not None else None, (query, sort_by, sort_order))
+
+    def _pagination_result(
+        self,
+        page_cards: list[dict[str, Any]],
+        page: int,
+        page_size: int,
+        total_count: int,
+        cursor_start: Optional[int] = None,
+        cursor_query: Optional[Tuple[str, str, str]] = None,
+    ) -> dict[str, Any]:
+        total_pages = (total_count + page_size - 1) // page_size
+        start_index = (page - 1) * page_size if cursor_start is None else cursor_start
+        if cursor_start is not None:
+            page = start_index // page_size + 1 if page_size > 0 else 1
+        next_cursor = None
+        end_index = start_index + len(page_cards)
+        if cursor_query is not None and page_cards and start_index >= 0 and end_index < total_count:
+            query, sort_by, sort_order = cursor_query
+            next_cursor = self._encode_page_cursor({
+                "q": query,
+                "s": sort_by,
+                "o": sort_order,
+                "n": page_size,
+                "p": end_index,
+                "id": self._cursor_card_id(page_cards[-1]),
+            })
         return {
             "cards": page_cards,
             "pagination": {
@@ -2309,7 +2706,56 @@ cardsテーブル
                 "page_size": page_size,
                 "total_count": total_count,
                 "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1
+                "has_next": page < total_pages if cursor_start is None else end_index < total_count,
+                "has_prev": page > 1 if cursor_start is None else start_index > 0,
+                "next_cursor": next_cursor,
             }
         }
+
+    @staticmethod
+    def _cursor_card_id(item: Dict[str, Any]) -> Optional[str]:
+        card_id = item.get("id")
+        return None if card_id is None else str(card_id)
+
+    def _cursor_start(
+        self,
+        state: Dict[str, Any],
+        total_count: int,
+        card_at: Callable[[int], Dict[str, Any]],
+        position_of: Callable[[str], Optional[int]],
+    ) -> int:
+        """カーソルの再開位置
+
+        直前のページの最後のカードが記録位置の直前にあればその位置、
+        データ更新でずれていればそのカードの次、カードが削除されていれば記録位置（件数で頭打ち）。
+        """
+        position: int = state["p"]
+        last_id: Optional[str] = state["id"]
+        if last_id is None or (0 < position <= total_count and self._cursor_card_id(card_at(position - 1)) == last_id):
+            return min(position, total_count)
+        found = position_of(last_id)
+        return found + 1 if found is not None else min(position, total_count)
+
+    @staticmethod
+    def _encode_page_cursor(state: Dict[str, Any]) -> str:
+        payload = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+    @staticmethod
+    def _decode_page_cursor(cursor: str) -> Dict[str, Any]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            state = json.loads(payload.decode("utf-8"))
+            if not (
+                isinstance(state, dict)
+                and isinstance(state.get("q"), str)
+                and isinstance(state.get("s"), str)
+                and isinstance(state.get("o"), str)
+                and type(state.get("n")) is int and state["n"] > 0
+                and type(state.get("p")) is int and state["p"] >= 0
+                and (state.get("id") is None or isinstance(state.get("id"), str))
+            ):
+                raise ValueError("カーソルの形式が不正です")
+            return state
+        except Exception as e:
+            raise DatabaseServiceException(f"ページネーションカーソルが不正です: {e}", code="INVALID_CURSOR")
@@ -0,0 +1,203 @@
+"""
+埋め込みベクトルの2層キャッシュ
+
+- L1: プロセス内 LRU（float32 バイト列で保持し、合計バイト数で上限管理）
+- L2: SQLite（WAL）。gunicorn の max_requests によるワーカー再起動や他ワーカーとも共有される
+- キー: 正規化済みテキスト + モデル名の sha256
+"""
+from __future__ import annotations
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import unicodedata
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """全角/半角ゆれ（NFKC）と空白の違いを吸収したテキスト"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def default_cache_path() -> str:
+    return os.path.join(tempfile.gettempdir(), "gamechat-ai", "embedding_cache.sqlite3")
+
+
+class EmbeddingCache:
+    """L1（LRU・バイト上限）+ L2（SQLite）の埋め込みキャッシュ"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, path: Optional[str] = None, max_disk_rows: int = 200_000) -> None:
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_disk_rows = max_disk_rows
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_errors": 0,
+        }
+        if path:
+            self._open_db(path)
+
+    @classmethod
+    def from_env(cls) -> Optional["EmbeddingCache"]:
+        if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        path = os.getenv("EMBEDDING_CACHE_PATH", default_cache_path())
+        return cls(
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            path=path or None,  # 空文字でディスク層を無効化
+            max_disk_rows=int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ROWS", "200000")),
+        )
+
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_query_text(text)}".encode("utf-8")).hexdigest()
+
+    # --- L1 ---
+
+    def get_memory(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is None:
+                return None
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+        return _decode(blob)
+
+    def _put_memory(self, key: str, blob: bytes) -> None:
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = blob
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    # --- L2 ---
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings(accessed_at)")
+            self._db = db
+        except Exception as e:
+            self._db = None
+            logger.warning("EmbeddingCache: SQLite を開けないためメモリ層のみで動作", exc_info=e)
+
+    @property
+    def disk_enabled(self) -> bool:
+        return self._db is not None
+
+    def get_disk(self, key: str) -> Optional[List[float]]:
+        """L2 を参照し、ヒットすれば L1 へ昇格（ブロッキング I/O: スレッドから呼ぶ）"""
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE embeddings SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning("EmbeddingCache: SQLite 読み込み失敗", exc_info=e)
+            return None
+        if row is None:
+            return None
+        blob = bytes(row[0])
+        self.stats["disk_hits"] += 1
+        self._put_memory(key, blob)
+        return _decode(blob)
+
+    def _put_disk(self, key: str, model: str, blob: bytes) -> None:
+        if self._db is None:
+            return
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, blob, now, now),
+                )
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= 1000:
+                    self._puts_since_prune = 0
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN ("
+                        " SELECT key FROM embeddings ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_disk_rows,),
+                    )
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning("EmbeddingCache: SQLite 書き込み失敗", exc_info=e)
+
+    # --- 共通 ---
+
+    def record_miss(self) -> None:
+        self.stats["misses"] += 1
+
+    def put(self, key: str, model: str, vector: List[float]) -> List[float]:
+        """両層へ保存し、保存形式（float32）に丸めたベクトルを返す（ヒット時と同じ値になる）"""
+        blob = _encode(vector)
+        self._put_memory(key, blob)
+        self._put_disk(key, model, blob)
+        return _decode(blob)
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self.disk_enabled,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+
+def _encode(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
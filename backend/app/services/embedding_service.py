@@ -1,16 +1,33 @@
 # Minimal EmbeddingService for MVP
 from __future__ import annotations
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import os
+import asyncio
 import hashlib
 import logging
 
+from .embedding_cache import EmbeddingCache, normalize_query_text
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingService:
-    """MVP用: OpenAI未設定/テスト時は決定論的擬似ベクトルを返す簡易実装."""
+    """MVP用: OpenAI未設定/テスト時は決定論的擬似ベクトルを返す簡易実装.
+
+    実API利用時は AsyncOpenAI を使い、イベントループをブロックしない。
+    同時実行数はセマフォで、1呼び出しの所要時間（待ち行列込み）はタイムアウトで制限する。
+    同一質問（正規化後テキスト + モデル）の埋め込みは EmbeddingCache（メモリ LRU + SQLite）で再利用する。
+    """
     def __init__(self) -> None:
         self.api_key = os.getenv("BACKEND_OPENAI_API_KEY")
+        self.model = os.getenv("BACKEND_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "20"))
+        self.max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        self.max_concurrency = max(1, int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "16")))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.client: Optional[AsyncOpenAI] = None
         # モック条件 (未設定 / テスト / モック外部サービス指定 / テスト用ダミーキー)
         self.is_mock = (
             os.getenv("BACKEND_TESTING", "false").lower() == "true"
@@ -20,8 +37,13 @@ class EmbeddingService:
         )
         try:
             if not self.is_mock:
-                from openai import OpenAI  # type: ignore
-                self.client = OpenAI(api_key=self.api_key)
+                from openai import AsyncOpenAI
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=os.getenv("BACKEND_OPENAI_BASE_URL") or None,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                )
                 logger.info("EmbeddingService: OpenAI クライアント初期化成功 (mock=False)")
             else:
                 self.client = None
@@ -30,20 +52,53 @@ class EmbeddingService:
             self.client = None
             self.is_mock = True
             logger.warning("EmbeddingService: OpenAI 初期化失敗 -> モックへフォールバック", exc_info=e)
+        # モック時は擬似ベクトルが決定論的なためキャッシュ不要
+        self.cache = EmbeddingCache.from_env() if not self.is_mock else None
 
     async def get_embedding(self, query: str) -> List[float]:
+        embedding, _ = await self.get_embedding_with_status(query)
+        return embedding
+
+    async def get_embedding_with_status(self, query: str) -> Tuple[List[float], bool]:
+        """(埋め込み, 劣化フラグ)。実 API の失敗で擬似ベクトルにフォールバックした場合のみ劣化=True"""
         q = (query or "").strip()
         if not q:
-            return []
+            return [], False
         if self.is_mock or not self.client:
             # 決定論的 md5 ベース擬似ベクトル (128次元): 安定テスト用
             h = hashlib.md5(q.encode()).hexdigest()
-            return [(int(h[i % len(h)], 16) - 7.5) / 7.5 for i in range(128)]
+            return [(int(h[i % len(h)], 16) - 7.5) / 7.5 for i in range(128)], False
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(q, self.model)
+            cached = self.cache.get_memory(key)
+            if cached is None and self.cache.disk_enabled:
+                cached = await asyncio.to_thread(self.cache.get_disk, key)
+            if cached is not None:
+                return cached, False
+            self.cache.record_miss()
         try:  # 実API利用 (失敗してもフォールバック)
-            resp = self.client.embeddings.create(input=q, model="text-embedding-3-small")
-            emb = resp.data[0].embedding
-            return emb[:128]
+            emb = await asyncio.wait_for(self._create_embedding(normalize_query_text(q)), timeout=self.timeout)
+            if self.cache is not None and key is not None:
+                emb = await asyncio.to_thread(self.cache.put, key, self.model, emb)
+            return emb, False
         except Exception as e:
             logger.warning("EmbeddingService: OpenAI 埋め込み取得失敗 -> sha256 擬似ベクトル", exc_info=e)
-            h = hashlib.sha256(q.encode()).digest()
-            return [(b - 128) / 128 for b in h[:128]]
+            digest = hashlib.sha256(q.encode()).digest()
+            return [(b - 128) / 128 for b in digest[:128]], True
+
+    async def _create_embedding(self, q: str) -> List[float]:
+        assert self.client is not None
+        async with self._semaphore:
+            resp = await self.client.embeddings.create(input=q, model=self.model)
+        emb = resp.data[0].embedding
+        return emb[:128]
+
+    def get_cache_stats(self) -> dict:
+        return self.cache.get_stats() if self.cache is not None else {"enabled": False}
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+        if self.cache is not None:
+            self.cache.close()
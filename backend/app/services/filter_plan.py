@@ -0,0 +1,312 @@
+"""
+LLM クエリ解析結果（conditions）のフィルタ実行計画
+
+_match_filterable_llm はカード毎に conditions を辿り直し、値の型変換や空条件の判定を繰り返す。
+ここでは解析結果を 1 度だけ述語列へコンパイルし、カード毎には必要な述語だけを評価する。
+
+- CardIndex で厳密に解決できる条件（class / rarity の一致、name / type の部分一致）は
+  posting list で候補行を求め、小さい順に積集合を取る（該当述語はカード毎に評価しない）
+- keywords・整数値の数値条件は posting list・数値列で候補を絞り、カード毎の判定は従来と同じ述語で行う
+- 残りの述語は安価なものから順に評価する。述語内の例外は従来どおり「不一致」として扱う
+
+判定結果・返却順（data_cache 順）は _match_filterable_llm を全件に適用した場合と同じ。
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import re
+
+from .card_index import CardIndex, intersect_rows, union_rows, np
+
+Predicate = Callable[[Dict[str, Any]], bool]
+RowsLookup = Callable[[CardIndex], Any]
+
+EFFECT_TERM_SEPARATOR = re.compile(r"[、・,\s]+|と")
+EFFECT_FIELDS = tuple(f"effect_{i}" for i in range(1, 10))
+INT64_LIMIT = 2 ** 63
+
+# 評価コスト（小さいほど先に評価）
+COST_EQUALS = 1
+COST_NUMERIC = 2
+COST_SUBSTRING = 3
+COST_KEYWORDS = 4
+COST_EFFECT = 5
+COST_QA = 6
+COST_FALLBACK = 9
+
+# 数値条件: (フィールド, 既定の演算子, 近似の最小許容幅, 近似の許容率)
+NUMERIC_CONDITIONS = (
+    ("cost", "等しい", 1, 0.2),
+    ("hp", "以上", 5, 0.1),
+    ("attack", "以上", 5, 0.1),
+)
+
+
+class PlanStep:
+    """1 条件分の述語と、CardIndex での行解決方法（任意）"""
+
+    __slots__ = ("name", "cost", "predicate", "rows", "exact")
+
+    def __init__(
+        self,
+        name: str,
+        cost: int,
+        predicate: Predicate,
+        rows: Optional[RowsLookup] = None,
+        exact: bool = False,
+    ) -> None:
+        self.name = name
+        self.cost = cost
+        self.predicate = predicate
+        # rows: 条件を満たす行（昇順）を返す。exact=False の場合は上位集合で、述語も評価する
+        self.rows = rows
+        self.exact = exact
+
+
+class FilterPlan:
+    """コンパイル済みの conditions（全ステップの AND）"""
+
+    def __init__(self, steps: Sequence[PlanStep] = (), match_none: bool = False) -> None:
+        self.steps = sorted(steps, key=lambda step: step.cost)
+        self.match_none = match_none
+
+    def describe(self) -> List[str]:
+        if self.match_none:
+            return ["<none>"]
+        return [f"{step.name}{'[index]' if step.rows is not None else ''}" for step in self.steps]
+
+    def matches(self, item: Dict[str, Any]) -> bool:
+        """索引を使わない単体判定（_match_filterable_llm と同じ結果）"""
+        return not self.match_none and _all_pass([step.predicate for step in self.steps], item)
+
+
+def _all_pass(predicates: Sequence[Predicate], item: Dict[str, Any]) -> bool:
+    try:
+        for predicate in predicates:
+            if not predicate(item):
+                return False
+    except Exception:
+        return False
+    return True
+
+
+def iter_matches(
+    plans: Sequence[FilterPlan],
+    cards: Sequence[Dict[str, Any]],
+    index: Optional[CardIndex] = None,
+) -> Iterator[Dict[str, Any]]:
+    """全プランに一致するカードを data_cache 順に返す（途中で打ち切れるようジェネレータ）"""
+    if any(plan.match_none for plan in plans):
+        return
+    steps = [step for plan in plans for step in plan.steps]
+    if index is None:
+        predicates = [step.predicate for step in sorted(steps, key=lambda step: step.cost)]
+        for item in cards:
+            if _all_pass(predicates, item):
+                yield item
+        return
+
+    postings = [step.rows(index) for step in steps if step.rows is not None]
+    predicates = [
+        step.predicate
+        for step in sorted(steps, key=lambda step: step.cost)
+        if step.rows is None or not step.exact
+    ]
+    if not postings:
+        for item in cards:
+            if _all_pass(predicates, item):
+                yield item
+        return
+
+    postings.sort(key=len)
+    rows = postings[0]
+    for posting in postings[1:]:
+        if rows.size == 0:
+            return
+        rows = intersect_rows(rows, posting)
+    for row in rows.tolist():
+        item = index.cards[row]
+        if _all_pass(predicates, item):
+            yield item
+
+
+def fallback_plan(predicate: Predicate, name: str = "fallback") -> FilterPlan:
+    """任意の述語 1 つからなるプラン"""
+    return FilterPlan([PlanStep(name, COST_FALLBACK, predicate)])
+
+
+def compile_filter_plan(query_analysis: Any) -> FilterPlan:
+    """_analyze_query_with_llm の結果をプランへ変換する
+
+    conditions の形が不正（カードに依らず _match_filterable_llm が例外になる）場合は何にも一致しないプラン。
+    """
+    try:
+        if query_analysis.get("aggregation", {}).get("is_aggregation"):
+            return FilterPlan()
+        conditions = query_analysis.get("conditions", {})
+        return FilterPlan(_compile_steps(conditions))
+    except Exception:
+        return FilterPlan(match_none=True)
+
+
+def _compile_steps(conditions: Dict[str, Any]) -> List[PlanStep]:
+    steps: List[PlanStep] = []
+
+    name = conditions.get("name", "")
+    if name:
+        steps.append(PlanStep(
+            "name", COST_SUBSTRING,
+            lambda item: name in str(item.get("name", "")),
+            (lambda index: index.categorical["name"].contains(name)) if isinstance(name, str) else None,
+            exact=True,
+        ))
+
+    for field in ("rarity", "class"):
+        value = conditions.get(field, "")
+        if value:
+            steps.append(_equals_step(field, value, indexed=True))
+
+    type_value = conditions.get("type", "")
+    if type_value:
+        steps.append(PlanStep(
+            "type", COST_SUBSTRING,
+            lambda item: type_value in str(item.get("type", "")),
+            (lambda index: index.categorical["type"].contains(type_value)) if isinstance(type_value, str) else None,
+            exact=True,
+        ))
+
+    effect = conditions.get("effect", "")
+    if effect:
+        steps.append(_effect_step(effect))
+
+    for field in ("cv", "illustrator"):
+        value = conditions.get(field, "")
+        if value:
+            steps.append(_equals_step(field, value, indexed=False))
+
+    keywords = conditions.get("keywords", [])
+    if keywords and isinstance(keywords, list):
+        steps.append(_keywords_step(keywords))
+
+    for field, default_operator, min_tolerance, tolerance_rate in NUMERIC_CONDITIONS:
+        condition = conditions.get(field, {})
+        if condition.get("value") is not None:
+            steps.append(_numeric_step(field, condition, default_operator, min_tolerance, tolerance_rate))
+
+    qa_search = conditions.get("qa_search", "")
+    if qa_search:
+        steps.append(PlanStep("qa_search", COST_QA, lambda item: _qa_contains(item, qa_search)))
+
+    return steps
+
+
+def _equals_step(field: str, value: Any, indexed: bool) -> PlanStep:
+    return PlanStep(
+        field, COST_EQUALS,
+        lambda item: str(item.get(field, "")) == value,
+        (lambda index: index.categorical[field].equals(value)) if indexed and isinstance(value, str) else None,
+        exact=True,
+    )
+
+
+def _effect_step(effect: Any) -> PlanStep:
+    terms = [term.strip() for term in EFFECT_TERM_SEPARATOR.split(effect) if term.strip()] or [effect]
+
+    def predicate(item: Dict[str, Any]) -> bool:
+        texts = [text for text in (str(item.get(field, "")) for field in EFFECT_FIELDS) if text]
+        return all(any(term in text for text in texts) for term in terms)
+
+    return PlanStep("effect", COST_EFFECT, predicate)
+
+
+def _keywords_step(conditions: List[Any]) -> PlanStep:
+    def predicate(item: Dict[str, Any]) -> bool:
+        item_keywords = item.get("keywords", [])
+        if not isinstance(item_keywords, list):
+            return False
+        for condition in conditions:
+            for item_keyword in item_keywords:
+                if condition.lower() in item_keyword.lower() or item_keyword.lower() in condition.lower():
+                    break
+            else:
+                return False
+        return True
+
+    def rows(index: CardIndex) -> Any:
+        # keywords 要素（小文字化）と双方向の部分一致 → 条件毎の和集合を積集合（上位集合）
+        result = None
+        for condition in conditions:
+            needle = condition.lower()
+            matched = union_rows([
+                posting for term, posting in index.keywords.postings.items() if needle in term or term in needle
+            ])
+            result = matched if result is None else intersect_rows(result, matched)
+        return result
+
+    indexable = all(isinstance(condition, str) for condition in conditions)
+    return PlanStep("keywords", COST_KEYWORDS, predicate, rows if indexable else None, exact=False)
+
+
+def _numeric_step(
+    field: str,
+    condition: Dict[str, Any],
+    default_operator: str,
+    min_tolerance: int,
+    tolerance_rate: float,
+) -> PlanStep:
+    value = condition["value"]
+    operator = condition.get("operator", default_operator)
+
+    def item_value(item: Dict[str, Any]) -> int:
+        return int(item.get(field, 0))
+
+    bounds: Optional[List[Any]] = None  # [low, high] または許容値のリスト（索引で解決する場合）
+    if operator == "範囲":
+        max_value = condition.get("max_value", value)
+        predicate: Predicate = lambda item: value <= item_value(item) <= max_value
+        bounds = [value, max_value]
+    elif operator == "複数値":
+        allowed = [value] + condition.get("additional_values", [])
+        predicate = lambda item: item_value(item) in allowed
+        bounds = allowed
+    elif operator == "近似":
+        tolerance = max(min_tolerance, value * tolerance_rate)
+        predicate = lambda item: not abs(item_value(item) - value) > tolerance
+    elif operator == "等しい":
+        predicate = lambda item: item_value(item) == value
+        bounds = [value, value]
+    elif operator == "以上":
+        predicate = lambda item: not item_value(item) < value
+        bounds = [value, None]
+    elif operator == "以下":
+        predicate = lambda item: not item_value(item) > value
+        bounds = [None, value]
+    else:
+        # 未知の演算子でも int() 変換は行われる（変換できないカードは不一致）
+        predicate = lambda item: item_value(item) is not None
+
+    rows: Optional[RowsLookup] = None
+    if bounds is not None and all(_is_plain_int(bound) for bound in bounds if bound is not None):
+        def rows(index: CardIndex) -> Any:
+            column = index.numeric[field]
+            if not column.complete:
+                # int64 に収まらない値があれば全行を候補にし、述語で判定する
+                return np.arange(index.size, dtype=np.int64)
+            if operator == "複数値":
+                return np.flatnonzero(column.valid & np.isin(column.values, bounds))
+            return np.flatnonzero(column.between(bounds[0], bounds[1]))
+    return PlanStep(f"{field}:{operator}", COST_NUMERIC, predicate, rows, exact=False)
+
+
+def _is_plain_int(value: Any) -> bool:
+    return type(value) is int and -INT64_LIMIT <= value < INT64_LIMIT
+
+
+def _qa_contains(item: Dict[str, Any], needle: Any) -> bool:
+    qa_data = item.get("qa", [])
+    if not isinstance(qa_data, list):
+        return False
+    for qa in qa_data:
+        if isinstance(qa, dict):
+            if needle in str(qa.get("question", "")) or needle in str(qa.get("answer", "")):
+                return True
+    return False
@@ -0,0 +1,209 @@
+"""
+LocalVectorIndex 用の近似最近傍（IVF: 転置ファイル + 球面 k-means）
+
+- オフラインで k-means の重心を学習し、各 namespace 内の行を所属クラスタ順に並べ替える
+  （クラスタ = 行列上の連続区間になるため、memmap のまま区間スキャンできる）
+- 検索時はクエリに近い重心 nprobe 個のクラスタだけを厳密スコアリング
+- 調整ノブ: nprobe（大きいほど recall↑/レイテンシ↑）、min_rows（これ未満の namespace は全件検索）
+
+サイドカー形式（`<index>.ivf`、リトルエンディアン）:
+  [0:64)  ヘッダ: magic(8) version(u32) nlist(u32) dim(u32) pad(u32) rows(u64) table_length(u64)
+  [64:..) float32 重心 nlist x dim
+  [table) UTF-8 JSON {"ids_digest": "...", "offsets": {namespace: [nlist+1 個の区間境界]}}
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import os
+import json
+import struct
+import hashlib
+import logging
+
+import numpy as np
+
+from .local_vector_index import LocalVectorIndex, atomic_write
+
+logger = logging.getLogger(__name__)
+
+IVF_MAGIC = b"GCIVFIDX"
+IVF_VERSION = 1
+_IVF_HEADER = struct.Struct("<8sIIIIQQ")
+IVF_HEADER_SIZE = 64
+
+
+def ids_digest(ids: Sequence[str]) -> str:
+    """行順の検証用（本体ファイルとサイドカーの組み合わせ違いを検出）"""
+    h = hashlib.sha1()
+    for rec_id in ids:
+        h.update(rec_id.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _normalize(x: Any) -> Any:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (x / norms).astype(np.float32)
+
+
+def train_kmeans(
+    vectors: Any,
+    nlist: int,
+    iterations: int = 20,
+    seed: int = 0,
+    max_samples: int = 256,
+) -> Any:
+    """球面 k-means（コサイン）。学習は nlist * max_samples 行までのサンプルで行う"""
+    x = _normalize(np.asarray(vectors, dtype=np.float32))
+    n = x.shape[0]
+    nlist = max(1, min(nlist, n))
+    rng = np.random.default_rng(seed)
+    if n > nlist * max_samples:
+        x = x[rng.choice(n, nlist * max_samples, replace=False)]
+    centroids = x[rng.choice(x.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # 空クラスタは現在の重心から最も遠い点で再初期化
+            far = np.argsort(np.max(x @ centroids.T, axis=1))[: int(empty.sum())]
+            sums[empty] = x[far]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFLists:
+    """重心 + namespace 毎のクラスタ区間境界"""
+
+    def __init__(
+        self,
+        centroids: Any,
+        offsets: Dict[str, Any],
+        nprobe: int = 8,
+        min_rows: int = 0,
+        digest: str = "",
+    ) -> None:
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.offsets = {ns: np.asarray(o, dtype=np.int64) for ns, o in offsets.items()}
+        self.nlist = int(self.centroids.shape[0])
+        self.nprobe = nprobe
+        self.min_rows = min_rows
+        self.digest = digest
+        self._centroid_norms: Dict[int, Any] = {}
+
+    def _norms(self, dim: int) -> Any:
+        norms = self._centroid_norms.get(dim)
+        if norms is None:
+            norms = np.linalg.norm(self.centroids[:, :dim], axis=1)
+            norms[norms == 0] = 1.0
+            self._centroid_norms[dim] = norms
+        return norms
+
+    def candidate_ranges(self, namespace: str, q: Any, rows: Any, top_k: int) -> Optional[List[Tuple[int, int]]]:
+        """探索対象の行区間 [(start, stop), ...]（昇順）。全件検索すべき場合は None"""
+        offsets = self.offsets.get(namespace)
+        if offsets is None or not isinstance(rows, slice) or self.nprobe <= 0 or self.nprobe >= self.nlist:
+            return None
+        if rows.stop - rows.start < self.min_rows:
+            return None
+        dim = int(q.shape[0])
+        scores = (self.centroids[:, :dim] @ q) / self._norms(dim)
+        sizes = offsets[1:] - offsets[:-1]
+        chosen: List[int] = []
+        total = 0
+        # nprobe 個に達し、かつ top_k 件以上の候補が集まるまで近いクラスタから追加
+        for cluster in np.argsort(-scores).tolist():
+            if sizes[cluster] == 0:
+                continue
+            chosen.append(cluster)
+            total += int(sizes[cluster])
+            if len(chosen) >= self.nprobe and total >= top_k:
+                break
+        chosen.sort()
+        base = rows.start
+        return [(base + int(offsets[c]), base + int(offsets[c + 1])) for c in chosen]
+
+
+def build_ivf(
+    index: LocalVectorIndex,
+    nlist: int,
+    iterations: int = 20,
+    seed: int = 0,
+) -> Tuple[LocalVectorIndex, IVFLists]:
+    """重心を学習し、namespace 内の行をクラスタ順に並べ替えたインデックスと IVF を返す"""
+    matrix = np.asarray(index.matrix, dtype=np.float32)
+    centroids = train_kmeans(matrix, nlist, iterations=iterations, seed=seed)
+    nlist = int(centroids.shape[0])
+    order_parts: List[Any] = []
+    offsets: Dict[str, Any] = {}
+    for ns, rows in sorted(index._ns_rows.items(), key=lambda kv: _first_row(kv[1])):
+        row_ids = np.arange(rows.start, rows.stop) if isinstance(rows, slice) else rows
+        assign = np.argmax(_normalize(matrix[row_ids]) @ centroids.T, axis=1)
+        perm = np.argsort(assign, kind="stable")
+        order_parts.append(row_ids[perm])
+        offsets[ns] = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))])
+    order = np.concatenate(order_parts) if order_parts else np.zeros(0, dtype=np.int64)
+    ids = [index.ids[i] for i in order.tolist()]
+    reordered = LocalVectorIndex(
+        ids,
+        [index.titles[i] for i in order.tolist()],
+        [index.namespaces[i] for i in order.tolist()],
+        matrix[order],
+        normalized=index.normalized,
+    )
+    return reordered, IVFLists(centroids, offsets, digest=ids_digest(ids))
+
+
+def _first_row(rows: Any) -> int:
+    return rows.start if isinstance(rows, slice) else int(rows[0])
+
+
+def write_ivf(path: str, ivf: IVFLists, rows: int) -> None:
+    centroids = np.ascontiguousarray(ivf.centroids, dtype="<f4")
+    table = json.dumps(
+        {"ids_digest": ivf.digest, "offsets": {ns: o.tolist() for ns, o in ivf.offsets.items()}},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    header = _IVF_HEADER.pack(
+        IVF_MAGIC, IVF_VERSION, ivf.nlist, int(centroids.shape[1]), 0, rows, len(table),
+    ).ljust(IVF_HEADER_SIZE, b"\0")
+    atomic_write(path, [header, centroids.tobytes(), table])
+
+
+def read_ivf(path: str) -> Tuple[IVFLists, int]:
+    """(IVF, 本体の行数) を返す"""
+    with open(path, "rb") as f:
+        header = f.read(IVF_HEADER_SIZE)
+        if len(header) < IVF_HEADER_SIZE:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, nlist, dim, _, rows, table_length = _IVF_HEADER.unpack_from(header)
+        if magic != IVF_MAGIC or version != IVF_VERSION:
+            raise ValueError(f"{path}: not a supported IVF file")
+        centroids = np.frombuffer(f.read(nlist * dim * 4), dtype="<f4").reshape(nlist, dim)
+        table = json.loads(f.read(table_length).decode("utf-8"))
+    return IVFLists(centroids, table["offsets"], digest=table.get("ids_digest", "")), rows
+
+
+def attach_ivf_sidecar(index: LocalVectorIndex, path: Optional[str] = None) -> bool:
+    """`<index>.ivf` があれば検証して取り付ける（LOCAL_VECTOR_ANN=false で無効）"""
+    if os.getenv("LOCAL_VECTOR_ANN", "auto").lower() in {"false", "0", "off"}:
+        return False
+    path = path or (f"{index.source_path}.ivf" if index.source_path else None)
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        ivf, rows = read_ivf(path)
+    except Exception as e:
+        logger.warning("IVF: サイドカー読み込み失敗 -> 全件検索", exc_info=e)
+        return False
+    if rows != len(index) or ivf.digest != ids_digest(index.ids):
+        logger.warning("IVF: 本体インデックスと行順が一致しないため無視", {"path": path})
+        return False
+    ivf.nprobe = int(os.getenv("LOCAL_VECTOR_NPROBE", "8"))
+    ivf.min_rows = int(os.getenv("LOCAL_VECTOR_ANN_MIN_ROWS", "2000"))
+    index.ivf = ivf
+    logger.info("IVF: 近似検索を有効化", {"nlist": ivf.nlist, "nprobe": ivf.nprobe, "min_rows": ivf.min_rows})
+    return True
@@ -0,0 +1,119 @@
+"""
+大きな JSON ファイルの逐次読み込み
+
+トップレベルの配列（data.json）・オブジェクト（{タイトル: カード}）を要素毎に返す。
+ファイル全体を 1 つの文字列として読み込まず、バッファ（chunk_size 文字 + 読み込み中の要素 1 件）のみ保持する。
+- 要素のデコードは標準の json.JSONDecoder.raw_decode（C 実装）で行う
+- 要素がバッファ末尾で途切れていればバッファを倍に広げて読み足す
+- 不正な JSON は json.load と同様に json.JSONDecodeError を送出する（途中まで返した要素はそのまま）
+"""
+from __future__ import annotations
+from typing import Any, Iterator, Optional, TextIO, Tuple
+import json
+import re
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = frozenset(" \t\n\r,]}:")
+
+
+class JsonContainerStream:
+    """トップレベルの配列・オブジェクトを (キー, 値) 毎に読む（配列のキーは None）"""
+
+    def __init__(self, file: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        first = self._peek()
+        if first == "[":
+            self.kind = "array"
+        elif first == "{":
+            self.kind = "object"
+        else:
+            raise self._error("Expecting '[' or '{'")
+        self._pos += 1
+
+    def __iter__(self) -> Iterator[Tuple[Optional[str], Any]]:
+        close = "]" if self.kind == "array" else "}"
+        if self._peek() == close:
+            self._pos += 1
+            self._expect_end()
+            return
+        while True:
+            key = None
+            if self.kind == "object":
+                if self._peek() != '"':
+                    raise self._error("Expecting property name enclosed in double quotes")
+                key = self._decode()
+                if self._peek() != ":":
+                    raise self._error("Expecting ':' delimiter")
+                self._pos += 1
+                self._peek()
+            yield key, self._decode()
+            char = self._peek()
+            if char == ",":
+                self._pos += 1
+                self._peek()
+            elif char == close:
+                self._pos += 1
+                self._expect_end()
+                return
+            else:
+                raise self._error("Expecting ',' delimiter")
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self:
+            yield value
+
+    def _read(self, size: int) -> bool:
+        """読み終えた部分を捨てて size 文字を読み足す（EOF なら False）"""
+        chunk = self._file.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> Optional[str]:
+        """空白を読み飛ばした次の文字（EOF なら None）。位置は次の文字の手前"""
+        while True:
+            match = _WHITESPACE.match(self._buffer, self._pos)
+            assert match is not None  # 0 文字にも一致するので常に一致する
+            self._pos = match.end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read(self._chunk_size):
+                return None
+
+    def _decode(self) -> Any:
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # 要素がバッファ末尾で途切れている: 読み足して（大きな要素でも読み足しの回数が増えないよう倍々で）やり直す
+                if self._read(max(self._chunk_size, len(self._buffer) - self._pos)):
+                    continue
+                raise
+            # 数値・リテラルは途中で切れていても（"0." → 0）decode できてしまうため、区切り文字まで読み足して確かめる
+            if (
+                self._buffer[self._pos] not in '{["'
+                and (end == len(self._buffer) or self._buffer[end] not in _DELIMITERS)
+                and not self._eof
+                and self._read(self._chunk_size)
+            ):
+                continue
+            self._pos = end
+            return value
+
+    def _expect_end(self) -> None:
+        if self._peek() is not None:
+            raise self._error("Extra data")
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
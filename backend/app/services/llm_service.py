@@ -1,6 +1,7 @@
 from __future__ import annotations
-from typing import List, Any
+from typing import List, Any, Tuple
 import os
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,10 +11,15 @@ class LLMService:
     MVP用のLLMサービス。
     - デフォルトはスタブ回答（テストやキー未設定時）
     - BACKEND_OPENAI_API_KEY が設定され、かつモック無効のときは OpenAI Chat Completions を利用
+    - 実API呼び出しは AsyncOpenAI（非ブロッキング）。同時実行数とタイムアウトは環境変数で調整
     """
 
     def __init__(self) -> None:
         self.api_key = os.getenv("BACKEND_OPENAI_API_KEY")
+        self.timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", os.getenv("OPENAI_TIMEOUT_SECONDS", "30")))
+        self.max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        self.max_concurrency = max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
         self.mock = (
             os.getenv("BACKEND_TESTING", "false").lower() == "true"
             or os.getenv("BACKEND_MOCK_EXTERNAL_SERVICES", "false").lower() == "true"
@@ -23,21 +29,33 @@ class LLMService:
         self.client = None
         if not self.mock:
             try:
-                from openai import OpenAI  # type: ignore
-                self.client = OpenAI(api_key=self.api_key)
+                from openai import AsyncOpenAI  # type: ignore
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=os.getenv("BACKEND_OPENAI_BASE_URL") or None,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                )
                 logger.info("LLMService: OpenAI クライアント初期化成功 (mock=False)")
             except Exception as e:
                 logger.warning("LLMService: OpenAI 初期化失敗 -> スタブにフォールバック", exc_info=e)
                 self.client = None
                 self.mock = True
 
-    async def generate_answer(self, query: str, context_items: List[dict[str, Any]]):
+    async def generate_answer(self, query: str, context_items: List[dict[str, Any]]) -> str:
+        answer, _ = await self.generate_answer_with_status(query, context_items)
+        return answer
+
+    async def generate_answer_with_status(self, query: str, context_items: List[dict[str, Any]]) -> Tuple[str, bool]:
+        """(回答, 劣化フラグ)。OpenAI 利用時に失敗・空応答でスタブへフォールバックした場合のみ劣化=True"""
         q = (query or "").strip()
         if not q:
-            return "質問を入力してください。"
+            return "質問を入力してください。", False
 
         # OpenAI が使える場合は簡易プロンプトで応答生成
+        degraded = False
         if not self.mock and self.client is not None:
+            degraded = True
             try:
                 context_summary = "\n".join(
                     f"- タイトル: {ci.get('title') or ci.get('name','?')} / 効果: {ci.get('effect_1','(不明)')}"
@@ -50,18 +68,12 @@ class LLMService:
                     (f"候補カード:\n{context_summary}\n\n質問: {q}" if context_items else f"質問: {q}")
                 )
                 # モデルは軽量を優先（MVP）。失敗時はスタブにフォールバック
-                resp = self.client.chat.completions.create(  # type: ignore
-                    model=os.getenv("BACKEND_OPENAI_MODEL", "gpt-4o-mini"),
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    temperature=float(os.getenv("LLM_TEMPERATURE", "0.7")),
-                    max_tokens=int(os.getenv("LLM_MAX_TOKENS", "256")),
+                resp = await asyncio.wait_for(
+                    self._create_completion(system_prompt, user_prompt), timeout=self.timeout
                 )
                 content = resp.choices[0].message.content if resp and resp.choices else None
                 if content:
-                    return content
+                    return content, False
                 logger.warning("LLMService: OpenAI 応答が空 -> スタブへ")
             except Exception as e:
                 logger.warning("LLMService: OpenAI 応答生成失敗 -> スタブへ", exc_info=e)
@@ -69,7 +81,23 @@ class LLMService:
         # スタブ応答（従来どおり）
         if context_items:
             names = ", ".join(ci.get('title') or ci.get('name','?') for ci in context_items[:3])
-            return f"{len(context_items)}件参照: {names} / 質問: {q}"
+            return f"{len(context_items)}件参照: {names} / 質問: {q}", degraded
         if any(w in q.lower() for w in ["hello", "hi", "こんにちは"]):
-            return "こんにちは！カードについて何でも聞いてください。"
-        return f"質問を受け付けました: {q}"
+            return "こんにちは！カードについて何でも聞いてください。", degraded
+        return f"質問を受け付けました: {q}", degraded
+
+    async def _create_completion(self, system_prompt: str, user_prompt: str) -> Any:
+        async with self._semaphore:
+            return await self.client.chat.completions.create(  # type: ignore
+                model=os.getenv("BACKEND_OPENAI_MODEL", "gpt-4o-mini"),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=float(os.getenv("LLM_TEMPERATURE", "0.7")),
+                max_tokens=int(os.getenv("LLM_MAX_TOKENS", "256")),
+            )
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
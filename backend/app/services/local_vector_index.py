@@ -0,0 +1,371 @@
+"""
+プロセス内ベクトルインデックス（Upstash Vector のローカル代替）
+
+- embedding_list.jsonl 等のカード埋め込みを連続した float32 行列に載せ、
+  内積 + argpartition で top-k を返す（数千件規模なら WAN 往復より桁違いに速い）
+- namespace は Upstash と同じ意味: 未指定 = デフォルト namespace（""）のみを検索
+- スコアは Upstash の COSINE と同じく (1 + cos) / 2
+- クエリ次元が行列より短い場合（EmbeddingService は先頭128次元に切り詰める）は先頭次元同士で比較
+- バイナリ形式（ヘッダ + float32 行列 + id/title/namespace テーブル）は np.memmap で開くため、
+  gunicorn の各ワーカーが同じファイルを開いてもページキャッシュ上の1コピーを共有する
+
+バイナリ形式（リトルエンディアン）:
+  [0:64)   ヘッダ: magic(8) version(u32) flags(u32) rows(u64) dim(u32) pad(u32)
+                   matrix_offset(u64) table_offset(u64) table_length(u64)
+  [64:..)  float32 行列 rows x dim（C順、namespace 毎に行が連続）
+  [table)  UTF-8 JSON {"ids": [...], "titles": [...], "namespaces": [...]}
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+import os
+import json
+import struct
+import tempfile
+import threading
+import logging
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = ""
+
+BINARY_MAGIC = b"GCVECIDX"
+BINARY_VERSION = 1
+FLAG_NORMALIZED = 1
+_HEADER = struct.Struct("<8sIIQII QQQ")
+HEADER_SIZE = 64
+
+
+class LocalMatch(NamedTuple):
+    id: str
+    score: float
+    title: str
+    namespace: str
+
+
+class LocalVectorIndex:
+    """float32 行列 + id/title/namespace テーブルによる厳密 top-k 検索"""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        titles: Sequence[str],
+        namespaces: Sequence[str],
+        matrix: Any,
+        normalized: bool = False,
+    ) -> None:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for LocalVectorIndex")
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(f"matrix shape {matrix.shape} does not match {len(ids)} ids")
+        self.ids = list(ids)
+        self.titles = list(titles)
+        self.namespaces = list(namespaces)
+        self.matrix = matrix if matrix.dtype == np.float32 else matrix.astype(np.float32)
+        self.dimension = int(self.matrix.shape[1])
+        # 行が L2 正規化済み（バイナリ形式の既定）なら全次元比較でノルム計算を省く
+        self.normalized = normalized
+        self.source_path: Optional[str] = None
+        # 近似検索（ivf_index.IVFLists）。未設定なら常に全件の厳密検索
+        self.ivf: Optional[Any] = None
+        # namespace -> 行範囲（連続していれば slice でビューを取り、コピーを避ける）
+        self._ns_rows: Dict[str, Union[slice, Any]] = {}
+        positions: Dict[str, List[int]] = {}
+        for row, ns in enumerate(self.namespaces):
+            positions.setdefault(ns, []).append(row)
+        for ns, rows in positions.items():
+            if rows[-1] - rows[0] + 1 == len(rows):
+                self._ns_rows[ns] = slice(rows[0], rows[-1] + 1)
+            else:
+                self._ns_rows[ns] = np.asarray(rows, dtype=np.int64)
+        # 比較次元ごとの行ノルム（遅延計算）
+        self._norms: Dict[int, Any] = {}
+        self._norms_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def namespace_counts(self) -> Dict[str, int]:
+        return {
+            ns: (rows.stop - rows.start) if isinstance(rows, slice) else int(rows.shape[0])
+            for ns, rows in self._ns_rows.items()
+        }
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict[str, Any]],
+        title_lookup: Optional[Dict[str, str]] = None,
+    ) -> "LocalVectorIndex":
+        """embedding_list 形式のレコード列から構築（namespace 毎に行を連続配置）"""
+        grouped: Dict[str, List[tuple]] = {}
+        dimension: Optional[int] = None
+        skipped = 0
+        for rec in records:
+            embedding = rec.get("embedding") or rec.get("vector")
+            if not embedding:
+                skipped += 1
+                continue
+            if dimension is None:
+                dimension = len(embedding)
+            elif len(embedding) != dimension:
+                skipped += 1
+                continue
+            rec_id = str(rec.get("id", ""))
+            ns = rec.get("namespace") or DEFAULT_NAMESPACE
+            grouped.setdefault(ns, []).append((rec_id, resolve_title(rec, title_lookup), embedding))
+        if skipped:
+            logger.warning("LocalVectorIndex: 埋め込み欠損/次元不一致の行をスキップ", {"skipped": skipped})
+        ids: List[str] = []
+        titles: List[str] = []
+        namespaces: List[str] = []
+        vectors: List[Any] = []
+        for ns, rows in grouped.items():
+            for rec_id, title, embedding in rows:
+                ids.append(rec_id)
+                titles.append(title)
+                namespaces.append(ns)
+                vectors.append(embedding)
+        matrix = np.asarray(vectors, dtype=np.float32) if vectors else np.zeros((0, dimension or 0), dtype=np.float32)
+        return cls(ids, titles, namespaces, matrix)
+
+    @classmethod
+    def from_jsonl(cls, path: str, title_lookup: Optional[Dict[str, str]] = None) -> "LocalVectorIndex":
+        def _iter() -> Iterable[Dict[str, Any]]:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        return cls.from_records(_iter(), title_lookup)
+
+    @classmethod
+    def from_binary(cls, path: str) -> "LocalVectorIndex":
+        """バイナリ形式を np.memmap（読み取り専用）で開く。行列はコピーせずページキャッシュを共有"""
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ValueError(f"{path}: truncated header")
+            magic, version, flags, rows, dim, _, matrix_offset, table_offset, table_length = _HEADER.unpack_from(header)
+            if magic != BINARY_MAGIC:
+                raise ValueError(f"{path}: not a vector index file")
+            if version != BINARY_VERSION:
+                raise ValueError(f"{path}: unsupported version {version}")
+            f.seek(table_offset)
+            table = json.loads(f.read(table_length).decode("utf-8"))
+        matrix: np.ndarray
+        if rows:
+            matrix = np.memmap(path, dtype="<f4", mode="r", offset=matrix_offset, shape=(rows, dim))
+        else:
+            matrix = np.zeros((0, dim), dtype=np.float32)
+        index = cls(table["ids"], table["titles"], table["namespaces"], matrix, normalized=bool(flags & FLAG_NORMALIZED))
+        index.source_path = path
+        return index
+
+    def save_binary(self, path: str, normalize: bool = True) -> None:
+        """バイナリ形式で書き出す（一時ファイル経由の置換: 読み込み中のワーカーを壊さない）"""
+        write_binary_index(path, self.ids, self.titles, self.namespaces, self.matrix, normalize=normalize)
+
+    def _row_norms(self, dim: int) -> Any:
+        norms = self._norms.get(dim)
+        if norms is None:
+            with self._norms_lock:
+                norms = self._norms.get(dim)
+                if norms is None and self.normalized and dim == self.dimension:
+                    norms = np.ones(len(self.ids), dtype=np.float32)
+                    self._norms[dim] = norms
+                if norms is None:
+                    view = self.matrix if dim == self.dimension else self.matrix[:, :dim]
+                    norms = np.linalg.norm(view, axis=1).astype(np.float32)
+                    norms[norms == 0] = 1.0
+                    self._norms[dim] = norms
+        return norms
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        exact: bool = False,
+    ) -> List[LocalMatch]:
+        """スコア降順の上位 top_k 件（namespace 未指定はデフォルト namespace）
+
+        IVF が取り付けられていれば近傍クラスタのみを探索する（exact=True で全件検索）。
+        """
+        ns = namespace or DEFAULT_NAMESPACE
+        rows = self._ns_rows.get(ns)
+        if rows is None or top_k <= 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        dim = min(int(q.shape[0]), self.dimension)
+        q = q[:dim]
+        q_norm = float(np.linalg.norm(q))
+        if dim == 0 or q_norm == 0.0:
+            return []
+        if self.ivf is not None and not exact:
+            ranges = self.ivf.candidate_ranges(ns, q, rows, top_k)
+            if ranges is not None:
+                return self._top_k_in_ranges(ranges, q, q_norm, dim, top_k)
+        if isinstance(rows, slice):
+            return self._top_k_in_ranges([(rows.start, rows.stop)], q, q_norm, dim, top_k)
+        block = self.matrix[rows]
+        if dim < self.dimension:
+            block = block[:, :dim]
+        cos = (block @ q) / (self._row_norms(dim)[rows] * q_norm)
+        order = self._top_k_order(cos, top_k)
+        return self._matches(rows[order].tolist(), cos[order].tolist())
+
+    def _top_k_in_ranges(self, ranges: List[Tuple[int, int]], q: Any, q_norm: float, dim: int, top_k: int) -> List[LocalMatch]:
+        """連続区間（memmap のビュー）毎にスコアを計算し、区間をまたいで top-k を選ぶ"""
+        norms = self._row_norms(dim)
+        parts = []
+        for start, stop in ranges:
+            block = self.matrix[start:stop]
+            if dim < self.dimension:
+                block = block[:, :dim]
+            parts.append((block @ q) / (norms[start:stop] * q_norm))
+        cos = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        order = self._top_k_order(cos, top_k)
+        # 連結後の位置 -> 元の行番号
+        starts = np.asarray([start for start, _ in ranges], dtype=np.int64)
+        ends = np.cumsum([stop - start for start, stop in ranges])
+        begins = np.concatenate([[0], ends[:-1]])
+        part_idx = np.searchsorted(ends, order, side="right")
+        global_rows = starts[part_idx] + order - begins[part_idx]
+        return self._matches(global_rows.tolist(), cos[order].tolist())
+
+    @staticmethod
+    def _top_k_order(cos: Any, top_k: int) -> Any:
+        k = min(top_k, int(cos.shape[0]))
+        if k < cos.shape[0]:
+            candidates = np.argpartition(-cos, k - 1)[:k]
+        else:
+            candidates = np.arange(cos.shape[0])
+        return candidates[np.argsort(-cos[candidates], kind="stable")]
+
+    def _matches(self, rows: List[int], cos: List[float]) -> List[LocalMatch]:
+        return [
+            LocalMatch(self.ids[r], float((1.0 + c) / 2.0), self.titles[r], self.namespaces[r])
+            for r, c in zip(rows, cos)
+        ]
+
+    def search_titles(self, vector: Sequence[float], top_k: int = 5, namespace: Optional[str] = None) -> List[str]:
+        """Upstash 経路と同じく上位 top_k 件からタイトルを重複除去して返す"""
+        titles: List[str] = []
+        for match in self.query(vector, top_k, namespace):
+            if match.title and match.title not in titles:
+                titles.append(match.title)
+        return titles
+
+
+def write_binary_index(
+    path: str,
+    ids: Sequence[str],
+    titles: Sequence[str],
+    namespaces: Sequence[str],
+    matrix: Any,
+    normalize: bool = True,
+) -> None:
+    """id/title/namespace テーブルと float32 行列をバイナリ形式で書き出す"""
+    matrix = np.ascontiguousarray(matrix, dtype="<f4")
+    rows, dim = (int(matrix.shape[0]), int(matrix.shape[1])) if matrix.ndim == 2 else (0, 0)
+    if normalize and rows:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = (matrix / norms).astype("<f4")
+    table = json.dumps(
+        {"ids": list(ids), "titles": list(titles), "namespaces": list(namespaces)},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    matrix_offset = HEADER_SIZE
+    table_offset = matrix_offset + matrix.nbytes
+    header = _HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, FLAG_NORMALIZED if normalize else 0,
+        rows, dim, 0, matrix_offset, table_offset, len(table),
+    ).ljust(HEADER_SIZE, b"\0")
+    atomic_write(path, [header, matrix.tobytes(), table])
+
+
+def atomic_write(path: str, chunks: Iterable[bytes]) -> None:
+    """一時ファイルへ書いてから置換（読み込み中のワーカーに途中のファイルを見せない）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".vecidx-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def is_binary_index(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    except OSError:
+        return False
+
+
+def resolve_title(record: Dict[str, Any], title_lookup: Optional[Dict[str, str]] = None) -> str:
+    """metadata.title → カードID（"<card_id>:<field>" の前半）からの名前引き → id の順で解決"""
+    meta = record.get("metadata") or {}
+    if isinstance(meta, dict) and meta.get("title"):
+        return str(meta["title"])
+    rec_id = str(record.get("id", ""))
+    if title_lookup:
+        card_id = meta.get("card_id") if isinstance(meta, dict) else None
+        card_id = str(card_id) if card_id else rec_id.split(":", 1)[0]
+        title = title_lookup.get(card_id)
+        if title:
+            return title
+    return rec_id
+
+
+def build_title_lookup(cards: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    return {str(c["id"]): str(c["name"]) for c in cards if isinstance(c, dict) and c.get("id") and c.get("name")}
+
+
+def load_local_vector_index(path: Optional[str] = None) -> Optional[LocalVectorIndex]:
+    """LOCAL_VECTOR_INDEX_PATH → バイナリ形式（embedding_index）→ embedding_list の順で読み込む"""
+    if not NUMPY_AVAILABLE:
+        logger.warning("LocalVectorIndex: numpy 未導入のため利用不可")
+        return None
+    from .storage_service import StorageService
+
+    storage = StorageService()
+    path = (
+        path
+        or os.getenv("LOCAL_VECTOR_INDEX_PATH")
+        or storage.get_file_path("embedding_index")
+        or storage.get_file_path("embedding_list")
+    )
+    if not path or not os.path.exists(path):
+        logger.warning("LocalVectorIndex: 埋め込みファイルが見つかりません", {"path": path})
+        return None
+    if is_binary_index(path):
+        index = LocalVectorIndex.from_binary(path)
+        from .ivf_index import attach_ivf_sidecar
+        attach_ivf_sidecar(index)
+    else:
+        title_lookup = build_title_lookup(storage.load_json_data("data") or [])
+        index = LocalVectorIndex.from_jsonl(path, title_lookup)
+    index.source_path = path
+    logger.info(
+        "LocalVectorIndex: 読み込み完了",
+        {"path": path, "rows": len(index), "dimension": index.dimension, "namespaces": index.namespace_counts},
+    )
+    return index
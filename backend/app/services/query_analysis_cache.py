@@ -0,0 +1,113 @@
+"""
+LLM クエリ解析結果（DatabaseService._analyze_query_with_llm）のキャッシュ
+
+- キー: 正規化済みクエリ（NFKC・空白圧縮・小文字化）+ プロンプト版数 の sha256
+- プロンプト版数: モデル名 + システムプロンプト本文のハッシュ。プロンプトを変更すると自動的に別キーになる
+- 保存先: core.cache.build_cache（既定はプロセス内 AdvancedCache、CACHE_REDIS_URL 設定時は Redis 共有の 2 層）。
+  件数は max_memory_mb、鮮度は ttl で制限
+- 保存するのは LLM 応答を JSON として解釈できた dict のみ（エラー時のフォールバック解析は保存しない）
+- ヒット時は LLM 呼び出しに掛かった時間を「節約できた時間」として集計する
+"""
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import os
+import copy
+import time
+import hashlib
+import logging
+
+from ..core.cache import build_cache
+from .embedding_cache import normalize_query_text
+
+logger = logging.getLogger(__name__)
+
+
+class QueryAnalysisCache:
+    """構造化済みクエリ解析（conditions 等の dict）を保持する"""
+
+    def __init__(self, ttl: int = 3600, max_memory_mb: int = 8) -> None:
+        self.cache = build_cache("query_analysis", default_ttl=ttl, max_memory_mb=max_memory_mb)
+        self.ttl = ttl
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "llm_calls": 0,
+            "errors": 0,
+        }
+        self.saved_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["QueryAnalysisCache"]:
+        if os.getenv("QUERY_ANALYSIS_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            ttl=int(os.getenv("QUERY_ANALYSIS_CACHE_TTL", "3600")),
+            max_memory_mb=int(os.getenv("QUERY_ANALYSIS_CACHE_MAX_MB", "8")),
+        )
+
+    @staticmethod
+    def prompt_version(prompt: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(query: str, prompt_version: str) -> str:
+        normalized = normalize_query_text(query).lower()
+        return hashlib.sha256(f"analysis\0{prompt_version}\0{normalized}".encode("utf-8")).hexdigest()
+
+    async def get(self, query: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        """キャッシュ済みの解析結果（呼び出し側で変更しても良いよう複製を返す）"""
+        try:
+            entry = await self.cache.get(self.make_key(query, prompt_version))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("QueryAnalysisCache: 取得失敗（LLM 解析を実行）", exc_info=e)
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.saved_seconds += float(entry.get("latency", 0.0))
+        analysis: Dict[str, Any] = entry["analysis"]
+        return copy.deepcopy(analysis)
+
+    async def put(self, query: str, prompt_version: str, analysis: Any, latency: float) -> None:
+        """LLM 解析結果と、その取得に掛かった秒数を保存（JSON オブジェクト以外の応答は保存しない）"""
+        self.stats["llm_calls"] += 1
+        self.llm_seconds += latency
+        if not isinstance(analysis, dict):
+            return
+        try:
+            await self.cache.set(
+                self.make_key(query, prompt_version),
+                {"analysis": copy.deepcopy(analysis), "latency": latency, "cached_at": time.time()},
+                self.ttl,
+                compress=False,
+            )
+            self.stats["stored"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("QueryAnalysisCache: 保存失敗（解析結果は返却）", exc_info=e)
+
+    async def clear(self) -> None:
+        await self.cache.clear()
+
+    async def close(self) -> None:
+        close = getattr(self.cache, "close", None)
+        if close is not None:
+            await close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        llm_calls = self.stats["llm_calls"]
+        return {
+            "enabled": True,
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "saved_latency_seconds": round(self.saved_seconds, 3),
+            "average_llm_latency_seconds": round(self.llm_seconds / llm_calls, 3) if llm_calls else 0.0,
+            "entries": len(self.cache.cache),
+            "backend": self.cache.get_stats().get("backend", "memory"),
+            "ttl": self.ttl,
+        }
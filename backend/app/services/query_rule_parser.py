@@ -0,0 +1,236 @@
+"""
+ルールベースのクエリ解析（LLM を使わない高速経路）
+
+DatabaseService._analyze_query_with_llm と同じ conditions スキーマを返し、併せて確信度（0〜1）を付ける。
+- 数値条件: 「5コスト」「HP5以上」「攻撃力3～5」「コスト2または3」「約HP6」など（範囲 / 複数値 / 近似 / 比較）
+- 語彙: クラス・レアリティ・タイプ・keywords・効果・声優・イラストレーター（既知の語の完全一致）
+- 確信度 = 条件として解釈できた文字数 / （解釈できた文字数 + 解釈できずに残った文字数）。
+  助詞・「カード」「探して」等の定型語、ひらがなのみの断片は残りに数えない
+- 否定（以外・除く・ない）や同じ項目への複数値（「エルフかロイヤル」）、Q&A・集約・カード名らしき語など
+  スキーマで表せない・判断できない表現が含まれる場合は確信度が下がり、LLM 解析に回る
+
+正規表現はすべてクラス属性としてモジュール読み込み時に 1 度だけコンパイルする。
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+import os
+import re
+import unicodedata
+
+CLASSES = ("エルフ", "ドラゴン", "ロイヤル", "ウィッチ", "ネクロマンサー", "ビショップ", "ネメシス", "ヴァンパイア", "ニュートラル", "ナイトメア")
+RARITIES = ("レジェンド", "ゴールドレア", "シルバーレア", "ブロンズレア")
+# 「土の印」はタイプとキーワードの両方に現れるため、どちらとも決めずに LLM に任せる
+TYPES = ("ルミナス", "マナリア", "レヴィオン", "アナテマ")
+KEYWORDS = (
+    "ファンファーレ", "ラストワード", "コンボ", "覚醒", "スペルブースト",
+    "ネクロマンス", "エンハンス", "アクセラレート", "チョイス", "融合",
+    "疾走", "守護", "突進", "必殺", "潜伏", "進化時", "超進化時", "アクト",
+    "カウントダウン", "バリア", "モード", "土の秘術", "リアニメイト", "攻撃時",
+    "威圧", "オーラ", "ドレイン", "交戦時", "アポカリプスデッキ",
+)
+EFFECTS = ("進化", "回復", "ドロー", "サーチ", "召喚", "破壊")
+CV_NAMES = ("門脇舞以", "日笠陽子", "内田雄馬", "辻あゆみ", "潘めぐみ")
+# 1 文字の「林」はカード名等と衝突しやすいため対象外
+ILLUSTRATORS = ("ツネくん", "やまもも", "伊吹つくば", "misekiss", "言犬", "りょうへい", "あかかがち")
+
+NUMERIC_LABELS = {
+    "cost": r"コスト|マナ|cost",
+    "hp": r"HP|体力|ヒットポイント",
+    "attack": r"攻撃力|攻撃|ダメージ|アタック|attack",
+}
+# 比較表現 → (演算子, 値の補正)
+COMPARISONS = {
+    "以上": ("以上", 0),
+    "以下": ("以下", 0),
+    "未満": ("以下", -1),
+    "より下": ("以下", -1),
+    "超": ("以上", 1),
+    "より上": ("以上", 1),
+}
+
+
+def _alternation(words: Tuple[str, ...]) -> Pattern[str]:
+    """長い語を優先する選択パターン（「超進化時」を「進化時」より先に試す）"""
+    return re.compile("|".join(re.escape(word) for word in sorted(words, key=len, reverse=True)), re.IGNORECASE)
+
+
+def _numeric_patterns(label: str) -> List[Tuple[str, Pattern[str]]]:
+    number = r"(\d+)"
+    separator = r"\s*[がはの:]?\s*"
+    comparison = "|".join(sorted(COMPARISONS, key=len, reverse=True))
+    return [
+        ("範囲", re.compile(rf"(?:{label}){separator}{number}\s*(?:から|~|〜|-|ー)\s*{number}\s*(?:の間|まで)?", re.IGNORECASE)),
+        ("複数値", re.compile(rf"(?:{label}){separator}{number}\s*(?:または|か|or)\s*{number}", re.IGNORECASE)),
+        ("近似", re.compile(
+            rf"(?:約|およそ)\s*(?:{label}){separator}{number}"
+            rf"|(?:{label}){separator}(?:約|およそ)\s*{number}"
+            rf"|(?:{label}){separator}{number}\s*(?:程度|くらい|ぐらい|前後)",
+            re.IGNORECASE,
+        )),
+        ("比較", re.compile(rf"(?:{label}){separator}{number}\s*({comparison})?", re.IGNORECASE)),
+    ]
+
+
+class RuleParseResult:
+    """ルールベース解析の結果（analysis は _analyze_query_with_llm と同じ形）"""
+
+    __slots__ = ("analysis", "confidence", "unparsed")
+
+    def __init__(self, analysis: Dict[str, Any], confidence: float, unparsed: str) -> None:
+        self.analysis = analysis
+        self.confidence = confidence
+        self.unparsed = unparsed
+
+
+class RuleBasedQueryParser:
+    """構造化しやすい定型クエリを LLM なしで conditions に変換する"""
+
+    NUMERIC_PATTERNS: Dict[str, List[Tuple[str, Pattern[str]]]] = {
+        field: _numeric_patterns(label) for field, label in NUMERIC_LABELS.items()
+    }
+    # 「5コスト」「3コスト以上」（数値が先に来る形）
+    COST_SUFFIX_PATTERN = re.compile(
+        r"(\d+)\s*コスト\s*(" + "|".join(sorted(COMPARISONS, key=len, reverse=True)) + r")?"
+    )
+    VOCABULARY: Tuple[Tuple[str, Pattern[str]], ...] = (
+        ("keywords", _alternation(KEYWORDS)),
+        ("class", _alternation(CLASSES)),
+        ("rarity", _alternation(RARITIES)),
+        ("type", _alternation(TYPES)),
+        ("cv", _alternation(CV_NAMES)),
+        ("illustrator", _alternation(ILLUSTRATORS)),
+        ("effect", _alternation(EFFECTS)),
+    )
+    # 検索意図を変える（スキーマで表せない）表現。含まれていれば確信度 0
+    NEGATION_PATTERN = re.compile(r"以外|除く|除いて|除外|ない|無い|じゃない|not\b", re.IGNORECASE)
+    # 条件を持たない定型語（残りの文字数に数えない）
+    FILLER_PATTERN = re.compile(
+        r"カード|一覧|リスト|全部|すべて|全て|検索|探して|探す|教えて|見せて|表示|出して|知りたい"
+        r"|ください|下さい|持っている|持ってる|持つ|効果|能力|クラス|レアリティ|タイプ|属性|キーワード"
+        r"|かつ|且つ|および|及び|and|[、。・,.!?！？「」『』()（）\s]",
+        re.IGNORECASE,
+    )
+    HIRAGANA_ONLY = re.compile(r"^[ぁ-ゟー]+$")
+
+    def __init__(self, min_confidence: float = 0.9) -> None:
+        self.min_confidence = min_confidence
+        self.stats: Dict[str, int] = {"accepted": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["RuleBasedQueryParser"]:
+        if os.getenv("QUERY_RULE_PARSER_ENABLED", "true").lower() != "true":
+            return None
+        return cls(min_confidence=float(os.getenv("QUERY_RULE_PARSER_MIN_CONFIDENCE", "0.9")))
+
+    @staticmethod
+    def empty_conditions() -> Dict[str, Any]:
+        return {
+            "name": "",
+            "rarity": "",
+            "cost": {"value": None, "operator": None},
+            "class": "",
+            "hp": {"value": None, "operator": None},
+            "attack": {"value": None, "operator": None},
+            "type": "",
+            "effect": "",
+            "keywords": [],
+            "cv": "",
+            "illustrator": "",
+            "qa_search": "",
+        }
+
+    def parse(self, query: str) -> RuleParseResult:
+        text = unicodedata.normalize("NFKC", query or "")
+        conditions = self.empty_conditions()
+        covered = [False] * len(text)
+        ambiguous = bool(self.NEGATION_PATTERN.search(text))
+
+        def claim(match: "re.Match[str]") -> bool:
+            span = range(match.start(), match.end())
+            if any(covered[i] for i in span):
+                return False
+            for i in span:
+                covered[i] = True
+            return True
+
+        # 数値条件（範囲 → 複数値 → 近似 → 比較の順に、より具体的な形を優先）
+        for field, patterns in self.NUMERIC_PATTERNS.items():
+            for kind, pattern in patterns:
+                for match in pattern.finditer(text):
+                    if not claim(match):
+                        continue
+                    if conditions[field]["value"] is not None:
+                        ambiguous = True
+                        continue
+                    conditions[field] = self._numeric_condition(kind, match)
+        for match in self.COST_SUFFIX_PATTERN.finditer(text):
+            if not claim(match):
+                continue
+            if conditions["cost"]["value"] is not None:
+                ambiguous = True
+                continue
+            conditions["cost"] = self._numeric_condition("比較", match)
+
+        # 既知の語（keywords は複数可、その他は 1 つのみ）
+        for field, pattern in self.VOCABULARY:
+            for match in pattern.finditer(text):
+                if not claim(match):
+                    continue
+                value = match.group(0)
+                if field == "keywords":
+                    if value not in conditions["keywords"]:
+                        conditions["keywords"].append(value)
+                elif conditions[field] and conditions[field] != value:
+                    ambiguous = True
+                else:
+                    conditions[field] = value
+
+        parsed = sum(covered)
+        rest = "".join(" " if flag else char for char, flag in zip(text, covered))
+        unparsed = [
+            fragment for fragment in self.FILLER_PATTERN.split(rest)
+            if fragment and not self.HIRAGANA_ONLY.match(fragment)
+        ]
+        unparsed_chars = sum(len(fragment) for fragment in unparsed)
+        confidence = 0.0 if ambiguous or not parsed else parsed / (parsed + unparsed_chars)
+        analysis = {
+            "conditions": conditions,
+            "reasoning": f"ルールベース解析: {query}",
+            "source": "rule",
+            "confidence": round(confidence, 3),
+        }
+        return RuleParseResult(analysis, confidence, " ".join(unparsed))
+
+    def try_parse(self, query: str) -> Optional[Dict[str, Any]]:
+        """確信度が min_confidence 以上なら解析結果、そうでなければ None（LLM 解析へ）"""
+        result = self.parse(query)
+        if result.confidence >= self.min_confidence:
+            self.stats["accepted"] += 1
+            return result.analysis
+        self.stats["rejected"] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats["accepted"] + self.stats["rejected"]
+        return {
+            "enabled": True,
+            **self.stats,
+            "accept_rate": self.stats["accepted"] / total if total else 0.0,
+            "min_confidence": self.min_confidence,
+        }
+
+    @staticmethod
+    def _numeric_condition(kind: str, match: "re.Match[str]") -> Dict[str, Any]:
+        numbers = [int(group) for group in match.groups() if group is not None and group.isdigit()]
+        if kind == "範囲":
+            low, high = sorted(numbers[:2])
+            return {"value": low, "operator": "範囲", "max_value": high}
+        if kind == "複数値":
+            return {"value": numbers[0], "operator": "複数値", "additional_values": [numbers[1]]}
+        if kind == "近似":
+            return {"value": numbers[0], "operator": "近似"}
+        comparison = match.groups()[-1]
+        if comparison in COMPARISONS:
+            operator, adjust = COMPARISONS[comparison]
+            return {"value": numbers[0] + adjust, "operator": operator}
+        return {"value": numbers[0], "operator": "等しい"}
@@ -0,0 +1,133 @@
+"""
+/chat 応答キャッシュ（single-flight 付き）
+
+- キー: 正規化済み質問（NFKC・空白圧縮・小文字化）+ top_k + with_context の sha256
+- 保存先: core.cache.build_cache（既定はプロセス内 AdvancedCache、CACHE_REDIS_URL 設定時は Redis 共有の 2 層）。
+  ワーカー毎に ServiceContainer が保持する
+- 同一キーの同時リクエストは 1 本のパイプライン（Embedding → Vector → LLM）の結果を共有する
+- フォールバック応答（いずれかの段で例外）はキャッシュしない（共有のみ）
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import os
+import time
+import asyncio
+import hashlib
+import logging
+
+from ..core.cache import build_cache
+from .embedding_cache import normalize_query_text
+
+logger = logging.getLogger(__name__)
+
+# compute() の戻り値: (応答, キャッシュ可否)
+ChatComputation = Callable[[], Awaitable[Tuple[Dict[str, Any], bool]]]
+
+
+class ChatResponseCache:
+    """/chat の完成済み応答を保持し、同時の同一質問を 1 回の計算にまとめる"""
+
+    def __init__(self, ttl: int = 600, max_memory_mb: int = 32, enabled: bool = True) -> None:
+        self.cache = build_cache("chat", default_ttl=ttl, max_memory_mb=max_memory_mb)
+        self.ttl = ttl
+        self.enabled = enabled
+        self._inflight: Dict[str, "asyncio.Future[Tuple[Dict[str, Any], bool]]"] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "uncacheable": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ChatResponseCache":
+        return cls(
+            ttl=int(os.getenv("CHAT_RESPONSE_CACHE_TTL", "600")),
+            max_memory_mb=int(os.getenv("CHAT_RESPONSE_CACHE_MAX_MB", "32")),
+            enabled=os.getenv("CHAT_RESPONSE_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    @staticmethod
+    def make_key(question: str, top_k: int, with_context: bool) -> str:
+        normalized = normalize_query_text(question).lower()
+        return hashlib.sha256(f"chat\0{normalized}\0{top_k}\0{int(bool(with_context))}".encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        question: str,
+        top_k: int,
+        with_context: bool,
+        compute: ChatComputation,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(応答, キャッシュメタデータ) を返す。メタデータは応答の "cache" フィールドに載せる想定"""
+        if not self.enabled:
+            response, _ = await compute()
+            return response, {"hit": False, "coalesced": False}
+
+        key = self.make_key(question, top_k, with_context)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return dict(cached["response"]), {
+                "hit": True,
+                "coalesced": False,
+                "age_seconds": round(time.time() - cached["cached_at"], 3),
+            }
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            try:
+                response, _ = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # 先行リクエストがキャンセルされた場合は自分で計算し直す（自分自身のキャンセルは伝播）
+                if not pending.cancelled():
+                    raise
+                return await self.get_or_compute(question, top_k, with_context, compute)
+            return dict(response), {"hit": True, "coalesced": True}
+
+        self.stats["misses"] += 1
+        future: "asyncio.Future[Tuple[Dict[str, Any], bool]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response, cacheable = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 待機者がいない場合の "never retrieved" 警告を抑止
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result((response, cacheable))
+        if cacheable:
+            try:
+                await self.cache.set(key, {"response": response, "cached_at": time.time()}, self.ttl, compress=False)
+            except Exception as e:
+                logger.warning("ChatResponseCache: 保存失敗（応答は継続）", exc_info=e)
+        else:
+            self.stats["uncacheable"] += 1
+        return dict(response), {"hit": False, "coalesced": False}
+
+    async def clear(self) -> None:
+        await self.cache.clear()
+
+    async def close(self) -> None:
+        close = getattr(self.cache, "close", None)
+        if close is not None:
+            await close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        served = self.stats["hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            **self.stats,
+            "hit_rate": served / total if total else 0.0,
+            "inflight": len(self._inflight),
+            "entries": len(self.cache.cache),
+            "backend": self.cache.get_stats().get("backend", "memory"),
+            "ttl": self.ttl,
+        }
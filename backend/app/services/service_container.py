@@ -0,0 +1,126 @@
+"""
+/chat ホットパス用のプロセス内サービスコンテナ
+
+- EmbeddingService / VectorService / LLMService をワーカー毎に1度だけ構築して再利用
+- /chat 応答キャッシュ（ChatResponseCache）もワーカー単位で保持
+  （OpenAI / Upstash の HTTP クライアントと keep-alive 接続をリクエスト間で共有）
+- main.lifespan で構築・ウォームアップし、FastAPI の依存性注入でハンドラへ渡す
+- lifespan が走らない環境（TestClient をコンテキスト外で使う等）では初回アクセス時に遅延構築
+"""
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import os
+import threading
+import time
+import logging
+
+from fastapi import Depends, Request
+
+from .embedding_service import EmbeddingService
+from .vector_service import VectorService
+from .llm_service import LLMService
+from .response_cache import ChatResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """ワーカープロセス内で共有する外部サービス群"""
+
+    def __init__(self) -> None:
+        started = time.perf_counter()
+        self.embedding_service = EmbeddingService()
+        self.vector_service = VectorService()
+        self.llm_service = LLMService()
+        self.response_cache = ChatResponseCache.from_env()
+        self.created_at = time.time()
+        self.build_seconds = time.perf_counter() - started
+        self.warmed_up = False
+
+    async def warmup(self) -> None:
+        """初回リクエストで発生する遅延初期化を前倒しで実行"""
+        if self.warmed_up:
+            return
+        # ローカルベクトルインデックスは外部依存がないため常に前倒しで読み込む
+        if self.vector_service.backend == "local":
+            await self.vector_service.initialize()
+        # 外部APIへの疎通（TLSハンドシェイク込み）は明示的に有効化した場合のみ。
+        # 既定では起動を外部APIの可用性に依存させない
+        if os.getenv("BACKEND_WARMUP_EXTERNAL", "false").lower() == "true":
+            try:
+                await self.embedding_service.get_embedding("warmup")
+                await self.vector_service.initialize()
+            except Exception as e:
+                logger.warning("ServiceContainer: ウォームアップ失敗（起動は継続）", exc_info=e)
+        self.warmed_up = True
+
+    async def close(self) -> None:
+        """保持している HTTP クライアント / 接続プールを解放"""
+        for service in (self.embedding_service, self.vector_service, self.llm_service, self.response_cache):
+            try:
+                await service.close()
+            except Exception as e:
+                logger.warning("ServiceContainer: クライアントのクローズ失敗", exc_info=e)
+
+    def get_info(self) -> Dict[str, Any]:
+        """診断用の構築情報"""
+        return {
+            "created_at": self.created_at,
+            "build_seconds": self.build_seconds,
+            "warmed_up": self.warmed_up,
+            "embedding_mock": self.embedding_service.is_mock,
+            "embedding_cache": self.embedding_service.get_cache_stats(),
+            "vector_backend": self.vector_service.backend,
+            "vector_enabled": self.vector_service.enabled,
+            "llm_mock": self.llm_service.mock,
+            "response_cache": self.response_cache.get_stats(),
+        }
+
+
+_container_lock = threading.Lock()
+_container: Optional[ServiceContainer] = None
+
+
+def get_default_container() -> ServiceContainer:
+    """プロセス共有のコンテナを取得（未構築なら構築）"""
+    global _container
+    if _container is not None:
+        return _container
+    with _container_lock:
+        if _container is None:
+            _container = ServiceContainer()
+            logger.info("ServiceContainer: 構築完了", extra={"extra_data": _container.get_info()})
+        return _container
+
+
+def reset_default_container() -> Optional[ServiceContainer]:
+    """プロセス共有のコンテナを破棄（シャットダウン/テスト用）。破棄前のインスタンスを返す"""
+    global _container
+    with _container_lock:
+        previous, _container = _container, None
+    return previous
+
+
+# --- FastAPI dependencies ---
+
+def get_service_container(request: Request) -> ServiceContainer:
+    container = getattr(request.app.state, "services", None)
+    if container is None:
+        container = get_default_container()
+    return container
+
+
+def get_embedding_service(container: ServiceContainer = Depends(get_service_container)) -> EmbeddingService:
+    return container.embedding_service
+
+
+def get_vector_service(container: ServiceContainer = Depends(get_service_container)) -> VectorService:
+    return container.vector_service
+
+
+def get_llm_service(container: ServiceContainer = Depends(get_service_container)) -> LLMService:
+    return container.llm_service
+
+
+def get_response_cache(container: ServiceContainer = Depends(get_service_container)) -> ChatResponseCache:
+    return container.response_cache
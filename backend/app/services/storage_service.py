@@ -21,6 +21,7 @@ from ..core.config import settings
 from ..core.exceptions import StorageException
 from ..core.decorators import handle_service_exceptions
 from ..core.logging import GameChatLogger
+from .json_stream import JsonContainerStream
 
 
 class StorageService:
@@ -41,6 +42,9 @@ class StorageService:
         self.is_cloud_environment = settings.BACKEND_ENVIRONMENT == "production"
         self.cache_dir = Path("/tmp/gamechat-data") if self.is_cloud_environment else None
         self._override_data_path = data_path  # 追加: 明示的なdata.jsonパス
+        # GCS パス → generation（キャッシュ済みファイルの版 / get_data_version で確認した最新の版）
+        self._cached_generations: Dict[str, Any] = {}
+        self._remote_generations: Dict[str, Any] = {}
         
         # Cloud環境でのみGoogle Cloud Storageクライアントを初期化
         if self.is_cloud_environment and self.bucket_name and GCS_AVAILABLE:
@@ -93,8 +97,15 @@ class StorageService:
                 })
                 return False
             
-            # ダウンロード実行
-            blob.download_to_filename(local_path)
+            # ダウンロード実行（一時ファイル経由で置換: 並行する他ワーカーに途中のファイルを見せない）
+            tmp_path = f"{local_path}.{os.getpid()}.tmp"
+            try:
+                blob.download_to_filename(tmp_path)
+                os.replace(tmp_path, local_path)
+                self._cached_generations[gcs_path] = blob.generation
+            finally:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
             
             GameChatLogger.log_success("storage_service", "GCSからダウンロード完了", {
                 "gcs_path": gcs_path,
@@ -125,6 +136,7 @@ class StorageService:
             "data": self._override_data_path if self._override_data_path and file_key == "data" else settings.DATA_FILE_PATH,
             "convert_data": settings.CONVERTED_DATA_FILE_PATH,
             "embedding_list": settings.EMBEDDING_FILE_PATH,
+            "embedding_index": settings.EMBEDDING_INDEX_FILE_PATH,
             "query_data": settings.QUERY_DATA_FILE_PATH
         }
         
@@ -143,6 +155,7 @@ class StorageService:
             "data": "data/data.json",
             "convert_data": "data/convert_data.json", 
             "embedding_list": "data/embedding_list.jsonl",
+            "embedding_index": "data/embedding_index.bin",
             "query_data": "data/query_data.json"
         }
         
@@ -154,7 +167,7 @@ class StorageService:
         ファイルキーに基づいて利用可能なファイルパスを取得
         
         Args:
-            file_key: データファイルのキー ("data", "convert_data", "embedding_list", "query_data")
+            file_key: データファイルのキー ("data", "convert_data", "embedding_list", "embedding_index", "query_data")
             
         Returns:
             利用可能なファイルパス、または None（エラー時）
@@ -196,8 +209,10 @@ class StorageService:
             return None
         cache_path = self.cache_dir / f"{file_key}.cache"
         
-        # キャッシュが存在する場合はそれを使用
-        if cache_path.exists():
+        # キャッシュが存在する場合はそれを使用（GCS 側の更新を確認済みなら取り直す）
+        gcs_path = self._get_gcs_file_path(file_key)
+        remote_generation = self._remote_generations.get(gcs_path)
+        if cache_path.exists() and (remote_generation is None or remote_generation == self._cached_generations.get(gcs_path)):
             GameChatLogger.log_info("storage_service", "キャッシュファイルを使用", {
                 "file_key": file_key,
                 "cache_path": str(cache_path)
@@ -205,9 +220,14 @@ class StorageService:
             return str(cache_path)
         
         # GCSからダウンロードを試行
-        gcs_path = self._get_gcs_file_path(file_key)
         if self._download_from_gcs(gcs_path, str(cache_path)):
             return str(cache_path)
+        if cache_path.exists():
+            GameChatLogger.log_warning("storage_service", "GCSの更新版を取得できないため既存キャッシュを使用", {
+                "file_key": file_key,
+                "cache_path": str(cache_path)
+            })
+            return str(cache_path)
         
         # GCSからのダウンロードに失敗した場合、ローカルファイルを試行
         local_path = self._get_local_file_path(file_key)
@@ -227,6 +247,28 @@ class StorageService:
         })
         return None
     
+    @handle_service_exceptions("storage", fallback_return=None)
+    def get_data_version(self, file_key: str = "data") -> Optional[str]:
+        """
+        データファイルの版（変更検知用）
+
+        Cloud環境では GCS オブジェクトの generation（メタデータのみ取得）、
+        ローカル環境ではファイルの更新時刻とサイズ。取得できなければ None。
+        新しい generation を確認した後の get_file_path / load_json_data はキャッシュを使わずに取り直す。
+        """
+        if self.is_cloud_environment and self.bucket:
+            gcs_path = self._get_gcs_file_path(file_key)
+            blob = self.bucket.get_blob(gcs_path)
+            if blob is None:
+                return None
+            self._remote_generations[gcs_path] = blob.generation
+            return f"gcs:{blob.generation}"
+        try:
+            stat = os.stat(self._get_local_file_path(file_key))
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
     @handle_service_exceptions("storage", fallback_return=[])
     def load_json_data(self, file_key: str) -> List[Dict[str, Any]]:
         """
@@ -247,16 +289,17 @@ class StorageService:
             return []
         
         try:
+            # ファイル全体を文字列として保持せず、カード 1 件ずつ読み込む
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            if not isinstance(data, list):
-                GameChatLogger.log_error("storage_service", "データファイル形式が不正です", Exception("Invalid data format"), {
-                    "file_key": file_key,
-                    "file_path": file_path,
-                    "data_type": type(data).__name__
-                })
-                return []
+                stream = JsonContainerStream(f)
+                if stream.kind != "array":
+                    GameChatLogger.log_error("storage_service", "データファイル形式が不正です", Exception("Invalid data format"), {
+                        "file_key": file_key,
+                        "file_path": file_path,
+                        "data_type": "dict"
+                    })
+                    return []
+                data = list(stream.values())
                 
             GameChatLogger.log_success("storage_service", "データファイル読み込み完了", {
                 "file_key": file_key,
@@ -0,0 +1,153 @@
+"""
+文字 n-gram（2-gram / 3-gram）転置インデックス
+
+形態素解析を使わずに日本語を扱うため、小文字化したテキストの連続 2 文字・3 文字を語とする。
+- 部分一致: 検索語の 3-gram（2 文字なら 2-gram）の posting list の積集合を候補とし、実テキストで確認する。
+  1 文字の検索語のみ全件走査。結果は全件に `term in text` を適用した場合と同じ
+- 順位付け: 検索語毎の BM25（tf = テキスト中の出現回数、文書長 = 文字数）
+- n-gram の抽出・整列は NumPy で一括処理する（コードポイント列から (n-gram, 行) の組を作り lexsort）
+- 再構築時、テキストが直前のインデックスと同一ならそのまま再利用する（reload_data での差分更新）
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    NUMPY_AVAILABLE = False
+
+SEARCHABLE_FIELDS = (
+    "id", "name", "class", "rarity", "cost", "attack", "hp", "type",
+    "effect_1", "effect_2", "effect_3", "effect_4", "effect_5",
+    "cv", "illustrator", "crest",
+)
+# コードポイントは 21 bit に収まるので、2-gram / 3-gram を int64 1 つに詰める
+CODEPOINT_BITS = 21
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def build_searchable_text(item: Dict[str, Any]) -> str:
+    """カードの検索対象テキスト（各フィールド・keywords・Q&A を空白区切りで連結）"""
+    text = []
+    for field in SEARCHABLE_FIELDS:
+        if field in item and item[field]:
+            text.append(str(item[field]))
+    # keywords, qaも追加
+    if "keywords" in item and isinstance(item["keywords"], list):
+        text.extend([str(k) for k in item["keywords"]])
+    if "qa" in item and isinstance(item["qa"], list):
+        for qa_item in item["qa"]:
+            if isinstance(qa_item, dict):
+                text.append(qa_item.get("question", ""))
+                text.append(qa_item.get("answer", ""))
+    return " ".join(text)
+
+
+def _codepoints(text: str) -> Any:
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.int64)
+
+
+def _gram_keys(codes: Any, n: int) -> Any:
+    keys = codes[:codes.size - n + 1].copy()
+    for offset in range(1, n):
+        keys = (keys << CODEPOINT_BITS) | codes[offset:codes.size - n + 1 + offset]
+    return keys
+
+
+class _GramPostings:
+    """n-gram キー（昇順・重複なし）→ そのキーを含む行（昇順）"""
+
+    def __init__(self, codes: Any, doc_of: Any, n: int) -> None:
+        if codes.size < n:
+            self.keys = np.empty(0, dtype=np.int64)
+            self.starts = np.zeros(1, dtype=np.int64)
+            self.rows = np.empty(0, dtype=np.int64)
+            return
+        keys = _gram_keys(codes, n)
+        docs = doc_of[:keys.size]
+        same_doc = docs == doc_of[n - 1:]
+        keys, docs = keys[same_doc], docs[same_doc]
+        order = np.lexsort((docs, keys))
+        keys, docs = keys[order], docs[order]
+        # (キー, 行) の重複を除く
+        first = np.ones(keys.size, dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (docs[1:] != docs[:-1])
+        keys, docs = keys[first], docs[first]
+        boundaries = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if keys.size else np.empty(0, dtype=np.int64)
+        self.keys = keys[boundaries]
+        self.starts = np.r_[boundaries, keys.size].astype(np.int64)
+        self.rows = docs
+
+    def lookup(self, key: int) -> Any:
+        position = int(np.searchsorted(self.keys, key))
+        if position >= self.keys.size or self.keys[position] != key:
+            return np.empty(0, dtype=np.int64)
+        return self.rows[self.starts[position]:self.starts[position + 1]]
+
+
+class NgramIndex:
+    """テキスト列（1 行 1 文書）の 2-gram / 3-gram 転置インデックス"""
+
+    def __init__(self, texts: List[str]) -> None:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for NgramIndex")
+        self.texts = texts
+        self.size = len(texts)
+        self.lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=self.size)
+        self.average_length = float(self.lengths.mean()) if self.size else 0.0
+        codes = _codepoints("".join(texts))
+        doc_of = np.repeat(np.arange(self.size, dtype=np.int64), self.lengths)
+        self.bigrams = _GramPostings(codes, doc_of, 2)
+        self.trigrams = _GramPostings(codes, doc_of, 3)
+
+    @classmethod
+    def build(cls, texts: List[str], previous: Optional["NgramIndex"] = None) -> "NgramIndex":
+        """texts が直前のインデックスと同一なら再利用し、異なる場合のみ再構築する"""
+        if previous is not None and previous.texts == texts:
+            return previous
+        return cls(texts)
+
+    def rows_containing(self, term: str) -> Any:
+        """`term in text` となる行（昇順）"""
+        if not term:
+            return np.arange(self.size, dtype=np.int64)
+        if len(term) == 1:
+            return np.flatnonzero(np.array([term in text for text in self.texts], dtype=bool))
+        codes = _codepoints(term)
+        if len(term) == 2:
+            return self.bigrams.lookup(int(_gram_keys(codes, 2)[0]))
+        postings = sorted((self.trigrams.lookup(int(key)) for key in np.unique(_gram_keys(codes, 3))), key=len)
+        rows = postings[0]
+        for posting in postings[1:]:
+            if rows.size == 0:
+                break
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+        texts = self.texts
+        return rows[np.array([term in texts[row] for row in rows.tolist()], dtype=bool)] if rows.size else rows
+
+    def bm25(self, terms: Sequence[str]) -> Tuple[Any, Any]:
+        """検索語（小文字化済み）のいずれかを含む行と BM25 スコア（行の昇順）"""
+        scores = np.zeros(self.size, dtype=np.float64)
+        hit = np.zeros(self.size, dtype=bool)
+        for term in dict.fromkeys(terms):
+            if not term:
+                continue
+            rows = self.rows_containing(term)
+            if rows.size == 0:
+                continue
+            tf = np.array([self.texts[row].count(term) for row in rows.tolist()], dtype=np.float64)
+            scores[rows] += bm25_weights(tf, self.lengths[rows], rows.size, self.size, self.average_length)
+            hit[rows] = True
+        rows = np.flatnonzero(hit)
+        return rows, scores[rows]
+
+
+def bm25_weights(tf: Any, lengths: Any, document_frequency: int, total_documents: int, average_length: float) -> Any:
+    """1 検索語分の BM25（Lucene と同じ非負の idf）"""
+    idf = math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (average_length or 1.0))
+    return idf * tf * (BM25_K1 + 1) / (tf + norm)
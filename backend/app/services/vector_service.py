@@ -1,72 +1,190 @@
 # Minimal VectorService for MVP
 from __future__ import annotations
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 import os
+import asyncio
 import hashlib
 import logging
+import threading
+
+from ..core.database import ConnectionPoolConfig, UpstashVectorPool
+from .local_vector_index import LocalVectorIndex, NUMPY_AVAILABLE, load_local_vector_index
+
 logger = logging.getLogger(__name__)
 try:
     from upstash_vector import Index  # type: ignore
 except Exception:
     Index = None  # type: ignore
 
+def fuse_rankings(
+    rankings: Iterable[Sequence[Tuple[str, float]]],
+    method: str = "rrf",
+    rrf_k: int = 60,
+) -> List[str]:
+    """namespace 毎の (タイトル, スコア) 順位リストをタイトル単位で融合
+
+    - max: 各タイトルの最高スコア
+    - rrf: Reciprocal Rank Fusion（Σ 1 / (rrf_k + 順位)）。スコア尺度の異なる namespace 間でも頑健
+    同点は先に現れたタイトルを優先する。
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, (title, score) in enumerate(ranking, 1):
+            if method == "max":
+                fused[title] = max(fused.get(title, float("-inf")), score)
+            else:
+                fused[title] = fused.get(title, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused, key=lambda t: -fused[t])
+
+
 class VectorService:
+    """ベクトル検索（VECTOR_BACKEND で切替）
+
+    - upstash（既定）: UpstashVectorPool 経由。同期クライアント（upstash_vector.Index）の呼び出しは
+      プールの executor 上で実行し、Index（= httpx keep-alive 接続）はリクエスト間で再利用する
+    - local: embedding_list をプロセス内の LocalVectorIndex に載せて検索（WAN 往復なし）
+    - UPSTASH_VECTOR_NAMESPACES 設定時は複数 namespace を同時に検索し、タイトル単位で融合
+    """
     def __init__(self) -> None:
+        self.backend = os.getenv("VECTOR_BACKEND", "upstash").strip().lower()
         self.url = os.getenv("UPSTASH_VECTOR_REST_URL")
         self.token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
         # 後追い恒久対応: 名前空間を環境変数で指定可能（未設定ならデフォルトnamespaceを使用）
         self.namespace = os.getenv("UPSTASH_VECTOR_NAMESPACE") or None
+        # 複数 namespace を同時検索してタイトル単位で融合（カンマ区切り。設定時は UPSTASH_VECTOR_NAMESPACE より優先）
+        self.namespaces: List[str] = [
+            ns.strip() for ns in os.getenv("UPSTASH_VECTOR_NAMESPACES", "").split(",") if ns.strip()
+        ]
+        self.fusion = os.getenv("VECTOR_FUSION", "rrf").strip().lower()
+        self.rrf_k = int(os.getenv("VECTOR_RRF_K", "60"))
+        # Index.query は読み取りタイムアウトが長い（600秒）ため、呼び出し全体に上限を設ける
+        self.timeout = float(os.getenv("VECTOR_QUERY_TIMEOUT_SECONDS", "10"))
+        self.pool: Optional[UpstashVectorPool] = None
+        self.local_index: Optional[LocalVectorIndex] = None
+        self._local_loaded = False
+        self._local_lock = threading.Lock()
+        if self.backend == "local":
+            self.enabled = NUMPY_AVAILABLE
+            if not self.enabled:
+                logger.warning("VectorService: numpy 未導入のため local バックエンド無効 -> フォールバックのみ")
+            return
         self.enabled = bool(self.url and self.token and Index)
         if self.enabled:
             try:
-                self.index = Index(url=self.url, token=self.token)  # type: ignore
-                logger.info("VectorService: Upstash 接続成功")
+                config = ConnectionPoolConfig(
+                    min_connections=int(os.getenv("UPSTASH_POOL_MIN_CONNECTIONS", "1")),
+                    max_connections=max(1, int(os.getenv("UPSTASH_POOL_MAX_CONNECTIONS", "8"))),
+                    connection_timeout=float(os.getenv("UPSTASH_POOL_ACQUIRE_TIMEOUT", "5")),
+                )
+                self.pool = UpstashVectorPool(config, url=self.url, token=self.token)
+                logger.info("VectorService: Upstash 接続プール作成", {"max_connections": config.max_connections})
             except Exception as e:
                 self.enabled = False
-                self.index = None
+                self.pool = None
                 logger.warning("VectorService: Upstash 初期化失敗 -> フォールバックのみ", exc_info=e)
-        else:
-            self.index = None
+
+    async def initialize(self) -> None:
+        """ローカルインデックスの読み込み / 接続プールの初期接続を前倒しで実行（ウォームアップ用）"""
+        if self.backend == "local" and self.enabled:
+            await asyncio.to_thread(self._load_local_index)
+        if self.pool is not None:
+            await self.pool.initialize()
+
+    def _load_local_index(self) -> Optional[LocalVectorIndex]:
+        if self._local_loaded:
+            return self.local_index
+        with self._local_lock:
+            if not self._local_loaded:
+                try:
+                    self.local_index = load_local_vector_index()
+                except Exception as e:
+                    logger.warning("VectorService: ローカルインデックス読み込み失敗 -> フォールバックのみ", exc_info=e)
+                    self.local_index = None
+                self._local_loaded = True
+        return self.local_index
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """接続プールの飽和メトリクス（無効時は enabled=False のみ）"""
+        if self.pool is None:
+            return {"enabled": False, "backend": self.backend}
+        return {"enabled": True, "backend": self.backend, **self.pool.get_metrics()}
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def _query(self, embedding: List[float], top_k: int, namespace: Optional[str] = None) -> Any:
+        # namespace が指定されている場合のみ引数に渡す（未指定=デフォルトnamespace）
+        kwargs: Dict[str, Any] = {"vector": embedding, "top_k": top_k, "include_metadata": True}
+        if namespace:
+            kwargs["namespace"] = namespace
+        return await asyncio.wait_for(self.pool.query(**kwargs), timeout=self.timeout)  # type: ignore[union-attr]
+
+    async def _ranked_titles(self, embedding: List[float], top_k: int, namespace: Optional[str]) -> List[Tuple[str, float]]:
+        """1 namespace の検索結果を (タイトル, スコア) のスコア降順・タイトル重複除去で返す"""
+        ranked: List[Tuple[str, float]] = []
+        seen = set()
+        if self.backend == "local":
+            index = self.local_index if self._local_loaded else await asyncio.to_thread(self._load_local_index)
+            if index is None:
+                raise RuntimeError("local vector index is not available")
+            for match in index.query(embedding, top_k, namespace=namespace):
+                if match.title and match.title not in seen:
+                    seen.add(match.title)
+                    ranked.append((match.title, match.score))
+            return ranked
+        res = await self._query(embedding, top_k, namespace)
+        matches = getattr(res, 'matches', res) or []
+        for m in matches:
+            meta = getattr(m, 'metadata', None)
+            score = getattr(m, 'score', None)
+            title = meta.get('title') if meta and hasattr(meta, 'get') else None
+            if title and title not in seen:
+                seen.add(title)
+                ranked.append((title, float(score) if isinstance(score, (int, float)) else 0.0))
+            if len(ranked) >= top_k:
+                break
+        return ranked
+
+    async def _search_fanout(self, embedding: List[float], top_k: int) -> List[str]:
+        """設定された全 namespace を同時に検索し、タイトル単位でスコア融合（max / RRF）"""
+        results = await asyncio.gather(
+            *(self._ranked_titles(embedding, top_k, ns) for ns in self.namespaces),
+            return_exceptions=True,
+        )
+        rankings = []
+        for ns, result in zip(self.namespaces, results):
+            if isinstance(result, BaseException):
+                logger.warning("VectorService: namespace 検索失敗（他の namespace で継続）", {"namespace": ns, "error": repr(result)})
+                continue
+            rankings.append(result)
+        if not rankings:
+            raise RuntimeError("all namespace searches failed")
+        return fuse_rankings(rankings, method=self.fusion, rrf_k=self.rrf_k)[:top_k]
 
     async def search(self, embedding: List[float], top_k: int = 5) -> List[str]:
+        titles, _ = await self.search_with_status(embedding, top_k)
+        return titles
+
+    async def search_with_status(self, embedding: List[float], top_k: int = 5) -> Tuple[List[str], bool]:
+        """(タイトル, 劣化フラグ)。有効なバックエンドの検索失敗でダミータイトルを返した場合のみ劣化=True"""
         if not embedding:
-            return []
-        if self.enabled and self.index:
+            return [], False
+        degraded = False
+        if self.enabled and (self.pool or self.backend == "local"):
             try:
-                # namespace が指定されている場合のみ引数に渡す（未指定=デフォルトnamespace）
-                if self.namespace:
-                    res = self.index.query(  # type: ignore
-                        vector=embedding,
-                        top_k=top_k,
-                        include_metadata=True,
-                        namespace=self.namespace,
-                    )
+                if len(self.namespaces) > 1:
+                    titles = await self._search_fanout(embedding, top_k)
                 else:
-                    res = self.index.query(  # type: ignore
-                        vector=embedding,
-                        top_k=top_k,
-                        include_metadata=True,
-                    )
-                matches = getattr(res, 'matches', res) or []
-                titles = []
-                top_scores = []
-                for m in matches:
-                    meta = getattr(m, 'metadata', None)
-                    score = getattr(m, 'score', None)
-                    if isinstance(score, (int, float)):
-                        top_scores.append(float(score))
-                    title = meta.get('title') if meta and hasattr(meta, 'get') else None
-                    if title and title not in titles:
-                        titles.append(title)
-                    if len(titles) >= top_k:
-                        break
+                    ns = self.namespaces[0] if self.namespaces else self.namespace
+                    titles = [title for title, _ in await self._ranked_titles(embedding, top_k, ns)]
                 if not titles:
-                    logger.warning("VectorService: Upstash 検索結果 0 件 -> ダミータイトルへ")
-                # 統計送信（MVP: 調整は行われない）
+                    logger.warning("VectorService: 検索結果 0 件", {"backend": self.backend})
                 # 動的閾値調整機能はMVP除外（top_score/spread算出も省略）
-                return titles
+                return titles, False
             except Exception as e:
-                logger.warning("VectorService: Upstash 検索失敗 -> ダミータイトルフォールバック", exc_info=e)
+                logger.warning("VectorService: ベクトル検索失敗 -> ダミータイトルフォールバック", exc_info=e)
+                degraded = True
         # フォールバック: embedding からダミータイトル生成
         h = hashlib.sha1("|".join(str(round(v,4)) for v in embedding[:16]).encode()).hexdigest()
         base = [f"カード{int(h[i:i+3],16)%900+100}" for i in range(0, min(len(h), top_k*3), 3)]
@@ -80,4 +198,4 @@ class VectorService:
                 break
     # 動的閾値調整機能はMVP除外
         logger.info("VectorService: フォールバック生成タイトル", {"count": len(out)})
-        return out
\ No newline at end of file
+        return out, degraded
\ No newline at end of file
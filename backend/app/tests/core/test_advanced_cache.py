@@ -0,0 +1,86 @@
+"""
+AdvancedCache（LRU 追い出し・ヒープ期限管理・バイト数管理）のテスト
+"""
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import AdvancedCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_eviction_follows_recency_not_insertion_order():
+    cache = AdvancedCache(default_ttl=60, max_memory_mb=1)
+    cache.max_memory_bytes = 3 * 1000
+    for key in ("a", "b", "c"):
+        await cache.set(key, "x" * 1000)
+    assert await cache.get("a") == "x" * 1000  # a を最近使用に
+    await cache.set("d", "x" * 1000)
+    assert "b" not in cache.cache
+    assert set(cache.cache) == {"a", "c", "d"}
+    assert cache.current_memory_usage == 3000
+    assert cache.stats["memory_evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_purged_from_heap(clock):
+    cache = AdvancedCache(default_ttl=10, max_memory_mb=1)
+    await cache.set("short", "v", ttl=5, tags=["t"])
+    await cache.set("long", "v", ttl=50)
+    clock.now += 6
+    assert await cache.get("short") is None
+    assert "short" not in cache.cache
+    assert "t" not in cache.tags_index
+
+    await cache.set("other", "v", ttl=5)
+    clock.now += 100
+    assert cache.purge_expired() == 2
+    assert not cache.cache
+    assert cache.current_memory_usage == 0
+    assert cache.stats["expirations"] == 3
+
+
+@pytest.mark.asyncio
+async def test_overwrite_keeps_accounting_and_tags_consistent(clock):
+    cache = AdvancedCache(default_ttl=10, max_memory_mb=1)
+    await cache.set("k", "12345", tags=["old"])
+    await cache.set("k", "123", ttl=100, tags=["new"])
+    assert cache.current_memory_usage == 3
+    assert "old" not in cache.tags_index
+    clock.now += 20  # 上書き前の期限を過ぎても新しいエントリは残る
+    cache.purge_expired()
+    assert await cache.get("k") == "123"
+    assert await cache.delete_by_tags("new") == 1
+    assert cache.current_memory_usage == 0
+
+
+@pytest.mark.asyncio
+async def test_large_values_are_compressed_and_restored():
+    cache = AdvancedCache(default_ttl=60, max_memory_mb=1)
+    value = {"answer": "同じ文章" * 2000, "context": [{"title": "t", "cost": 1}] * 50}
+    await cache.set("big", value)
+    entry = cache.cache["big"]
+    assert entry.compressed is True
+    assert entry.size_bytes == len(entry.data)
+    assert await cache.get("big") == value
+
+
+def test_estimate_size_counts_nested_objects():
+    cache = AdvancedCache()
+    small = cache._estimate_size({"a": [1, 2, 3]})
+    large = cache._estimate_size({"a": [1, 2, 3], "b": ["x" * 10_000]})
+    assert large - small >= 10_000
@@ -0,0 +1,118 @@
+"""
+TieredCache（L1 プロセス内 + L2 Redis 互換）のテスト
+
+ワーカー 2 つを、同じストアを共有する 2 インスタンスで模擬する。
+既定は fakeredis。TEST_REDIS_URL を設定するとローカルの Redis プロセスに対して実行する。
+"""
+import os
+import asyncio
+import uuid
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core import cache as cache_module
+from app.core.cache import AdvancedCache, QueryCache, TieredCache, build_cache, decode_cache_value, encode_cache_value
+
+
+@pytest.fixture
+def server():
+    url = os.getenv("TEST_REDIS_URL")
+    # 実 Redis ではテスト毎に namespace を分けて干渉を避ける
+    return (url, f"test-{uuid.uuid4().hex[:8]}") if url else (fakeredis.FakeServer(), "query")
+
+
+def make_worker(server, **kwargs):
+    store, namespace = server
+    if isinstance(store, str):
+        client = cache_module.aioredis.from_url(store)
+    else:
+        client = fakeredis.FakeAsyncRedis(server=store)
+    return TieredCache(client, namespace, default_ttl=60, max_memory_mb=1, **kwargs)
+
+
+async def wait_for(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met")
+        await asyncio.sleep(0.02)
+
+
+def test_value_encoding_roundtrip_and_compression():
+    small = {"answer": "a", "context": [1, 2]}
+    assert decode_cache_value(encode_cache_value(small, ["t"])) == (small, ["t"])
+    large = {"answer": "同じ文章" * 1000}
+    blob = encode_cache_value(large)
+    assert blob[:1] == b"\x01" and len(blob) < len("同じ文章".encode()) * 1000
+    assert decode_cache_value(blob)[0] == large
+
+
+@pytest.mark.asyncio
+async def test_value_written_by_one_worker_is_served_to_another(server):
+    a, b = make_worker(server), make_worker(server)
+    await a.set("k", {"answer": "shared"}, ttl=30)
+    assert await b.get("k") == {"answer": "shared"}
+    assert b.stats["l2_hits"] == 1
+    assert await b.get("k") == {"answer": "shared"}  # 2回目は L1
+    assert b.stats["l1_hits"] == 1
+    assert 0 < await a.client.ttl(a.prefix + "k") <= 30
+    await a.close()
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_tag_invalidation_reaches_other_workers_l1(server):
+    a, b = make_worker(server), make_worker(server)
+    await a.start()
+    await b.start()
+    await a.set("k1", {"v": 1}, tags=["cards"])
+    await a.set("k2", {"v": 2}, tags=["other"])
+    assert await b.get("k1") == {"v": 1}  # b の L1 へ昇格（タグ付き）
+    assert await a.delete_by_tags("cards") == 1
+    await wait_for(lambda: "k1" not in b.l1.cache)
+    assert await b.get("k1") is None
+    assert await b.get("k2") == {"v": 2}
+    assert b.stats["remote_invalidations"] == 1
+    await a.close()
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_l2_failure_falls_back_to_l1(server):
+    worker = make_worker(server, l2_retry_seconds=60)
+
+    class Broken:
+        def pipeline(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+        def pubsub(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    worker.client = Broken()
+    await worker.set("k", {"v": 1})
+    assert await worker.get("k") == {"v": 1}
+    assert await worker.get("missing") is None
+    assert worker.stats["l2_errors"] == 1  # 以降は再試行時刻まで L2 を呼ばない
+
+
+@pytest.mark.asyncio
+async def test_non_json_values_stay_in_l1(server):
+    worker = make_worker(server)
+    await worker.set("k", {"v": {1, 2}})
+    assert worker.stats["l2_skipped_values"] == 1
+    assert await worker.client.get(worker.prefix + "k") is None
+    assert await worker.get("k") == {"v": {1, 2}}
+    await worker.close()
+
+
+def test_build_cache_selects_backend_from_env(monkeypatch):
+    monkeypatch.delenv("CACHE_REDIS_URL", raising=False)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    assert isinstance(build_cache("query"), AdvancedCache)
+    monkeypatch.setenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    if cache_module.REDIS_AVAILABLE:
+        assert isinstance(QueryCache().cache, TieredCache)
+    monkeypatch.setenv("CACHE_BACKEND", "memory")
+    assert isinstance(build_cache("query"), AdvancedCache)
@@ -0,0 +1,51 @@
+"""ローカル偽 OpenAI HTTP サーバー（標準ライブラリのみ）
+
+`/v1/embeddings` と `/v1/chat/completions` に固定遅延付きで応答し、
+同時処理中のリクエスト数（最大値）を記録する。非同期クライアントの並行性検証と負荷試験用。
+"""
+from __future__ import annotations
+import time
+from typing import Any, Dict, Tuple
+
+from .local_http_server import LocalJSONServer
+
+
+class FakeOpenAIServer(LocalJSONServer):
+    """`with FakeOpenAIServer(delay=0.2) as server:` で起動し `server.base_url` を利用する"""
+
+    def __init__(self, delay: float = 0.2, dimensions: int = 1536) -> None:
+        super().__init__(delay=delay)
+        self.dimensions = dimensions
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        super().__enter__()
+        return self
+
+    def handle(self, path: str, body: Any) -> Tuple[int, Dict[str, Any]]:
+        body = body or {}
+        if path.endswith("/embeddings"):
+            text = str(body.get("input", ""))
+            seed = sum(text.encode("utf-8")) or 1
+            vector = [((seed * (i + 1)) % 997) / 997.0 - 0.5 for i in range(self.dimensions)]
+            return 200, {
+                "object": "list",
+                "data": [{"object": "embedding", "index": 0, "embedding": vector}],
+                "model": body.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        return 200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "fake answer"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
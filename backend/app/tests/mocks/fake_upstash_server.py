@@ -0,0 +1,58 @@
+"""ローカル偽 Upstash Vector REST サーバー（標準ライブラリのみ）
+
+`/info` と `/query`（`/query/{namespace}`）に固定遅延付きで応答する。
+応答形式は upstash_vector クライアントが期待する `{"result": ...}`。
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from .local_http_server import LocalJSONServer
+
+
+class FakeUpstashServer(LocalJSONServer):
+    """`with FakeUpstashServer(titles=[...]) as server:` で起動し `server.url` を利用する"""
+
+    def __init__(
+        self,
+        delay: float = 0.1,
+        titles: Optional[List[str]] = None,
+        dimension: int = 128,
+        namespace_titles: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        super().__init__(delay=delay)
+        self.titles = titles or [f"テストカード{i}" for i in range(10)]
+        # namespace 毎の応答タイトル（未指定の namespace は titles）
+        self.namespace_titles = namespace_titles or {}
+        self.dimension = dimension
+
+    def __enter__(self) -> "FakeUpstashServer":
+        super().__enter__()
+        return self
+
+    @property
+    def query_count(self) -> int:
+        return sum(1 for path, _ in self.requests if path.startswith("/query"))
+
+    def handle(self, path: str, body: Any) -> Tuple[int, Dict[str, Any]]:
+        if path == "/info":
+            return 200, {"result": {
+                "vectorCount": len(self.titles),
+                "pendingVectorCount": 0,
+                "indexSize": 0,
+                "dimension": self.dimension,
+                "similarityFunction": "COSINE",
+                "namespaces": {"": {"vectorCount": len(self.titles), "pendingVectorCount": 0}},
+            }}
+        if path.startswith("/query"):
+            namespace = path[len("/query/"):] if path.startswith("/query/") else ""
+            top_k = int((body or {}).get("topK", 10))
+            titles = self.namespace_titles.get(namespace, self.titles)
+            return 200, {"result": [
+                {
+                    "id": f"{i}:{namespace}",
+                    "score": 1.0 - i * 0.01,
+                    "metadata": {"title": title, "namespace": namespace},
+                }
+                for i, title in enumerate(titles[:top_k])
+            ]}
+        return 404, {"error": f"unknown path {path}"}
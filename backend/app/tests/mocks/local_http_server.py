@@ -0,0 +1,83 @@
+"""ローカル JSON HTTP スタブサーバーの共通基盤（標準ライブラリのみ）
+
+固定遅延付きで POST に JSON 応答し、同時処理中のリクエスト数（最大値）を記録する。
+外部 API（OpenAI / Upstash 等）の偽サーバーはこのクラスを継承して `handle` を実装する。
+"""
+from __future__ import annotations
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+
+class LocalJSONServer:
+    """`with Server(delay=0.2) as server:` で起動し `server.url` を利用する"""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.request_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: List[Tuple[str, Any]] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "LocalJSONServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def handle(self, path: str, body: Any) -> Tuple[int, Dict[str, Any]]:
+        """(ステータスコード, JSON 応答) を返す。サブクラスで実装"""
+        raise NotImplementedError
+
+    def _enter_request(self, path: str, body: Any) -> None:
+        with self._lock:
+            self.request_count += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.requests.append((path, body))
+
+    def _leave_request(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else None
+                server._enter_request(self.path, body)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    status, response = server.handle(self.path, body)
+                    payload = json.dumps(response).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    server._leave_request()
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        return Handler
@@ -0,0 +1,164 @@
+"""
+カードデータのホットリロード（スナップショットの差し替え・変更検知）のテスト
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.core.exceptions import DatabaseServiceException
+from app.routers import rag
+from app.services.database_service import DatabaseService
+from app.services.storage_service import StorageService
+
+
+def cards(version, n=50):
+    return [
+        {"id": f"card-{i}", "name": f"v{version}カード{i}", "class": "エルフ", "rarity": "レジェンド", "cost": version, "hp": i + 1}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    monkeypatch.setattr(service, "_load_data", lambda: cards(1))
+    service.reload_data()
+    return service
+
+
+def test_reload_publishes_a_complete_snapshot(service, monkeypatch):
+    before = service._snapshot
+    monkeypatch.setattr(service, "_load_data", lambda: cards(2))
+    service.reload_data()
+    after = service._snapshot
+    assert after is not before
+    # 直前のスナップショットは差し替え後もそのまま（読み取り中の処理は旧版で完結する）
+    assert before.cards[0]["cost"] == 1 and before.card_statistics.snapshot()["cost_distribution"] == {1: 50}
+    assert after.card_lookup.get("card-0")["cost"] == 2
+    assert after.card_statistics.snapshot()["cost_distribution"] == {2: 50}
+    # n-gram インデックスも公開前に構築済み（最初の検索が構築しない）
+    assert set(after.card_index._text_indexes) == {"full", "search"}
+    assert service.get_card_details_by_titles(["v2カード3"])[0]["hp"] == 4
+
+
+def test_failed_reload_keeps_previous_data(service, monkeypatch):
+    def broken():
+        raise ValueError("broken json")
+
+    monkeypatch.setattr(service, "_load_data", broken)
+    with pytest.raises(DatabaseServiceException):
+        service.reload_data()
+    assert len(service.data_cache) == 50
+    assert service.get_card_by_id("card-1")["cost"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_reload_does_not_block_readers(service, monkeypatch):
+    loading = threading.Event()
+
+    def slow_load():
+        loading.set()
+        time.sleep(0.3)
+        return cards(2)
+
+    monkeypatch.setattr(service, "_load_data", slow_load)
+    reload = asyncio.create_task(service.reload_data_async())
+    reads = []
+    while not reload.done():
+        if loading.is_set():
+            stats = service.get_statistics()
+            reads.append((stats["cost_distribution"], service.get_card_by_id("card-0")["cost"]))
+        await asyncio.sleep(0.01)
+    await reload
+    # 構築中も旧版を読み続け、新旧が混ざった組み合わせは現れない
+    assert len(reads) > 5
+    assert set(map(str, reads)) == {str(({1: 50}, 1))}
+    assert service.get_card_by_id("card-0")["cost"] == 2
+
+
+@pytest.mark.asyncio
+async def test_file_change_triggers_reload(monkeypatch, tmp_path):
+    monkeypatch.setenv("TEST_MODE", "false")
+    monkeypatch.setenv("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(cards(1)), encoding="utf-8")
+    service = DatabaseService(data_path=str(path))
+    reloader = service.create_data_reloader(interval_seconds=1)
+
+    assert await reloader.check() is False
+    path.write_text(json.dumps(cards(3, n=60)), encoding="utf-8")
+    os.utime(path, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+    assert await reloader.check() is True
+    assert service.get_statistics()["total_cards"] == 60
+    assert service.get_snapshot_info()["version"] == reloader.current_version
+    assert reloader.get_stats()["reloads"] == 1
+
+
+class FakeBlob:
+    def __init__(self, bucket, path):
+        self.bucket = bucket
+        self.path = path
+        self.size = len(bucket.contents)
+
+    @property
+    def generation(self):
+        return self.bucket.generation
+
+    def exists(self):
+        return True
+
+    def download_to_filename(self, filename):
+        self.bucket.downloads += 1
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(self.bucket.contents)
+
+
+class FakeBucket:
+    def __init__(self, contents):
+        self.contents = contents
+        self.generation = 1
+        self.downloads = 0
+
+    def blob(self, path):
+        return FakeBlob(self, path)
+
+    def get_blob(self, path):
+        return FakeBlob(self, path)
+
+
+def test_gcs_generation_change_refreshes_cached_file(monkeypatch, tmp_path):
+    storage = StorageService()
+    bucket = FakeBucket(json.dumps(cards(1)))
+    monkeypatch.setattr(storage, "is_cloud_environment", True)
+    monkeypatch.setattr(storage, "bucket", bucket)
+    monkeypatch.setattr(storage, "cache_dir", tmp_path)
+    monkeypatch.setattr(storage, "_cached_generations", {})
+    monkeypatch.setattr(storage, "_remote_generations", {})
+
+    assert storage.get_data_version("data") == "gcs:1"
+    assert storage.load_json_data("data")[0]["cost"] == 1
+    assert storage.load_json_data("data")[0]["cost"] == 1
+    assert bucket.downloads == 1
+
+    bucket.contents, bucket.generation = json.dumps(cards(2)), 2
+    assert storage.get_data_version("data") == "gcs:2"
+    assert storage.load_json_data("data")[0]["cost"] == 2
+    assert bucket.downloads == 2
+
+
+@pytest.mark.asyncio
+async def test_mvp_card_index_is_swapped_only_when_rebuilt(monkeypatch):
+    monkeypatch.setattr(rag, "_mvp_card_index", {"旧カード": {"name": "旧カード"}})
+    monkeypatch.setattr(rag, "_mvp_build_card_index", lambda: {})
+    with pytest.raises(RuntimeError):
+        await rag._mvp_reload_card_index()
+    assert rag._mvp_load_card_index() == {"旧カード": {"name": "旧カード"}}
+
+    monkeypatch.setattr(rag, "_mvp_build_card_index", lambda: {"新カード": {"name": "新カード"}})
+    await rag._mvp_reload_card_index()
+    assert rag._mvp_load_card_index() == {"新カード": {"name": "新カード"}}
@@ -0,0 +1,290 @@
+"""
+CardIndex（列指向インデックス）経由の DatabaseService 検索が従来の走査と同じ結果になることのテスト
+"""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.core.exceptions import DatabaseServiceException
+from app.services.database_service import DatabaseService
+
+CLASSES = ["エルフ", "ドラゴン", "ロイヤル", "ウィッチ", "ニュートラル"]
+RARITIES = ["レジェンド", "ゴールドレア", "シルバーレア", "ブロンズレア"]
+TYPES = ["ルミナス", "土の印", "マナリア", "", "ルミナス・土の印"]
+KEYWORDS = ["ファンファーレ", "ラストワード", "守護", "疾走", "進化時"]
+
+
+def synthetic_cards(n, seed=0):
+    rng = random.Random(seed)
+    odd_values = [None, "abc", "5", 3.7, True, ""]
+    cards = []
+    for i in range(n):
+        card = {
+            "id": f"card-{i}",
+            "name": f"カード{rng.randint(0, n // 2)}",
+            "class": rng.choice(CLASSES),
+            "rarity": rng.choice(RARITIES),
+            "cost": rng.randint(0, 10),
+            "hp": rng.randint(0, 12),
+            "attack": rng.randint(0, 12),
+            "type": rng.choice(TYPES),
+            "effect_1": f"相手に{rng.randint(1, 9)}ダメージ",
+            "keywords": rng.sample(KEYWORDS, rng.randint(0, 2)),
+            "qa": [{"question": f"Q{i}: 進化時の処理は？", "answer": rng.choice(["はい", "Yes", "いいえ"])}],
+        }
+        roll = rng.random()
+        if roll < 0.05:
+            card[rng.choice(["cost", "hp", "attack"])] = rng.choice(odd_values)
+        elif roll < 0.1:
+            del card[rng.choice(["class", "rarity", "type", "hp", "keywords"])]
+        elif roll < 0.12:
+            card["keywords"] = "ファンファーレ"
+        cards.append(card)
+    return cards
+
+
+@pytest.fixture
+def services(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    cards = synthetic_cards(400)
+    indexed, legacy = DatabaseService(), DatabaseService()
+    indexed.data = cards
+    legacy.data = cards
+    monkeypatch.setattr(legacy, "_get_card_index", lambda *args, **kwargs: None)
+    return indexed, legacy
+
+
+def test_index_is_rebuilt_when_data_cache_is_replaced(services):
+    indexed, _ = services
+    first = indexed._get_card_index()
+    assert indexed._get_card_index() is first
+    indexed.data = indexed.data_cache[:10]
+    assert indexed._get_card_index().size == 10
+
+
+@pytest.mark.parametrize("filters", [
+    {"class_filter": "エルフ"},
+    {"rarity_filter": "レジェンド", "cost_min": 3},
+    {"cost_min": 2, "cost_max": 5, "hp_min": 4},
+    {"attack_max": 3, "type_filter": "土の印"},
+    {"type_filter": "ルミナス", "keywords_filter": ["守護"], "limit": 7, "offset": 3},
+    {"keywords_filter": ["ファンファーレ", "守護"]},
+    {"class_filter": "ドラゴン", "keywords_filter": ["ラスト"], "cost_max": 6},
+    {"class_filter": "存在しない"},
+    {},
+])
+def test_search_by_filters_matches_scan(services, filters):
+    indexed, legacy = services
+    assert indexed.search_by_filters(**filters) == legacy.search_by_filters(**filters)
+
+
+def test_class_and_rarity_lookups_match_scan(services):
+    indexed, legacy = services
+    for name in CLASSES + [""]:
+        assert indexed.get_cards_by_class(name) == legacy.get_cards_by_class(name)
+        assert indexed.get_cards_by_class(name, limit=5) == legacy.get_cards_by_class(name, limit=5)
+    for rarity in RARITIES:
+        assert indexed.get_cards_by_rarity(rarity, limit=3) == legacy.get_cards_by_rarity(rarity, limit=3)
+
+
+def test_statistics_match_scan(services):
+    indexed, legacy = services
+    assert indexed.get_statistics() == legacy.get_statistics()
+    assert list(indexed.get_statistics()["classes"]) == list(legacy.get_statistics()["classes"])
+
+
+@pytest.mark.parametrize("sort_by", ["name", "cost", "hp", "attack", "class", "rarity", "unknown"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_pagination_matches_scan(services, sort_by, sort_order):
+    indexed, legacy = services
+    for query, page in (("", 1), ("", 3), ("ダメージ", 2), ("エルフ", 1), ("no-hit", 1), ("ド", 1), ("ルミ", 2)):
+        kwargs = dict(query=query, page=page, page_size=25, sort_by=sort_by, sort_order=sort_order)
+        assert indexed.search_cards_with_pagination(**kwargs) == legacy.search_cards_with_pagination(**kwargs)
+
+
+def test_numeric_sort_without_invalid_values(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    service.data = [{"name": "a", "cost": 3}, {"name": "b", "cost": 1}, {"name": "c", "cost": 3}, {"name": "d"}]
+    page = service.search_cards_with_pagination(sort_by="cost", sort_order="desc")
+    assert [c["name"] for c in page["cards"]] == ["a", "c", "b", "d"]
+
+
+def stream_pages(service, **kwargs):
+    pages = [service.search_cards_with_pagination(**kwargs)]
+    while pages[-1]["pagination"]["next_cursor"]:
+        pages.append(service.search_cards_with_pagination(cursor=pages[-1]["pagination"]["next_cursor"]))
+    return pages
+
+
+@pytest.mark.parametrize("sort_by, sort_order, query", [("cost", "desc", ""), ("name", "asc", "ダメージ"), ("unknown", "asc", "ド")])
+def test_cursor_pages_match_offset_pages(services, sort_by, sort_order, query):
+    indexed, legacy = services
+    kwargs = dict(query=query, page_size=30, sort_by=sort_by, sort_order=sort_order)
+    pages = stream_pages(indexed, **kwargs)
+    assert pages == stream_pages(legacy, **kwargs)
+    for number, page in enumerate(pages, start=1):
+        assert page["cards"] == legacy.search_cards_with_pagination(page=number, **kwargs)["cards"]
+        assert page["pagination"]["current_page"] == number
+    assert not pages[-1]["pagination"]["has_next"]
+
+
+def test_cursor_resumes_after_last_card_when_data_shifts(services):
+    for service in services:
+        first = service.search_cards_with_pagination(page_size=10, sort_by="cost")
+        last_seen = first["cards"][-1]
+        # 先頭側にカードが追加・削除されても、直前のページの最後のカードの次から続く
+        service.data = [{"id": "new", "name": "追加", "cost": -1}] + service.data_cache[5:]
+        ordered = service.search_cards_with_pagination(page_size=len(service.data_cache), sort_by="cost")["cards"]
+        second = service.search_cards_with_pagination(cursor=first["pagination"]["next_cursor"])
+        start = ordered.index(last_seen) + 1
+        assert second["cards"] == ordered[start:start + 10]
+
+
+def test_ordered_rows_are_cached_per_query(services):
+    indexed, _ = services
+    indexed.search_cards_with_pagination(query="ダメージ", sort_by="hp", page=1)
+    index = indexed._get_card_index()
+    rows = index.ordered_rows("ダメージ", "hp", False)
+    indexed.search_cards_with_pagination(query="ダメージ", sort_by="hp", page=2)
+    assert index.ordered_rows("ダメージ", "hp", False) is rows
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJ2IjoxfQ", "e30"])
+def test_invalid_cursor_is_rejected(services, cursor):
+    with pytest.raises(DatabaseServiceException) as error:
+        services[0].search_cards_with_pagination(cursor=cursor)
+    assert error.value.code == "INVALID_CURSOR"
+
+
+def test_keywords_filter_requires_every_keyword(services):
+    indexed, legacy = services
+    for service in services:
+        results = service.search_by_filters(keywords_filter=["ファンファーレ", "守護"])
+        assert results
+        for card in results:
+            assert isinstance(card["keywords"], list)
+            assert {"ファンファーレ", "守護"} <= set(card["keywords"])
+
+
+def test_posting_lists_are_sorted_and_complete(services):
+    indexed, _ = services
+    index = indexed._get_card_index()
+    column = index.categorical["class"]
+    assert sum(len(p) for p in column.postings) == index.size
+    for code, posting in enumerate(column.postings):
+        assert (posting[1:] > posting[:-1]).all()
+        assert (column.codes[posting] == code).all()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("agg_type", ["max", "min", "top_n"])
+@pytest.mark.parametrize("field", ["cost", "hp", "attack"])
+async def test_aggregation_matches_scan(services, agg_type, field):
+    indexed, legacy = services
+    aggregation = {"aggregation": {"is_aggregation": True, "aggregation_type": agg_type, "field": field, "count": 7}}
+    expected = await legacy._handle_aggregation_query("", aggregation, top_k=10)
+    assert expected
+    assert await indexed._handle_aggregation_query("", aggregation, top_k=10) == expected
+
+
+@pytest.mark.parametrize("keyword", [
+    "コスト3から5の間", "HP2～4", "攻撃力7-9", "コスト2または9", "HP4か5", "攻撃約6", "コスト3程度", "100から200の間", "検索",
+])
+def test_complex_numeric_keywords_match_scan(services, keyword):
+    indexed, legacy = services
+    expected = [legacy._match_filterable_fallback(card, keyword) for card in legacy.data_cache]
+    assert [indexed._match_filterable_fallback(card, keyword) for card in indexed.data_cache] == expected
+
+
+@pytest.mark.parametrize("keywords", [["ダメージ", "5以上"], ["攻撃", "3以下"], ["ダメージ", "4未満", "8超"]])
+def test_damage_score_matches_scan(services, keywords):
+    indexed, legacy = services
+    expected = [legacy._calculate_damage_score(card, keywords, False) for card in legacy.data_cache]
+    assert any(matched for _, matched in expected)
+    assert [indexed._calculate_damage_score(card, keywords, False) for card in indexed.data_cache] == expected
+
+
+@pytest.mark.asyncio
+async def test_nan_values_fall_back_to_scan(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    service.data = [{"name": "a", "hp": "nan"}, {"name": "b", "hp": 3}, {"name": "c", "hp": "3.0"}]
+    assert service._get_card_index().sorted_field("hp") is None
+    aggregation = {"aggregation": {"is_aggregation": True, "aggregation_type": "max", "field": "hp"}}
+    monkeypatch.setattr(service, "_get_max_value_items", lambda items, field: ["scan"])
+    assert await service._handle_aggregation_query("", aggregation) == ["scan"]
+
+
+ANALYSES = [
+    {"conditions": {"class": "エルフ", "cost": {"value": 3, "operator": "以上"}}},
+    {"conditions": {"rarity": "レジェンド", "hp": {"value": 4, "operator": "範囲", "max_value": 9}, "name": "カード1"}},
+    {"conditions": {"type": "土の印", "keywords": ["守護"], "attack": {"value": 5, "operator": "以下"}}},
+    {"conditions": {"keywords": ["ファンファーレ", "ラスト"], "cost": {"value": 2, "operator": "複数値", "additional_values": [4, 6]}}},
+    {"conditions": {"effect": "ダメージ", "hp": {"value": 6, "operator": "近似"}}},
+    {"conditions": {"cost": {"value": 3.0}}},
+    {"conditions": {"cost": {"value": "3", "operator": "以上"}}},
+    {"conditions": {"attack": {"value": 1, "operator": "未知"}}},
+    {"conditions": {"class": 5}},
+    {"conditions": {"cost": 5}},
+    {"conditions": {}},
+    {"aggregation": {"is_aggregation": True}},
+    None,
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("analysis", ANALYSES)
+async def test_filter_plan_matches_per_item_llm_filter(services, analysis):
+    from app.services.filter_plan import compile_filter_plan
+
+    indexed, legacy = services
+    expected = [card for card in legacy.data_cache if await legacy._match_filterable_llm(card, analysis)]
+    plan = compile_filter_plan(analysis)
+    assert [card for card in indexed.data_cache if plan.matches(card)] == expected
+    assert list(indexed._iter_plan_matches([plan])) == expected
+    assert list(legacy._iter_plan_matches([plan])) == expected
+
+
+@pytest.mark.parametrize("keywords", [["ダメージ"], ["守護", "yes"], ["q1", "エ", "存在しない語"], ["進化時の処理"]])
+def test_text_score_matches_scan(services, keywords):
+    indexed, legacy = services
+    expected = [legacy._calculate_text_score(card, keywords) for card in legacy.data_cache]
+    assert [indexed._calculate_text_score(card, keywords) for card in indexed.data_cache] == expected
+
+
+def test_text_score_with_unbuildable_text_falls_back(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    service.data = [{"name": "a", "qa": [{"question": "q", "answer": None}]}, {"name": "ab"}]
+    assert service._calculate_text_score(service.data_cache[1], ["a"]) == 0.5
+    with pytest.raises(TypeError):
+        service._calculate_text_score(service.data_cache[0], ["a"])
+
+
+@pytest.mark.parametrize("query", ["ダメージ", "守護 yes", "エルフ ダメージ", "存在しない", "q1"])
+def test_bm25_search_matches_fallback(services, query):
+    indexed, legacy = services
+    results = indexed.search_text(query, top_k=15)
+    assert results == legacy.search_text(query, top_k=15)
+    term = query.split()[0].lower()
+    assert all(term in indexed._build_searchable_text(card).lower() or len(query.split()) > 1 for card in results)
+
+
+def test_bm25_fallback_search_on_empty_catalogue(services):
+    _, legacy = services
+    legacy.data = []
+    assert legacy.search_text("ダメージ") == []
+
+
+def test_ngram_index_is_reused_when_texts_are_unchanged(services):
+    indexed, _ = services
+    first = indexed._get_card_index()
+    ngrams = first.full_text
+    indexed.data = list(indexed.data_cache)
+    assert indexed._get_card_index() is not first
+    assert indexed._get_card_index().full_text is ngrams
+    indexed.data = indexed.data_cache[:-1]
+    assert indexed._get_card_index().full_text is not ngrams
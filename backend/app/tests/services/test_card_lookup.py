@@ -0,0 +1,54 @@
+"""
+CardLookup（id・正規化済みカード名のハッシュ索引）と DatabaseService の一括取得のテスト
+"""
+import pytest
+
+from app.services.database_service import DatabaseService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    service.data = [
+        {"id": 1, "name": "白銀の騎士"},
+        {"id": "2", "name": "竜の 巫女（進化）"},
+        {"id": "2", "name": "重複ID"},
+        {"name": "IDなし"},
+    ]
+    return service
+
+
+def test_bulk_by_id_keeps_order_first_match_and_skips_missing(service):
+    results = service.bulk_get_card_details(["2", "1", "404", 1], by_field="id")
+    assert [item["name"] for item in results] == ["竜の 巫女（進化）", "白銀の騎士", "白銀の騎士"]
+
+
+def test_bulk_by_name_normalizes_both_sides(service):
+    results = service.bulk_get_card_details([" 竜の巫女進化 ", "白銀の　騎士", "存在しない"], by_field="name")
+    assert [item["name"] for item in results] == ["竜の 巫女（進化）", "白銀の騎士"]
+    assert service.bulk_get_card_details(["白銀の騎士"], by_field="cost") == []
+
+
+def test_lookup_cards_is_aligned_with_identifiers(service):
+    assert service.lookup_cards(["404", "1", ""], by_field="id") == [None, service.data[0], service.data[3]]
+
+
+def test_get_card_by_id_and_rebuild_on_data_replacement(service):
+    assert service.get_card_by_id("2")["name"] == "竜の 巫女（進化）"
+    lookup = service._get_card_lookup()
+    assert service._get_card_lookup() is lookup
+
+    service.data = [{"id": "9", "name": "差し替え"}]
+    assert service.get_card_by_id("2") is None
+    assert service.get_card_by_id("9")["name"] == "差し替え"
+    service.add_cards([{"id": "10", "name": "追加"}])
+    assert service.get_card_by_id("10")["name"] == "追加"
+
+
+def test_reload_data_builds_lookup(monkeypatch, service):
+    cards = [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]
+    monkeypatch.setattr(service, "_load_data", lambda: cards)
+    service.reload_data()
+    assert service._card_lookup is not None and service._card_lookup.is_current(cards)
+    assert service.lookup_cards(["b", "a"]) == [cards[1], cards[0]]
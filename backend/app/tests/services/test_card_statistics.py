@@ -0,0 +1,128 @@
+"""
+CardStatistics（reload_data 時に集計し、カードの追加・更新・削除で差分更新する統計）のテスト
+"""
+import asyncio
+import random
+import threading
+
+import pytest
+
+from app.services.card_snapshot import CardSnapshot
+from app.services.card_statistics import CardStatistics
+from app.services.database_service import DatabaseService
+from app.tests.services.test_card_index import synthetic_cards
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    service.data = synthetic_cards(300)
+    return service
+
+
+def rebuilt_statistics(service):
+    return CardStatistics.build(list(service.data_cache)).snapshot()
+
+
+def test_statistics_are_served_without_rescanning(service):
+    stats = service._get_card_statistics()
+    first = service.get_statistics()
+    assert service._get_card_statistics() is stats
+    first["classes"].clear()
+    assert service.get_statistics()["classes"]
+
+
+def test_column_counts_match_per_card_counts(service):
+    counted = CardStatistics.build(service.data_cache, service._get_card_index()).snapshot()
+    assert counted == rebuilt_statistics(service)
+    assert list(counted["classes"]) == list(rebuilt_statistics(service)["classes"])
+
+
+def test_incremental_updates_match_rebuild(service):
+    rng = random.Random(1)
+    service.get_statistics()
+    service.add_cards([
+        {"id": "new-1", "name": "新規", "class": "新クラス", "rarity": "レジェンド", "cost": 99, "hp": 500, "attack": 1},
+        {"id": "new-2", "name": "新規2", "cost": "abc", "hp": None},
+    ])
+    assert service.get_statistics() == rebuilt_statistics(service)
+
+    for card in rng.sample(service.data_cache, 20):
+        service.update_card(card["id"], {"hp": rng.randint(-3, 40), "class": rng.choice(["エルフ", "ネメシス"])})
+    assert service.get_statistics() == rebuilt_statistics(service)
+
+    # 最大値・最小値を持つカードを削除すると、残りの値から範囲を求め直す
+    removed = service.remove_cards(["new-1"] + [card["id"] for card in rng.sample(service.data_cache, 50)])
+    assert removed == 51
+    stats = service.get_statistics()
+    assert stats == rebuilt_statistics(service)
+    assert stats["hp_range"]["max"] < 500 and "新クラス" not in stats["classes"]
+    assert stats["total_cards"] == len(service.data_cache)
+
+
+def test_searches_see_changed_cards(service):
+    service.get_cards_by_class("エルフ")
+    service.update_card("card-0", {"class": "ネメシス", "name": "更新後"})
+    service.add_cards([{"id": "extra", "name": "追加", "class": "ネメシス"}])
+    ids = {card["id"] for card in service.get_cards_by_class("ネメシス")}
+    assert {"card-0", "extra"} <= ids
+    assert service.get_card_by_id("card-0")["name"] == "更新後"
+    assert service.update_card("missing", {"cost": 1}) is None
+
+
+def test_replacing_data_cache_rebuilds_statistics(service):
+    service.get_statistics()
+    service.data = service.data_cache[:10]
+    assert service.get_statistics()["total_cards"] == 10
+
+
+def test_changes_publish_a_new_snapshot(service):
+    published = service._snapshot
+    cards = list(published.cards)
+    stats = published.card_statistics.snapshot()
+    original = dict(cards[0])
+
+    updated = service.update_card("card-0", {"hp": 999, "name": "更新後"})
+    service.add_cards([{"id": "extra", "name": "追加"}])
+    service.remove_cards(["card-1"])
+
+    # 公開済みのスナップショットとカード辞書は変更しない
+    assert published.cards == cards and cards[0] == original
+    assert published.card_statistics.snapshot() == stats
+    assert published.card_lookup.get("card-1") is cards[1]
+    assert service._snapshot is not published
+    assert updated is not cards[0] and service.get_card_by_id("card-0") is updated
+    assert service.get_statistics() == rebuilt_statistics(service)
+    index = service._card_index
+    assert index is not None and index.size == len(service.data_cache)
+    # 索引は公開前に構築済み（読み取り側が構築を待たない）
+    assert "full" in index._text_indexes
+
+
+def test_snapshot_fields_are_read_only(service):
+    with pytest.raises(AttributeError):
+        service.data_cache = []
+    assert len(service.data_cache) == 300
+
+
+@pytest.mark.asyncio
+async def test_async_changes_build_off_the_event_loop(service, monkeypatch):
+    threads = []
+    with_added = CardSnapshot.with_added
+
+    def recording_with_added(snapshot, *args):
+        threads.append(threading.current_thread())
+        return with_added(snapshot, *args)
+
+    monkeypatch.setattr(CardSnapshot, "with_added", recording_with_added)
+    await asyncio.gather(
+        service.add_cards_async([{"id": "a", "name": "A"}]),
+        service.add_cards_async([{"id": "b", "name": "B"}]),
+    )
+    assert threads and threading.main_thread() not in threads
+    # 同時に呼んでも互いの追加を取りこぼさない
+    assert [card["id"] for card in service.data_cache[-2:]] == ["a", "b"]
+    assert await service.update_card_async("a", {"cost": 3}) == {"id": "a", "name": "A", "cost": 3}
+    assert await service.remove_cards_async(["a", "b"]) == 2
+    assert service.get_statistics() == rebuilt_statistics(service)
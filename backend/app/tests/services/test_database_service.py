@@ -242,8 +242,7 @@ class TestDatabaseService:
         """データなしでの検索テスト"""
         monkeypatch.setattr(database_service, "_load_data", lambda: [])
         # data_cacheもリセットする
-        database_service.data_cache = []
-        database_service.title_to_data = {}
+        database_service.data = []
         results = await database_service.filter_search_async(["HP", "100以上"], top_k=5)
         # データが空なので0件が正
         assert len(results) == 0
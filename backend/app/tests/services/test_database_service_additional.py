@@ -40,14 +40,6 @@ class TestDatabaseServiceBasic:
                 }
             ]
             
-            service.title_to_data = {
-                "テストカード1": service.data[0],
-                "テストカード2": service.data[1]
-            }
-            
-            # data_cache も設定
-            service.data_cache = service.data.copy()
-            
             return service
     
     def test_service_initialization(self, database_service):
@@ -156,9 +148,7 @@ class TestDatabaseServicePerformance:
             service = DatabaseService()
             
             # 大量のテストデータを生成
-            service.data = []
-            service.title_to_data = {}
-            
+            cards = []
             for i in range(1000):
                 card = {
                     "title": f"カード{i}",
@@ -167,11 +157,10 @@ class TestDatabaseServicePerformance:
                     "attack": 30 + (i % 100),
                     "content": f"カード{i}の説明"
                 }
-                service.data.append(card)
-                service.title_to_data[f"カード{i}"] = card
+                cards.append(card)
             
-            # data_cache も設定
-            service.data_cache = service.data.copy()
+            # title_to_data・data_cache も設定される
+            service.data = cards
             
             return service
     
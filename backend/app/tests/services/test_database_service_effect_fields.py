@@ -10,7 +10,7 @@ def database_service():
         mock_reload.return_value = None
         service = DatabaseService()
         # テストデータ: effect_5 のみに効果語を持つカード
-        service.data_cache = [
+        service.data = [
             {"name": "カードA", "effect_1": None, "effect_2": None, "effect_3": None, "effect_4": None, "effect_5": "相手リーダーに3ダメージ"},
             {"name": "カードB", "effect_1": "ドローする", "effect_2": None, "effect_3": None, "effect_4": None, "effect_5": None},
         ]
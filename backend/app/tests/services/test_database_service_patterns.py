@@ -0,0 +1,60 @@
+"""
+DatabaseService の正規表現レジストリ・キーワード解析メモ・効果ダメージ値キャッシュのテスト
+"""
+import pytest
+
+from app.services.database_service import DatabaseService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    service = DatabaseService()
+    service._get_card_index = lambda *args, **kwargs: None  # 正規表現の経路を通す
+    return service
+
+
+def test_normalize_title_removes_spaces_newlines_and_symbols(service):
+    assert service._normalize_title(" 白銀の 騎士（進化）\r\n・　") == "白銀の騎士進化"
+
+
+def test_fallback_keyword_is_parsed_once_and_matches(service):
+    service.data = [
+        {"id": "1", "name": "a", "cost": 3, "hp": 6},
+        {"id": "2", "name": "b", "cost": 5, "hp": 2},
+    ]
+    assert [item["id"] for item in service.data if service._match_filterable_fallback(item, "コスト3")] == ["1"]
+    assert [item["id"] for item in service.data if service._match_filterable_fallback(item, "5コスト")] == ["2"]
+    assert [item["id"] for item in service.data if service._match_filterable_fallback(item, "HP5以上")] == ["1"]
+    assert [item["id"] for item in service.data if service._match_filterable_fallback(item, "HP2から6の間")] == ["1", "2"]
+    assert set(service._fallback_keyword_memo) == {"コスト3", "5コスト", "HP5以上", "HP2から6の間"}
+
+
+def test_damage_score_uses_cached_effect_damages(service):
+    card = {"id": "1", "effect_1": "相手に3ダメージ", "effect_2": "自分に1ダメージ"}
+    service.data = [card]
+    assert service._calculate_damage_score(card, ["ダメージ", "3以上"], False) == (2.0, True)
+    assert service._calculate_damage_score(card, ["ダメージ", "4以上"], False) == (0.0, False)
+    assert service._calculate_damage_score(card, ["ダメージ", "1以下"], False) == (2.0, True)
+    assert service._calculate_damage_score(card, ["ダメージ", "3以上"], True) == (0.0, False)
+
+    # data を差し替えるとキャッシュも作り直す
+    replacement = {"id": "2", "effect_1": "相手に5ダメージ"}
+    service.data = [replacement]
+    assert service._calculate_damage_score(replacement, ["ダメージ", "4以上"], False) == (2.0, True)
+    assert list(service._effect_damage_cache.values()) == [(replacement, [5])]
+
+
+def test_reload_data_parses_effect_damages_once(monkeypatch, service):
+    cards = [{"id": "1", "name": "a", "effect_1": "2ダメージ"}, {"id": "2", "name": "b", "effect_1": "回復"}]
+    monkeypatch.setattr(service, "_load_data", lambda: cards)
+    service.reload_data()
+    assert [service._effect_damage_cache[id(item)][1] for item in cards] == [[2], []]
+
+
+def test_hp_score_comparators(service):
+    card = {"hp": 5}
+    assert service._calculate_hp_score(card, ["HP", "5以上"]) == (2.0, True)
+    assert service._calculate_hp_score(card, ["HP", "5未満"]) == (0.0, False)
+    assert service._calculate_hp_score(card, ["HP", "4超"]) == (2.0, True)
+    assert service._calculate_hp_score(card, ["攻撃", "4超"]) == (0.0, False)
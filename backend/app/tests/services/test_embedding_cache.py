@@ -0,0 +1,39 @@
+"""
+EmbeddingCache（メモリ LRU + SQLite）のテスト
+"""
+from app.services.embedding_cache import EmbeddingCache, normalize_query_text
+
+
+def test_normalize_query_text():
+    assert normalize_query_text("  ＡＢＣ　の\tカード ") == "ABC の カード"
+
+
+def test_memory_lru_respects_byte_budget():
+    vector = [0.5] * 128  # float32 で 512 バイト
+    cache = EmbeddingCache(max_bytes=512 * 3, path=None)
+    keys = [cache.make_key(f"q{i}", "m") for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, "m", vector)
+    cache.get_memory(keys[0])  # q0 を最近使用に
+    cache.put(keys[3], "m", vector)
+    assert cache.get_memory(keys[1]) is None  # 最も古い q1 が追い出される
+    assert cache.get_memory(keys[0]) == vector
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] == 512 * 3
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path=path)
+    key = cache.make_key("質問", "m")
+    stored = cache.put(key, "m", [0.1, 0.2, 0.3])
+    cache.close()
+
+    reopened = EmbeddingCache(path=path)
+    assert reopened.get_memory(key) is None
+    assert reopened.get_disk(key) == stored
+    # ディスクヒットはメモリ層へ昇格
+    assert reopened.get_memory(key) == stored
+    assert reopened.get_stats()["disk_hits"] == 1
+    reopened.close()
@@ -0,0 +1,81 @@
+"""
+IVF 近似検索（ivf_index）のテスト
+"""
+import numpy as np
+import pytest
+
+from app.services.ivf_index import attach_ivf_sidecar, build_ivf, write_ivf
+from app.services.local_vector_index import LocalVectorIndex
+
+
+def _clustered_index(rows=2000, dim=32, topics=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    matrix = centers[rng.integers(0, topics, rows)] + 0.5 * rng.normal(size=(rows, dim)).astype(np.float32)
+    namespaces = ["effect_1"] * (rows // 2) + ["qa_question"] * (rows - rows // 2)
+    ids = [f"c{i}:{ns}" for i, ns in enumerate(namespaces)]
+    return LocalVectorIndex(ids, [f"カード{i}" for i in range(rows)], namespaces, matrix), rng
+
+
+def test_build_keeps_namespaces_contiguous_and_rows_intact():
+    index, _ = _clustered_index()
+    reordered, ivf = build_ivf(index, nlist=16)
+    assert sorted(reordered.ids) == sorted(index.ids)
+    assert reordered.namespace_counts == index.namespace_counts
+    for ns, offsets in ivf.offsets.items():
+        assert offsets[0] == 0 and offsets[-1] == index.namespace_counts[ns]
+    # 並べ替え後も同じ id の行ベクトルは同一
+    pos = {rec_id: i for i, rec_id in enumerate(index.ids)}
+    for i in (0, 500, 1999):
+        assert np.array_equal(reordered.matrix[i], index.matrix[pos[reordered.ids[i]]])
+
+
+def test_ivf_recall_and_exact_fallback():
+    index, rng = _clustered_index()
+    index, ivf = build_ivf(index, nlist=16)
+    index.ivf = ivf
+    queries = index.matrix[rng.integers(0, 1000, 50)] + 0.1 * rng.normal(size=(50, 32)).astype(np.float32)
+    hits = 0
+    for q in queries:
+        exact = [m.id for m in index.query(q, 10, namespace="effect_1", exact=True)]
+        approx = [m.id for m in index.query(q, 10, namespace="effect_1")]
+        assert len(approx) == 10
+        assert all(rec_id.endswith(":effect_1") for rec_id in approx)
+        hits += len(set(exact) & set(approx))
+    assert hits / (50 * 10) >= 0.9
+    # nprobe >= nlist なら全件検索と同一
+    ivf.nprobe = ivf.nlist
+    q = queries[0]
+    assert [m.id for m in index.query(q, 10, namespace="effect_1")] == [
+        m.id for m in index.query(q, 10, namespace="effect_1", exact=True)
+    ]
+
+
+def test_small_probe_still_returns_top_k():
+    index, rng = _clustered_index(rows=400, topics=40)
+    index, ivf = build_ivf(index, nlist=64)
+    ivf.nprobe = 1
+    index.ivf = ivf
+    assert len(index.query(rng.normal(size=32), 25, namespace="qa_question")) == 25
+
+
+def test_sidecar_attaches_only_to_matching_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCAL_VECTOR_NPROBE", "3")
+    monkeypatch.setenv("LOCAL_VECTOR_ANN_MIN_ROWS", "0")
+    index, _ = _clustered_index()
+    reordered, ivf = build_ivf(index, nlist=8)
+    path = tmp_path / "embedding_index.bin"
+    reordered.save_binary(str(path))
+    write_ivf(f"{path}.ivf", ivf, len(reordered))
+
+    loaded = LocalVectorIndex.from_binary(str(path))
+    assert attach_ivf_sidecar(loaded) is True
+    assert loaded.ivf.nprobe == 3 and loaded.ivf.nlist == 8
+
+    # 行順が異なる本体（IVF 学習前のインデックス）には取り付けない
+    index.save_binary(str(path))
+    assert attach_ivf_sidecar(LocalVectorIndex.from_binary(str(path))) is False
+
+    monkeypatch.setenv("LOCAL_VECTOR_ANN", "false")
+    reordered.save_binary(str(path))
+    assert attach_ivf_sidecar(LocalVectorIndex.from_binary(str(path))) is False
@@ -0,0 +1,90 @@
+"""
+JsonContainerStream（大きな JSON ファイルの逐次読み込み）と、それを使う読み込み処理のテスト
+"""
+import io
+import json
+import random
+
+import pytest
+
+from app.routers import rag
+from app.services.json_stream import JsonContainerStream
+from app.services.storage_service import StorageService
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth > 2 or roll < 0.3:
+        return rng.choice([0, -2.5e3, 123456789, 0.1, 1e-7, "文字列\"\\n,]}", True, False, None])
+    if roll < 0.6:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f"キー{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 4))}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64])
+def test_matches_json_loads(chunk_size):
+    rng = random.Random(chunk_size)
+    for _ in range(200):
+        if rng.random() < 0.5:
+            doc = [random_value(rng) for _ in range(rng.randint(0, 10))]
+        else:
+            doc = {f"card{i}": random_value(rng) for i in range(rng.randint(0, 10))}
+        text = json.dumps(doc, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+        stream = JsonContainerStream(io.StringIO(text), chunk_size)
+        if isinstance(doc, list):
+            assert stream.kind == "array" and list(stream.values()) == doc
+        else:
+            assert stream.kind == "object" and dict(stream) == doc
+
+
+@pytest.mark.parametrize("text", ["", '"card"', "[1,]", "[1 2]", '{"a" 1}', '{1: 2}', "[1]x", '[{"a": 1}', "[tru]", "[1.]"])
+@pytest.mark.parametrize("chunk_size", [1, 64])
+def test_invalid_json_raises_decode_error(text, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        list(JsonContainerStream(io.StringIO(text), chunk_size))
+
+
+def test_elements_are_read_incrementally():
+    class CountingReader(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    cards = [{"id": str(i), "effect_1": "x" * 100} for i in range(1000)]
+    reader = CountingReader(json.dumps(cards))
+    stream = JsonContainerStream(reader, chunk_size=4096)
+    assert next(stream.values()) == cards[0]
+    assert reader.reads == 1
+
+
+def test_storage_loads_only_arrays(monkeypatch, tmp_path):
+    storage = StorageService()
+    path = tmp_path / "data.json"
+    monkeypatch.setattr(StorageService, "get_file_path", lambda self, file_key: str(path))
+
+    path.write_text(json.dumps([{"name": "a"}, {"name": "b"}]), encoding="utf-8")
+    assert storage.load_json_data("data") == [{"name": "a"}, {"name": "b"}]
+    path.write_text(json.dumps({"a": {"name": "a"}}), encoding="utf-8")
+    assert storage.load_json_data("data") == []
+    path.write_text('[{"name": "a"}, {"name": ', encoding="utf-8")
+    assert storage.load_json_data("data") == []
+
+
+def test_mvp_card_index_keeps_needed_fields(monkeypatch, tmp_path):
+    converted, data, broken = tmp_path / "convert_data.json", tmp_path / "data.json", tmp_path / "broken.json"
+    converted.write_text(json.dumps({"A": {"effect_1": "a", "qa": ["..."]}, "B": {"title": "B2", "hp": 3}}), encoding="utf-8")
+    data.write_text(json.dumps([{"name": "A", "cost": 1}, {"name": "C", "cost": 2, "effect_2": "x"}, "noise"]), encoding="utf-8")
+    broken.write_text('[{"name": "D"}, {"name": ', encoding="utf-8")
+    paths = {"convert_data": str(converted), "data": str(data)}
+    monkeypatch.setattr(StorageService, "get_file_path", lambda self, key: paths[key])
+
+    assert rag._mvp_build_card_index() == {
+        "A": {"effect_1": "a"},
+        "B2": {"title": "B2", "hp": 3},
+        "C": {"name": "C", "cost": 2},
+    }
+    # 途中で壊れているファイルのカードは採用しない
+    paths["data"] = str(broken)
+    assert "D" not in rag._mvp_build_card_index()
@@ -0,0 +1,127 @@
+"""
+LocalVectorIndex（VECTOR_BACKEND=local）のテスト
+"""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.services.local_vector_index import LocalVectorIndex, build_title_lookup
+from app.services.vector_service import VectorService
+
+
+def _unit(i, dim=8):
+    v = [0.0] * dim
+    v[i] = 1.0
+    return v
+
+
+RECORDS = [
+    {"id": "c1:effect_1", "namespace": "effect_1", "embedding": _unit(0), "metadata": {"effect_1": "..."}},
+    {"id": "c2:effect_1", "namespace": "effect_1", "embedding": _unit(1), "metadata": {"effect_1": "..."}},
+    {"id": "c3:effect_1", "namespace": "effect_1", "embedding": [0.9, 0.1] + [0.0] * 6, "metadata": {}},
+    {"id": "c1:qa_question_0", "namespace": "qa_question", "embedding": _unit(2), "metadata": {}},
+    {"id": "x1", "embedding": _unit(0), "metadata": {"title": "デフォルトカード"}},
+    {"id": "c2:effect_2", "namespace": "effect_1", "embedding": [0.8, 0.2] + [0.0] * 6, "metadata": {}},
+]
+CARDS = [{"id": "c1", "name": "カード1"}, {"id": "c2", "name": "カード2"}, {"id": "c3", "name": "カード3"}]
+
+
+@pytest.fixture
+def index():
+    return LocalVectorIndex.from_records(RECORDS, build_title_lookup(CARDS))
+
+
+def test_query_orders_by_cosine_within_namespace(index):
+    matches = index.query(_unit(0), top_k=3, namespace="effect_1")
+    assert [m.id for m in matches] == ["c1:effect_1", "c3:effect_1", "c2:effect_2"]
+    assert matches[0].score == pytest.approx(1.0)
+    assert all(m.namespace == "effect_1" for m in matches)
+    # 完全一致 ... 直交の順にスコアが下がる
+    assert [m.score for m in matches] == sorted((m.score for m in matches), reverse=True)
+
+
+def test_namespace_semantics_match_upstash(index):
+    # 未指定 = デフォルト namespace のみ
+    assert index.search_titles(_unit(0), top_k=5) == ["デフォルトカード"]
+    assert index.search_titles(_unit(2), top_k=1, namespace="qa_question") == ["カード1"]
+    assert index.search_titles(_unit(0), top_k=5, namespace="unknown") == []
+
+
+def test_search_titles_dedupes_within_top_k(index):
+    # 上位4件: c1, c3, c2(effect_2), c2(effect_1) -> タイトル重複除去
+    assert index.search_titles(_unit(0), top_k=4, namespace="effect_1") == ["カード1", "カード3", "カード2"]
+
+
+def test_matches_brute_force_on_random_data():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32)).astype(np.float32)
+    records = [{"id": str(i), "embedding": v.tolist(), "metadata": {"title": f"t{i}"}} for i, v in enumerate(vectors)]
+    index = LocalVectorIndex.from_records(records)
+    query = rng.normal(size=32)
+    cos = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    expected = [str(i) for i in np.argsort(-cos)[:10]]
+    assert [m.id for m in index.query(query.tolist(), top_k=10)] == expected
+    # 短いクエリは先頭次元で比較
+    short = index.query(query[:16].tolist(), top_k=5)
+    cos16 = vectors[:, :16] @ query[:16] / (np.linalg.norm(vectors[:, :16], axis=1) * np.linalg.norm(query[:16]))
+    assert [m.id for m in short] == [str(i) for i in np.argsort(-cos16)[:5]]
+
+
+def test_vector_service_local_backend(tmp_path, monkeypatch):
+    path = tmp_path / "embedding_list.jsonl"
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in RECORDS), encoding="utf-8")
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_INDEX_PATH", str(path))
+    monkeypatch.setenv("UPSTASH_VECTOR_NAMESPACE", "effect_1")
+    monkeypatch.setattr("app.services.storage_service.StorageService.load_json_data", lambda self, key: CARDS)
+    service = VectorService()
+
+    async def run():
+        await service.initialize()
+        return await service.search(_unit(1), top_k=2)
+
+    assert asyncio.run(run()) == ["カード2"]
+    assert len(service.local_index) == len(RECORDS)
+
+
+def test_binary_roundtrip_is_memory_mapped(index, tmp_path):
+    path = tmp_path / "embedding_index.bin"
+    index.save_binary(str(path))
+    loaded = LocalVectorIndex.from_binary(str(path))
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.normalized is True
+    assert loaded.ids == index.ids and loaded.titles == index.titles
+    for ns in ("effect_1", "qa_question", None):
+        expected = index.query([0.6, 0.3, 0.1] + [0.0] * 5, top_k=3, namespace=ns)
+        actual = loaded.query([0.6, 0.3, 0.1] + [0.0] * 5, top_k=3, namespace=ns)
+        assert [m.id for m in actual] == [m.id for m in expected]
+        assert [m.score for m in actual] == pytest.approx([m.score for m in expected], abs=1e-6)
+
+
+def test_load_prefers_binary_format(index, tmp_path, monkeypatch):
+    from app.services.local_vector_index import load_local_vector_index
+
+    path = tmp_path / "custom.idx"
+    index.save_binary(str(path))
+    monkeypatch.setenv("LOCAL_VECTOR_INDEX_PATH", str(path))
+    loaded = load_local_vector_index()
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.search_titles(_unit(2), top_k=1, namespace="qa_question") == ["カード1"]
+
+
+def test_vector_service_local_fanout(tmp_path, monkeypatch):
+    path = tmp_path / "embedding_list.jsonl"
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in RECORDS), encoding="utf-8")
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_INDEX_PATH", str(path))
+    monkeypatch.setenv("UPSTASH_VECTOR_NAMESPACES", "effect_1,qa_question")
+    monkeypatch.setenv("VECTOR_FUSION", "max")
+    monkeypatch.setattr("app.services.storage_service.StorageService.load_json_data", lambda self, key: CARDS)
+    service = VectorService()
+
+    titles = asyncio.run(service.search([0.1, 0.0, 1.0] + [0.0] * 5, top_k=2))
+    # qa_question の カード1 が最高スコア、次いで effect_1 側の上位
+    assert titles[0] == "カード1"
+    assert len(titles) == 2
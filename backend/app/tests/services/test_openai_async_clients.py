@@ -0,0 +1,130 @@
+"""
+EmbeddingService / LLMService の非同期 OpenAI クライアント検証（ローカル偽サーバー使用）
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.routers import rag
+from app.services.embedding_service import EmbeddingService
+from app.services.llm_service import LLMService
+from app.services.response_cache import ChatResponseCache
+from app.services.vector_service import VectorService
+from app.tests.mocks.fake_openai_server import FakeOpenAIServer
+
+
+@pytest.fixture
+def fake_openai(monkeypatch, tmp_path):
+    with FakeOpenAIServer(delay=0.2) as server:
+        monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embedding_cache.sqlite3"))
+        monkeypatch.setenv("BACKEND_TESTING", "false")
+        monkeypatch.setenv("BACKEND_MOCK_EXTERNAL_SERVICES", "false")
+        monkeypatch.setenv("BACKEND_OPENAI_API_KEY", "sk-local-fake")
+        monkeypatch.setenv("BACKEND_OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setenv("OPENAI_MAX_RETRIES", "0")
+        yield server
+
+
+def test_embedding_requests_overlap(fake_openai):
+    service = EmbeddingService()
+    assert service.is_mock is False
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(service.get_embedding(f"質問{i}") for i in range(8)))
+        elapsed = time.perf_counter() - started
+        await service.close()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+    assert all(len(r) == 128 for r in results)
+    assert fake_openai.max_in_flight > 1
+    # 直列なら 8 * 0.2s = 1.6s かかる
+    assert elapsed < 8 * fake_openai.delay * 0.6
+
+
+def test_llm_concurrency_limit(fake_openai, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "2")
+    service = LLMService()
+
+    async def run():
+        answers = await asyncio.gather(*(service.generate_answer(f"質問{i}", []) for i in range(6)))
+        await service.close()
+        return answers
+
+    answers = asyncio.run(run())
+    assert answers == ["fake answer"] * 6
+    assert fake_openai.max_in_flight <= 2
+
+
+def test_embedding_timeout_falls_back(fake_openai, monkeypatch):
+    monkeypatch.setenv("OPENAI_TIMEOUT_SECONDS", "0.05")
+    service = EmbeddingService()
+
+    async def run():
+        emb = await service.get_embedding("タイムアウト")
+        await service.close()
+        return emb
+
+    emb = asyncio.run(run())
+    # sha256 擬似ベクトル（32次元）へフォールバック
+    assert len(emb) == 32
+
+
+def test_embedding_cache_hits_across_restarts(fake_openai):
+    async def run(service, queries):
+        results = [await service.get_embedding(q) for q in queries]
+        stats = service.get_cache_stats()
+        await service.close()
+        return results, stats
+
+    first, stats = asyncio.run(run(EmbeddingService(), ["デッキの組み方", "デッキの組み方", "  デッキの組み方　"]))
+    # 全角空白・前後空白は正規化され同一キー
+    assert fake_openai.request_count == 1
+    assert stats["misses"] == 1 and stats["memory_hits"] == 2
+    assert first[0] == first[1] == first[2]
+
+    # ワーカー再起動相当: 新しいインスタンスでも SQLite から復元
+    second, stats = asyncio.run(run(EmbeddingService(), ["デッキの組み方"]))
+    assert fake_openai.request_count == 1
+    assert stats["disk_hits"] == 1
+    assert second[0] == first[0]
+
+
+def test_embedding_cache_key_includes_model(fake_openai, monkeypatch):
+    async def run():
+        service = EmbeddingService()
+        await service.get_embedding("同じ質問")
+        await service.close()
+
+    asyncio.run(run())
+    monkeypatch.setenv("BACKEND_EMBEDDING_MODEL", "text-embedding-3-large")
+    asyncio.run(run())
+    assert fake_openai.request_count == 2
+
+
+def test_llm_timeout_answer_is_not_cached(fake_openai, monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "0.05")
+    monkeypatch.setenv("VECTOR_BACKEND", "upstash")
+    monkeypatch.delenv("UPSTASH_VECTOR_REST_URL", raising=False)
+    embedding_service, vector_service, llm_service = EmbeddingService(), VectorService(), LLMService()
+    cache = ChatResponseCache()
+
+    async def ask():
+        return await cache.get_or_compute(
+            "テスト質問", 5, False,
+            lambda: rag._mvp_chat_pipeline("テスト質問", 5, False, embedding_service, vector_service, llm_service),
+        )
+
+    async def run():
+        results = [await ask(), await ask()]
+        await embedding_service.close()
+        await llm_service.close()
+        return results
+
+    (first, first_meta), (second, second_meta) = asyncio.run(run())
+    # スタブ回答（LLM タイムアウト）は保存されず、同じ質問の 2 回目もパイプラインを実行する
+    assert first["answer"] == second["answer"] == "質問を受け付けました: テスト質問"
+    assert first_meta["hit"] is False and second_meta["hit"] is False
+    assert cache.get_stats()["uncacheable"] == 2
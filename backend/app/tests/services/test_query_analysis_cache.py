@@ -0,0 +1,245 @@
+"""
+QueryAnalysisCache（LLM クエリ解析結果のキャッシュ）と DatabaseService のキーワード別 LLM 解析のテスト
+"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import cache as cache_module
+from app.services.database_service import DatabaseService
+from app.services.query_analysis_cache import QueryAnalysisCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeLLMClient:
+    """chat.completions.create の呼び出し回数を数える"""
+
+    def __init__(self, content='{"query_type": "filterable", "conditions": {"class": "エルフ"}}') -> None:
+        self.calls = []
+        self.content = content
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if isinstance(self.content, Exception):
+            raise self.content
+        content = self.content(kwargs) if callable(self.content) else self.content
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class SlowLLMClient(FakeLLMClient):
+    """create が delay 秒掛かり、同時実行数の最大値を記録する"""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            return super().create(**kwargs)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def test_mode(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    monkeypatch.setenv("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+def make_service(client: FakeLLMClient) -> DatabaseService:
+    service = DatabaseService()
+    service.llm_client = client
+    service.is_mocked = False
+    service.query_rule_parser = None  # 定型クエリでも LLM 経路を通す
+    service.query_analysis_cache = QueryAnalysisCache(ttl=60, max_memory_mb=1)
+    return service
+
+
+def test_key_normalizes_query_and_separates_prompt_versions():
+    version = QueryAnalysisCache.prompt_version("prompt", "model")
+    key = QueryAnalysisCache.make_key("  エルフの　ＨＰ 5 以上 ", version)
+    assert key == QueryAnalysisCache.make_key("エルフの hp 5 以上", version)
+    assert key != QueryAnalysisCache.make_key("エルフの hp 5 以上", QueryAnalysisCache.prompt_version("prompt v2", "model"))
+    assert version != QueryAnalysisCache.prompt_version("prompt", "other-model")
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_calls_llm_once_and_records_saved_latency():
+    client = FakeLLMClient()
+    service = make_service(client)
+    first = await service._analyze_query_with_llm("エルフ のカード")
+    second = await service._analyze_query_with_llm("  エルフ　のカード ")
+    assert first == second == {"query_type": "filterable", "conditions": {"class": "エルフ"}}
+    assert len(client.calls) == 1
+    assert client.calls[0]["model"] == DatabaseService.QUERY_ANALYSIS_MODEL
+
+    stats = service.get_query_analysis_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["stored"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["saved_latency_seconds"] >= 0.0
+    assert stats["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_result_is_isolated_from_caller_mutation():
+    service = make_service(FakeLLMClient())
+    first = await service._analyze_query_with_llm("エルフ")
+    first["conditions"]["class"] = "ロイヤル"
+    second = await service._analyze_query_with_llm("エルフ")
+    assert second["conditions"]["class"] == "エルフ"
+
+
+@pytest.mark.asyncio
+async def test_prompt_change_misses_cache():
+    client = FakeLLMClient()
+    service = make_service(client)
+    await service._analyze_query_with_llm("エルフ")
+    service.query_analysis_version = QueryAnalysisCache.prompt_version("新しいプロンプト", service.QUERY_ANALYSIS_MODEL)
+    await service._analyze_query_with_llm("エルフ")
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(clock):
+    client = FakeLLMClient()
+    service = make_service(client)
+    await service._analyze_query_with_llm("エルフ")
+    clock.now += 30
+    await service._analyze_query_with_llm("エルフ")
+    assert len(client.calls) == 1
+    clock.now += 31
+    await service._analyze_query_with_llm("エルフ")
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_and_invalid_json_are_not_cached():
+    client = FakeLLMClient(content=RuntimeError("rate limited"))
+    service = make_service(client)
+    fallback = await service._analyze_query_with_llm("エルフ")
+    assert fallback == service._get_mock_query_analysis("エルフ")
+
+    client.content = "JSON ではない応答"
+    await service._analyze_query_with_llm("エルフ")
+    client.content = json.dumps({"query_type": "semantic", "conditions": {}})
+    result = await service._analyze_query_with_llm("エルフ")
+    assert result["query_type"] == "semantic"
+    assert len(client.calls) == 3
+    assert service.get_query_analysis_cache_stats()["stored"] == 1
+
+
+@pytest.mark.asyncio
+async def test_mocked_service_bypasses_cache():
+    service = DatabaseService()
+    service.query_analysis_cache = QueryAnalysisCache()
+    assert service.is_mocked
+    await service._analyze_query_with_llm("エルフ")
+    assert service.get_query_analysis_cache_stats()["misses"] == 0
+
+
+def test_from_env_can_disable_cache(monkeypatch):
+    monkeypatch.setenv("QUERY_ANALYSIS_CACHE_ENABLED", "false")
+    assert QueryAnalysisCache.from_env() is None
+    service = DatabaseService()
+    assert service.get_query_analysis_cache_stats() == {"enabled": False}
+
+    monkeypatch.setenv("QUERY_ANALYSIS_CACHE_ENABLED", "true")
+    monkeypatch.setenv("QUERY_ANALYSIS_CACHE_TTL", "120")
+    cache = QueryAnalysisCache.from_env()
+    assert cache is not None and cache.ttl == 120
+
+
+@pytest.mark.asyncio
+async def test_keyword_analyses_run_concurrently_under_semaphore():
+    client = SlowLLMClient(delay=0.2)
+    service = make_service(client)
+    service.query_analysis_concurrency = 2
+    started = time.perf_counter()
+    analyses = await service._analyze_keywords_with_llm(["a", "b", "c", "d", "a"])
+    elapsed = time.perf_counter() - started
+    assert list(analyses) == ["a", "b", "c", "d"]
+    assert all(analysis["conditions"] == {"class": "エルフ"} for analysis in analyses.values())
+    assert len(client.calls) == 4
+    assert client.max_active == 2
+    assert elapsed < 0.7  # 逐次なら 0.8 秒
+
+
+@pytest.mark.asyncio
+async def test_keywords_past_deadline_fall_back_to_rule_based_matching(monkeypatch):
+    service = make_service(SlowLLMClient(delay=0.5))
+    service.query_analysis_deadline = 0.05
+    service.data = [
+        {"id": "1", "name": "エルフの剣士", "class": "エルフ", "cost": 2},
+        {"id": "2", "name": "ロイヤルの騎士", "class": "ロイヤル", "cost": 2},
+    ]
+
+    async def no_llm_results(query, top_k=10):
+        return []
+
+    monkeypatch.setattr(service, "_search_filterable_llm", no_llm_results)
+    monkeypatch.setattr(service, "_get_card_index", lambda *args, **kwargs: None)
+    assert await service._analyze_keywords_with_llm(["エルフ"]) == {"エルフ": None}
+    results = await service._search_filterable(["エルフ"], top_k=10)
+    assert [item["id"] for item in results] == [
+        item["id"] for item in service.data if service._match_filterable_fallback(item, "エルフ")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_analyzes_uncached_keywords_in_one_completion():
+    def respond(kwargs):
+        queries = json.loads(kwargs["messages"][1]["content"])
+        return json.dumps({"analyses": [{"conditions": {"name": query}} for query in queries]}, ensure_ascii=False)
+
+    client = FakeLLMClient(content=respond)
+    service = make_service(client)
+    service.query_analysis_batch = True
+    await service.query_analysis_cache.put("b", service.query_analysis_version, {"conditions": {"name": "cached"}}, 0.5)
+    analyses = await service._analyze_keywords_with_llm(["a", "b", "c"])
+    assert analyses["a"] == {"conditions": {"name": "a"}}
+    assert analyses["b"] == {"conditions": {"name": "cached"}}
+    assert analyses["c"] == {"conditions": {"name": "c"}}
+    assert len(client.calls) == 1
+    assert json.loads(client.calls[0]["messages"][1]["content"]) == ["a", "c"]
+    assert DatabaseService.QUERY_ANALYSIS_BATCH_INSTRUCTION in client.calls[0]["messages"][0]["content"]
+
+    await service._analyze_keywords_with_llm(["a", "c"])
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_falls_back_to_per_keyword_on_bad_response():
+    client = FakeLLMClient(content=lambda kwargs: (
+        '{"analyses": []}' if "analyses" in kwargs["messages"][0]["content"] else '{"conditions": {"class": "エルフ"}}'
+    ))
+    service = make_service(client)
+    service.query_analysis_batch = True
+    analyses = await service._analyze_keywords_with_llm(["a", "b"])
+    assert analyses == {"a": {"conditions": {"class": "エルフ"}}, "b": {"conditions": {"class": "エルフ"}}}
+    assert len(client.calls) == 3
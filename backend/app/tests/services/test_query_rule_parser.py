@@ -0,0 +1,115 @@
+"""
+RuleBasedQueryParser（LLM を使わない定型クエリ解析）のテスト
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.database_service import DatabaseService
+from app.services.filter_plan import compile_filter_plan
+from app.services.query_rule_parser import RuleBasedQueryParser
+
+
+def conditions_of(query: str):
+    result = RuleBasedQueryParser().parse(query)
+    return result.analysis["conditions"], result.confidence
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("5コストのレジェンドカードを探して", {"rarity": "レジェンド", "cost": {"value": 5, "operator": "等しい"}}),
+    ("ＨＰ１０以上のエルフ", {"class": "エルフ", "hp": {"value": 10, "operator": "以上"}}),
+    ("3コスト以下で突進を持つ", {"cost": {"value": 3, "operator": "以下"}, "keywords": ["突進"]}),
+    ("コスト3未満", {"cost": {"value": 2, "operator": "以下"}}),
+    ("コスト2から4のドラゴン", {"class": "ドラゴン", "cost": {"value": 2, "operator": "範囲", "max_value": 4}}),
+    ("攻撃力3または5", {"attack": {"value": 3, "operator": "複数値", "additional_values": [5]}}),
+    ("約HP6のマナリア", {"type": "マナリア", "hp": {"value": 6, "operator": "近似"}}),
+    ("超進化時に回復するカード", {"keywords": ["超進化時"], "effect": "回復"}),
+])
+def test_structured_queries_are_parsed_with_full_confidence(query, expected):
+    conditions, confidence = conditions_of(query)
+    assert confidence == 1.0
+    for field, value in expected.items():
+        assert conditions[field] == value
+    assert set(conditions) == set(RuleBasedQueryParser.empty_conditions())
+
+
+@pytest.mark.parametrize("query", [
+    "エルフ以外の守護",  # 否定
+    "エルフかロイヤルのカード",  # 同じ項目に複数の値
+    "一番高いHPのカード",  # 集約
+    "土の印のカード",  # タイプとキーワードのどちらか決められない
+    "門脇舞以が声優のカードの使い方を教えて",  # Q&A
+    "ドラゴンの白銀の騎士",  # カード名らしき語
+    "よろしく",
+])
+def test_queries_outside_the_rules_are_not_confident(query):
+    _, confidence = conditions_of(query)
+    assert confidence < 0.9
+
+
+def test_parsed_analysis_compiles_to_equivalent_plan():
+    cards = [
+        {"id": "1", "class": "エルフ", "hp": 5, "keywords": ["守護"]},
+        {"id": "2", "class": "エルフ", "hp": 3, "keywords": ["守護"]},
+        {"id": "3", "class": "ロイヤル", "hp": 6, "keywords": ["守護"]},
+    ]
+    plan = compile_filter_plan(RuleBasedQueryParser().parse("HP4以上のエルフの守護").analysis)
+    assert [card["id"] for card in cards if plan.matches(card)] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_confident_queries_skip_the_llm(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"conditions": {}}'))])
+
+    service = DatabaseService()
+    service.llm_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    service.is_mocked = False
+    service.query_analysis_cache = None
+
+    analysis = await service._analyze_query_with_llm("5コストのエルフ")
+    assert analysis["source"] == "rule"
+    assert analysis["conditions"]["class"] == "エルフ"
+    assert calls == []
+
+    await service._analyze_query_with_llm("白銀の騎士の使い方")
+    assert len(calls) == 1
+    stats = service.get_query_rule_parser_stats()
+    assert stats["accepted"] == 1 and stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_sends_only_unparsed_queries(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        queries = json.loads(kwargs["messages"][1]["content"])
+        content = json.dumps({"analyses": [{"conditions": {"name": query}} for query in queries]}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    service = DatabaseService()
+    service.llm_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    service.is_mocked = False
+    service.query_analysis_cache = None
+    service.query_analysis_batch = True
+
+    analyses = await service._analyze_keywords_with_llm(["5コストのエルフ", "白銀の騎士の使い方"])
+    assert analyses["5コストのエルフ"]["source"] == "rule"
+    assert analyses["白銀の騎士の使い方"] == {"conditions": {"name": "白銀の騎士の使い方"}}
+    assert len(calls) == 1
+    assert json.loads(calls[0]["messages"][1]["content"]) == ["白銀の騎士の使い方"]
+    stats = service.get_query_rule_parser_stats()
+    assert stats["accepted"] == 1 and stats["rejected"] == 1
+
+
+def test_parser_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("TEST_MODE", "true")
+    monkeypatch.setenv("QUERY_RULE_PARSER_ENABLED", "false")
+    assert DatabaseService().get_query_rule_parser_stats() == {"enabled": False}
@@ -0,0 +1,94 @@
+"""
+ChatResponseCache（/chat 応答キャッシュ + single-flight）のテスト
+"""
+import os
+os.environ.setdefault("BACKEND_TESTING", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.response_cache import ChatResponseCache
+from app.services.service_container import reset_default_container
+
+
+def _counting_pipeline(calls, cacheable=True, delay=0.05):
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"answer": f"answer-{len(calls)}", "context": None, "retrieved_titles": []}, cacheable
+    return compute
+
+
+def test_key_normalizes_message_and_separates_options():
+    key = ChatResponseCache.make_key("  Ｈｅｌｌｏ   World ", 5, True)
+    assert key == ChatResponseCache.make_key("hello world", 5, True)
+    assert key != ChatResponseCache.make_key("hello world", 3, True)
+    assert key != ChatResponseCache.make_key("hello world", 5, False)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_questions_share_one_pipeline():
+    cache = ChatResponseCache()
+    calls = []
+    results = await asyncio.gather(*(
+        cache.get_or_compute("同じ質問", 5, True, _counting_pipeline(calls)) for _ in range(8)
+    ))
+    assert len(calls) == 1
+    assert {r["answer"] for r, _ in results} == {"answer-1"}
+    assert sum(1 for _, meta in results if meta["coalesced"]) == 7
+
+    response, meta = await cache.get_or_compute("同じ質問", 5, True, _counting_pipeline(calls))
+    assert len(calls) == 1
+    assert meta["hit"] is True and meta["coalesced"] is False
+    assert response["answer"] == "answer-1"
+    assert cache.get_stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_response_is_shared_but_not_stored():
+    cache = ChatResponseCache()
+    calls = []
+    await asyncio.gather(*(
+        cache.get_or_compute("fallback", 5, True, _counting_pipeline(calls, cacheable=False)) for _ in range(3)
+    ))
+    assert len(calls) == 1
+    _, meta = await cache.get_or_compute("fallback", 5, True, _counting_pipeline(calls, cacheable=False))
+    assert meta["hit"] is False
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_pipeline_error_propagates_to_waiters_and_is_not_cached():
+    cache = ChatResponseCache()
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("error", 5, True, failing) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get_stats()["inflight"] == 0
+    calls = []
+    response, _ = await cache.get_or_compute("error", 5, True, _counting_pipeline(calls))
+    assert response["answer"] == "answer-1"
+
+
+def test_chat_endpoint_reports_cache_hit(monkeypatch):
+    # 到達できない Upstash を設定したままだとフォールバック応答になり、キャッシュされない
+    monkeypatch.delenv("UPSTASH_VECTOR_REST_URL", raising=False)
+    reset_default_container()
+    client = TestClient(app)
+    first = client.post("/chat", json={"message": "キャッシュ確認", "top_k": 3})
+    second = client.post("/chat", json={"message": "  キャッシュ確認 ", "top_k": 3})
+    other = client.post("/chat", json={"message": "キャッシュ確認", "top_k": 3, "with_context": False})
+    assert first.json()["cache"]["hit"] is False
+    assert second.json()["cache"]["hit"] is True
+    assert second.json()["answer"] == first.json()["answer"]
+    assert other.json()["cache"]["hit"] is False
+    reset_default_container()
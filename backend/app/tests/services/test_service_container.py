@@ -0,0 +1,47 @@
+"""
+ServiceContainer（ワーカー共有サービス）のテスト
+"""
+import os
+os.environ.setdefault("BACKEND_TESTING", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import service_container
+from app.services.service_container import ServiceContainer, get_default_container, reset_default_container
+
+
+def test_default_container_is_process_singleton():
+    reset_default_container()
+    first = get_default_container()
+    second = get_default_container()
+    assert first is second
+    assert isinstance(first, ServiceContainer)
+
+
+def test_chat_reuses_services_across_requests(monkeypatch):
+    reset_default_container()
+    built = []
+    original_init = ServiceContainer.__init__
+
+    def counting_init(self):
+        built.append(self)
+        original_init(self)
+
+    monkeypatch.setattr(service_container.ServiceContainer, "__init__", counting_init)
+    with TestClient(app) as client:
+        for message in ("一回目", "二回目", "三回目"):
+            resp = client.post("/chat", json={"message": message, "with_context": False})
+            assert resp.status_code == 200
+        assert app.state.services is built[0]
+    assert len(built) == 1
+
+
+def test_lifespan_warms_up_and_releases_container():
+    reset_default_container()
+    with TestClient(app):
+        container = app.state.services
+        assert container.warmed_up is True
+    assert app.state.services is None
+    assert service_container._container is None
@@ -0,0 +1,51 @@
+"""
+文字 n-gram インデックス（NgramIndex）のテスト
+"""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.services.text_index import NgramIndex
+
+ALPHABET = "あいうえおダメージ守護abcA 1２"
+
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30))).lower() for _ in range(n)]
+
+
+def test_rows_containing_matches_brute_force():
+    texts = random_texts(300)
+    index = NgramIndex(texts)
+    rng = random.Random(1)
+    terms = ["", "a", "ダメ", "ダメージ", "あいう", "zz", "𠮷野"]
+    terms += [text[i:i + rng.randint(1, 5)] for text in texts[:40] for i in range(0, max(len(text) - 1, 1), 7)]
+    for term in terms:
+        expected = [i for i, text in enumerate(texts) if term in text]
+        assert index.rows_containing(term).tolist() == expected, term
+
+
+def test_grams_do_not_span_documents():
+    index = NgramIndex(["ab", "cd"])
+    assert index.rows_containing("bc").tolist() == []
+    assert index.rows_containing("abc").tolist() == []
+
+
+def test_bm25_prefers_rare_terms_and_shorter_documents():
+    index = NgramIndex(["守護 守護", "守護" + " 長い文章" * 20, "疾走", "疾走 守護"])
+    rows, scores = index.bm25(["守護"])
+    by_row = dict(zip(rows.tolist(), scores.tolist()))
+    assert set(by_row) == {0, 1, 3}
+    assert by_row[0] > by_row[3] > by_row[1]
+    rows, scores = index.bm25(["守護", "疾走"])
+    assert dict(zip(rows.tolist(), scores.tolist()))[3] == max(scores)
+
+
+def test_build_reuses_identical_texts():
+    texts = random_texts(20)
+    index = NgramIndex(texts)
+    assert NgramIndex.build(list(texts), previous=index) is index
+    assert NgramIndex.build(texts[:-1], previous=index) is not index
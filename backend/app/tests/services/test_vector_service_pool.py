@@ -0,0 +1,152 @@
+"""
+VectorService の接続プール経由検索（ローカル偽 Upstash サーバー使用）
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.vector_service import VectorService
+from app.tests.mocks.fake_upstash_server import FakeUpstashServer
+
+
+@pytest.fixture
+def fake_upstash(monkeypatch):
+    with FakeUpstashServer(delay=0.2, titles=["カードA", "カードB", "カードA", "カードC"]) as server:
+        monkeypatch.setenv("UPSTASH_VECTOR_REST_URL", server.url)
+        monkeypatch.setenv("UPSTASH_VECTOR_REST_TOKEN", "local-token")
+        monkeypatch.delenv("UPSTASH_VECTOR_NAMESPACE", raising=False)
+        yield server
+
+
+def test_search_returns_deduped_titles(fake_upstash, monkeypatch):
+    monkeypatch.setenv("UPSTASH_VECTOR_NAMESPACE", "effect_1")
+    service = VectorService()
+
+    async def run():
+        titles = await service.search([0.1] * 128, top_k=4)
+        await service.close()
+        return titles
+
+    assert asyncio.run(run()) == ["カードA", "カードB", "カードC"]
+    assert ("/query/effect_1" in [path for path, _ in fake_upstash.requests])
+
+
+def test_queries_run_off_event_loop_and_reuse_connections(fake_upstash, monkeypatch):
+    monkeypatch.setenv("UPSTASH_POOL_MAX_CONNECTIONS", "4")
+    service = VectorService()
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        # 1巡目で接続を確立し、2巡目は確立済み接続を再利用する
+        await asyncio.gather(*(service.search([0.1 * i] * 128, top_k=2) for i in range(8)))
+        tick_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await asyncio.gather(*(service.search([0.1 * i] * 128, top_k=2) for i in range(8)))
+        elapsed = time.perf_counter() - started
+        tick_task.cancel()
+        metrics = service.get_pool_metrics()
+        await service.close()
+        return elapsed, ticks, metrics
+
+    elapsed, ticks, metrics = asyncio.run(run())
+    # 8クエリ / 4接続 = 2ラウンド（直列なら 8 * 0.2s）
+    assert elapsed < 8 * fake_upstash.delay * 0.6
+    # クエリ実行中もイベントループが回っている
+    assert ticks > 10
+    assert fake_upstash.max_in_flight <= 4
+    assert metrics["pool_size"] <= 4
+    assert metrics["connections_created"] <= 4
+    assert metrics["acquisitions"] == 16
+    assert metrics["saturation_waits"] >= 1
+    assert metrics["in_use"] == 0
+
+
+def test_pool_acquire_timeout_falls_back(fake_upstash, monkeypatch):
+    monkeypatch.setenv("UPSTASH_POOL_MAX_CONNECTIONS", "1")
+    monkeypatch.setenv("UPSTASH_POOL_ACQUIRE_TIMEOUT", "0.05")
+    service = VectorService()
+
+    async def run():
+        results = await asyncio.gather(*(service.search([0.2] * 128, top_k=2) for _ in range(2)))
+        metrics = service.get_pool_metrics()
+        await service.close()
+        return results, metrics
+
+    results, metrics = asyncio.run(run())
+    assert ["カードA", "カードB"] in results
+    assert metrics["acquire_timeouts"] >= 1
+    # 取得できなかった側はダミータイトルへフォールバック
+    assert all(len(r) == 2 for r in results)
+
+
+def test_timed_out_query_keeps_connection_until_call_finishes(fake_upstash, monkeypatch):
+    monkeypatch.setenv("UPSTASH_POOL_MAX_CONNECTIONS", "1")
+    monkeypatch.setenv("VECTOR_QUERY_TIMEOUT_SECONDS", "0.05")
+    service = VectorService()
+
+    async def run():
+        await service.initialize()
+        await service.search([0.3] * 128, top_k=2)
+        in_use_after_timeout = service.get_pool_metrics()["in_use"]
+        # 後続の検索は実行中の呼び出しが終わるまで同じ接続を使わない
+        await asyncio.gather(*(service.search([0.3] * 128, top_k=2) for _ in range(2)))
+        await asyncio.sleep(fake_upstash.delay * 2)
+        metrics = service.get_pool_metrics()
+        await service.close()
+        return in_use_after_timeout, metrics
+
+    in_use_after_timeout, metrics = asyncio.run(run())
+    # タイムアウトで待機を打ち切っても、スレッドの呼び出しが終わるまで接続は使用中
+    assert in_use_after_timeout == 1
+    assert fake_upstash.max_in_flight == 1
+    assert metrics["in_use"] == 0
+
+
+def test_fuse_rankings_max_and_rrf():
+    from app.services.vector_service import fuse_rankings
+
+    rankings = [
+        [("A", 0.90), ("B", 0.80), ("C", 0.70)],
+        [("B", 0.85), ("C", 0.80)],
+    ]
+    assert fuse_rankings(rankings, method="max") == ["A", "B", "C"]
+    # B は両方で上位 -> RRF では最上位
+    assert fuse_rankings(rankings, method="rrf") == ["B", "C", "A"]
+
+
+def test_fanout_queries_namespaces_concurrently(monkeypatch):
+    namespace_titles = {
+        "effect_1": ["カードA", "カードB"],
+        "qa_question": ["カードB", "カードC"],
+        "flavorText": ["カードD", "カードB"],
+    }
+    with FakeUpstashServer(delay=0.2, namespace_titles=namespace_titles) as server:
+        monkeypatch.setenv("UPSTASH_VECTOR_REST_URL", server.url)
+        monkeypatch.setenv("UPSTASH_VECTOR_REST_TOKEN", "local-token")
+        monkeypatch.setenv("UPSTASH_VECTOR_NAMESPACES", "effect_1, qa_question,flavorText")
+        monkeypatch.setenv("UPSTASH_POOL_MIN_CONNECTIONS", "3")
+        service = VectorService()
+
+        async def run():
+            await service.initialize()
+            started = time.perf_counter()
+            titles = await service.search([0.1] * 128, top_k=3)
+            elapsed = time.perf_counter() - started
+            await service.close()
+            return titles, elapsed
+
+        titles, elapsed = asyncio.run(run())
+    # B は全 namespace に出現 -> RRF で先頭。3 namespace の直列なら 0.6s
+    assert titles[0] == "カードB"
+    assert len(titles) == 3 and len(set(titles)) == 3
+    assert elapsed < 3 * 0.2 * 0.8
+    queried = {path for path, _ in server.requests if path.startswith("/query")}
+    assert queried == {"/query/effect_1", "/query/qa_question", "/query/flavorText"}
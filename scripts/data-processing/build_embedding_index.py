@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""embedding_list.jsonl → バイナリ埋め込みインデックス（embedding_index.bin）の生成
+
+embedding.py の出力（1行1ベクトルの JSONL）を、ヘッダ + float32 行列 + id/title テーブルの
+バイナリ形式に変換します。バックエンド（VECTOR_BACKEND=local）は np.memmap で開くため、
+gunicorn の全ワーカーで1つのページキャッシュを共有できます。
+--ivf-lists を指定すると近似検索用の IVF（k-means 重心）も学習し、`<output>.ivf` に保存します。
+
+使い方:
+    python scripts/data-processing/build_embedding_index.py \\
+        --input data/embedding_list.jsonl --output data/embedding_index.bin --dim 128 --ivf-lists 64
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DIR))
+
+from app.services.local_vector_index import (  # type: ignore  # noqa: E402
+    LocalVectorIndex,
+    build_title_lookup,
+    write_binary_index,
+)
+from app.services.ivf_index import build_ivf, write_ivf  # type: ignore  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the memory-mappable embedding index from embedding_list.jsonl")
+    parser.add_argument("--input", type=str, default=str(PROJECT_ROOT / "data" / "embedding_list.jsonl"))
+    parser.add_argument("--cards", type=str, default=str(PROJECT_ROOT / "data" / "data.json"),
+                        help="タイトル解決用のカードデータ（id → name）")
+    parser.add_argument("--output", type=str, default=str(PROJECT_ROOT / "data" / "embedding_index.bin"))
+    parser.add_argument("--dim", type=int, default=0,
+                        help="先頭N次元のみ保存（0=全次元）。EmbeddingService は先頭128次元で検索する")
+    parser.add_argument("--no-normalize", action="store_true", help="行の L2 正規化を行わない")
+    parser.add_argument("--ivf-lists", type=int, default=0,
+                        help="IVF のクラスタ数（0=近似インデックスなし）。目安: sqrt(行数)")
+    parser.add_argument("--kmeans-iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: 入力ファイルが存在しません: {args.input}")
+        return 1
+
+    title_lookup = {}
+    if os.path.exists(args.cards):
+        with open(args.cards, encoding="utf-8") as f:
+            title_lookup = build_title_lookup(json.load(f))
+    else:
+        print(f"Warning: カードデータがありません（タイトルは metadata.title / id を使用）: {args.cards}")
+
+    started = time.perf_counter()
+    index = LocalVectorIndex.from_jsonl(args.input, title_lookup)
+    if args.dim:
+        index = LocalVectorIndex(index.ids, index.titles, index.namespaces, index.matrix[:, :args.dim])
+    ivf = None
+    if args.ivf_lists:
+        # 行を namespace 内のクラスタ順に並べ替えてから書き出す（クラスタ = 連続区間）
+        index, ivf = build_ivf(index, args.ivf_lists, iterations=args.kmeans_iterations, seed=args.seed)
+    matrix = index.matrix
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    write_binary_index(args.output, index.ids, index.titles, index.namespaces, matrix,
+                       normalize=not args.no_normalize)
+    ivf_path = f"{args.output}.ivf"
+    if ivf is not None:
+        write_ivf(ivf_path, ivf, len(index))
+    elif os.path.exists(ivf_path):
+        os.unlink(ivf_path)  # 古い IVF は行順が合わないため削除
+
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print("=== Embedding Index ===")
+    print(f"rows: {len(index)}  dim: {matrix.shape[1]}  normalized: {not args.no_normalize}")
+    for ns, count in sorted(index.namespace_counts.items()):
+        print(f"  {ns or '(default)'}: {count}")
+    if ivf is not None:
+        print(f"ivf: nlist={ivf.nlist} -> {ivf_path}")
+    print(f"output: {args.output} ({size_mb:.2f} MB) in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
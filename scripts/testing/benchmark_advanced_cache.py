@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+AdvancedCache の get/set スループットとヒット率の計測（Zipf 分布のアクセス列）
+
+キー空間 --keys 個・容量 --capacity 件相当のキャッシュに対し、Zipf(--alpha) に従うアクセス列を
+「get → ミスなら set」で再生します。比較として挿入順追い出し（参照で並べ替えない旧方式）も同じ列で測定します。
+
+使い方:
+  python scripts/testing/benchmark_advanced_cache.py --keys 100000 --capacity 5000 --ops 500000 --alpha 1.1
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import OrderedDict
+from typing import Any, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from app.core.cache import AdvancedCache  # type: ignore  # noqa: E402
+
+
+class _InsertionOrder(OrderedDict):  # type: ignore[type-arg]
+    """参照時に並べ替えない（= 旧実装の挿入順追い出し）"""
+
+    def move_to_end(self, key: Any, last: bool = True) -> None:
+        return None
+
+
+def zipf_trace(keys: int, ops: int, alpha: float, seed: int) -> List[str]:
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(alpha, size=ops * 2)
+    ranks = ranks[ranks <= keys][:ops]
+    # 人気順とキー名の対応をシャッフル（キー名の並びに依存しないように）
+    names = rng.permutation(keys)
+    return [f"q:{names[r - 1]}" for r in ranks.tolist()]
+
+
+async def replay(cache: AdvancedCache, trace: List[str], value: str) -> dict:
+    gets = sets = hits = 0
+    get_seconds = set_seconds = 0.0
+    for key in trace:
+        t0 = time.perf_counter()
+        found = await cache.get(key)
+        t1 = time.perf_counter()
+        get_seconds += t1 - t0
+        gets += 1
+        if found is None:
+            await cache.set(key, value, compress=False)
+            set_seconds += time.perf_counter() - t1
+            sets += 1
+        else:
+            hits += 1
+    return {
+        "hit_rate": hits / gets if gets else 0.0,
+        "get_ops": gets / get_seconds if get_seconds else 0.0,
+        "set_ops": sets / set_seconds if set_seconds else 0.0,
+        "entries": len(cache.cache),
+        "evictions": cache.stats["evictions"],
+    }
+
+
+def make_cache(capacity: int, value: str, insertion_order: bool) -> AdvancedCache:
+    cache = AdvancedCache(default_ttl=3600, max_memory_mb=1)
+    cache.max_memory_bytes = capacity * len(value)  # 文字列は len() バイトで計上される
+    if insertion_order:
+        cache.cache = _InsertionOrder()
+    return cache
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AdvancedCache on a Zipfian trace")
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--capacity", type=int, default=5_000, help="保持できるエントリ数")
+    parser.add_argument("--ops", type=int, default=500_000)
+    parser.add_argument("--alpha", type=float, default=1.1)
+    parser.add_argument("--value-bytes", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    trace = zipf_trace(args.keys, args.ops, args.alpha, args.seed)
+    value = "x" * args.value_bytes
+    print(f"trace={len(trace)} keys={args.keys} capacity={args.capacity} alpha={args.alpha}")
+    for label, insertion_order in (("lru", False), ("insertion-order", True)):
+        cache = make_cache(args.capacity, value, insertion_order)
+        result = asyncio.run(replay(cache, trace, value))
+        print(
+            f"{label:>16}: hit_rate={result['hit_rate']:.3f} get={result['get_ops']:,.0f}/s "
+            f"set={result['set_ops']:,.0f}/s entries={result['entries']} evictions={result['evictions']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+IVF 近似検索の recall@k / レイテンシ計測（厳密検索との比較）
+
+クラスタ構造を持つ合成埋め込み（カード数 × namespace 数）で LocalVectorIndex を構築し、
+IVF（k-means 重心）を学習して nprobe 毎に recall@k と1クエリあたりの検索時間を出力します。
+実データで測る場合は --index に build_embedding_index.py の出力（.ivf サイドカー付き）を指定します。
+
+使い方:
+  python scripts/testing/benchmark_ann_recall.py --cards 20000 --namespaces 1 --dim 128 --nlist 128
+  python scripts/testing/benchmark_ann_recall.py --index data/embedding_index.bin --namespace effect_1
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from app.services.local_vector_index import LocalVectorIndex  # type: ignore  # noqa: E402
+from app.services.ivf_index import attach_ivf_sidecar, build_ivf  # type: ignore  # noqa: E402
+
+
+def synthetic_index(cards: int, namespaces: int, dim: int, topics: int, noise: float, seed: int) -> LocalVectorIndex:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    rows = cards * namespaces
+    matrix = centers[rng.integers(0, topics, rows)] + noise * rng.normal(size=(rows, dim)).astype(np.float32)
+    ids, titles, nss = [], [], []
+    for n in range(namespaces):
+        for c in range(cards):
+            ids.append(f"card{c}:effect_{n + 1}")
+            titles.append(f"カード{c}")
+            nss.append(f"effect_{n + 1}")
+    return LocalVectorIndex(ids, titles, nss, matrix)
+
+
+def measure(index: LocalVectorIndex, queries, top_k: int, namespace: str, exact: bool):
+    results, samples = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append([m.id for m in index.query(q, top_k, namespace=namespace, exact=exact)])
+        samples.append((time.perf_counter() - t0) * 1000)
+    return results, statistics.mean(samples), sorted(samples)[int(len(samples) * 0.95) - 1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recall@k and latency of IVF vs exact search")
+    parser.add_argument("--index", type=str, default="", help="バイナリインデックス（.ivf サイドカー付き）")
+    parser.add_argument("--namespace", type=str, default="effect_1")
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--namespaces", type=int, default=1)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--topics", type=int, default=200, help="合成データのクラスタ数")
+    parser.add_argument("--noise", type=float, default=1.5, help="クラスタ内のばらつき（大きいほど難しい）")
+    parser.add_argument("--nlist", type=int, default=128)
+    parser.add_argument("--nprobe", type=str, default="1,2,4,8,16,32")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.index:
+        index = LocalVectorIndex.from_binary(args.index)
+        if not attach_ivf_sidecar(index):
+            print(f"IVF サイドカーがありません: {args.index}.ivf")
+            return 1
+    else:
+        started = time.perf_counter()
+        index, ivf = build_ivf(
+            synthetic_index(args.cards, args.namespaces, args.dim, args.topics, args.noise, args.seed),
+            args.nlist, seed=args.seed,
+        )
+        index.ivf = ivf
+        print(f"built rows={len(index)} nlist={ivf.nlist} in {time.perf_counter() - started:.2f}s")
+    index.ivf.min_rows = 0
+
+    rng = np.random.default_rng(args.seed + 1)
+    rows = index._ns_rows[args.namespace]
+    picks = rng.integers(rows.start, rows.stop, args.queries)
+    queries = np.asarray(index.matrix[picks]) + 0.3 * rng.normal(size=(args.queries, index.dimension)).astype(np.float32)
+
+    truth, exact_mean, exact_p95 = measure(index, queries, args.top_k, args.namespace, exact=True)
+    print(f"exact       recall@{args.top_k}=1.000  mean={exact_mean:.3f}ms p95={exact_p95:.3f}ms")
+    for nprobe in [int(v) for v in args.nprobe.split(",") if v]:
+        index.ivf.nprobe = nprobe
+        approx, mean, p95 = measure(index, queries, args.top_k, args.namespace, exact=False)
+        recall = statistics.mean(len(set(a) & set(t)) / len(t) for a, t in zip(approx, truth) if t)
+        print(f"nprobe={nprobe:<4} recall@{args.top_k}={recall:.3f}  mean={mean:.3f}ms p95={p95:.3f}ms "
+              f"speedup={exact_mean / mean:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+DatabaseService の列指向インデックス（CardIndex）と従来の全件走査の比較
+
+合成カタログ（既定 100k 件）で search_by_filters / get_cards_by_class / get_statistics /
+search_cards_with_pagination / 集約クエリ（最大・上位N）/ 範囲キーワード判定 /
+テキストスコア・全文検索（BM25）を両方の経路で実行し、1 回あたりの時間と結果の一致を出力します。
+
+使い方:
+  python scripts/testing/benchmark_card_index.py --cards 100000 --repeat 5
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from app.services.database_service import DatabaseService  # type: ignore  # noqa: E402
+from app.services.card_index import CardIndex  # type: ignore  # noqa: E402
+
+CLASSES = ["エルフ", "ドラゴン", "ロイヤル", "ウィッチ", "ネクロマンサー", "ビショップ", "ネメシス", "ヴァンパイア", "ニュートラル", "ナイトメア"]
+RARITIES = ["レジェンド", "ゴールドレア", "シルバーレア", "ブロンズレア"]
+TYPES = ["", "ルミナス", "土の印", "マナリア", "レヴィオン", "アナテマ"]
+KEYWORDS = ["ファンファーレ", "ラストワード", "コンボ", "守護", "疾走", "突進", "必殺", "進化時", "交戦時", "スペルブースト"]
+EFFECTS = ["相手のフォロワー1体に{n}ダメージ", "カードを{n}枚引く", "自分のリーダーを{n}回復", "{n}/{n}の兵士を1体出す"]
+
+
+def synthetic_cards(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """data.json と同じ形の合成カード"""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(n):
+        cards.append({
+            "id": f"{10000000 + i}",
+            "name": f"合成カード{i}",
+            "class": rng.choice(CLASSES),
+            "rarity": rng.choice(RARITIES),
+            "cost": rng.randint(0, 10),
+            "attack": rng.randint(0, 10),
+            "hp": rng.randint(0, 10),
+            "type": rng.choice(TYPES),
+            "effect_1": rng.choice(EFFECTS).format(n=rng.randint(1, 8)),
+            "effect_2": rng.choice(EFFECTS).format(n=rng.randint(1, 8)) if rng.random() < 0.3 else "",
+            "keywords": rng.sample(KEYWORDS, rng.randint(0, 3)),
+            "cv": "",
+            "illustrator": "",
+            "qa": [],
+        })
+    return cards
+
+
+def make_service(cards: List[Dict[str, Any]], indexed: bool) -> DatabaseService:
+    service = DatabaseService()
+    service.data = cards
+    if not indexed:
+        service._get_card_index = lambda *args, **kwargs: None  # type: ignore[method-assign]
+    return service
+
+
+def aggregation(agg_type: str, field: str, count: int = 5) -> Dict[str, Any]:
+    return {"aggregation": {"is_aggregation": True, "aggregation_type": agg_type, "field": field, "count": count}}
+
+
+def fresh(service: DatabaseService) -> DatabaseService:
+    """クエリ毎のメモを捨てて、毎回の計算量を測る"""
+    index = service._get_card_index()
+    if index is not None:
+        index._memo.clear()
+    return service
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CardIndex vs full scans in DatabaseService")
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards, args.seed)
+    started = time.perf_counter()
+    index = CardIndex(cards)
+    print(f"cards={len(cards)} index_build={time.perf_counter() - started:.3f}s")
+    started = time.perf_counter()
+    index.build_text_indexes()
+    print(f"ngram_build={time.perf_counter() - started:.3f}s")
+    indexed = make_service(cards, indexed=True)
+    legacy = make_service(cards, indexed=False)
+
+    cases: Dict[str, Callable[[DatabaseService], Any]] = {
+        "search_by_filters(class+cost)": lambda s: s.search_by_filters(class_filter="エルフ", cost_min=3, cost_max=5),
+        "search_by_filters(type+hp+attack)": lambda s: s.search_by_filters(type_filter="土の印", hp_min=5, attack_max=4, limit=50),
+        "search_by_filters(class+keywords)": lambda s: s.search_by_filters(class_filter="ロイヤル", keywords_filter=["守護", "疾走"]),
+        "search_by_filters(rarity+type)": lambda s: s.search_by_filters(rarity_filter="レジェンド", type_filter="マナリア", hp_min=8),
+        "get_cards_by_class": lambda s: s.get_cards_by_class("ドラゴン"),
+        "get_cards_by_rarity(limit=20)": lambda s: s.get_cards_by_rarity("レジェンド", limit=20),
+        "get_statistics": lambda s: s.get_statistics(),
+        "pagination(cost desc, page 50)": lambda s: s.search_cards_with_pagination(page=50, sort_by="cost", sort_order="desc"),
+        "pagination(query, name asc)": lambda s: s.search_cards_with_pagination(query="ダメージ", page=3, sort_by="name"),
+        "aggregation(max hp)": lambda s: asyncio.run(s._handle_aggregation_query("", aggregation("max", "hp"))),
+        "aggregation(top_n 10 attack)": lambda s: asyncio.run(s._handle_aggregation_query("", aggregation("top_n", "attack", 10))),
+        "fallback(コスト3から5の間) all cards": lambda s: [s._match_filterable_fallback(c, "コスト3から5の間") for c in s.data_cache],
+        "text_score(all cards)": lambda s: [s._calculate_text_score(c, ["ダメージ", "守護"]) for c in fresh(s).data_cache],
+        "search_text(bm25)": lambda s: s.search_text("ダメージ 守護", top_k=20),
+    }
+    print(f"{'case':<36} {'scan ms':>10} {'index ms':>10} {'speedup':>8} same")
+    for label, case in cases.items():
+        scan_t, scan_result = timed(lambda: case(legacy), args.repeat)
+        index_t, index_result = timed(lambda: case(indexed), args.repeat)
+        print(
+            f"{label:<36} {scan_t * 1000:>10.2f} {index_t * 1000:>10.2f} "
+            f"{scan_t / index_t if index_t else float('inf'):>7.1f}x {scan_result == index_result}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
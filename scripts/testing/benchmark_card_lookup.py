@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+bulk_get_card_details: 識別子 × 全カードの走査とハッシュ索引の比較
+
+合成カタログに対して --identifiers 件（既定 10,000 件、1 割は存在しない識別子）を ID / 名前で一括解決します。
+- scan: 従来の実装（識別子毎に data_cache を先頭から走査。名前は組毎に _normalize_title）。
+  全件は現実的な時間で終わらないため --scan-sample 件だけ実行し、1 識別子あたりの時間から全件分を推定
+- lookup: 索引構築（reload_data 相当）と bulk_get_card_details / lookup_cards
+
+使い方:
+  python scripts/testing/benchmark_card_lookup.py --cards 20000 --identifiers 10000
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import random
+import argparse
+from typing import Any, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from benchmark_card_index import make_service, synthetic_cards  # noqa: E402
+from app.services.card_lookup import CardLookup  # noqa: E402
+
+
+def scan(service: Any, identifiers: List[str], by_field: str) -> List[Dict[str, Any]]:
+    """従来の bulk_get_card_details（識別子毎に全カードを走査）"""
+    results = []
+    for identifier in identifiers:
+        for item in service.data_cache:
+            if by_field == "id" and str(item.get("id", "")) == str(identifier):
+                results.append(item)
+                break
+            elif by_field == "name":
+                if service._normalize_title(str(identifier)) == service._normalize_title(str(item.get("name", ""))):
+                    results.append(item)
+                    break
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bulk card lookup by id / normalized name")
+    parser.add_argument("--cards", type=int, default=20_000)
+    parser.add_argument("--identifiers", type=int, default=10_000)
+    parser.add_argument("--scan-sample", type=int, default=200, help="従来実装を実際に実行する識別子数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards, args.seed)
+    service = make_service(cards, indexed=False)
+    rng = random.Random(args.seed)
+    picked = [rng.choice(cards) for _ in range(args.identifiers)]
+    missing = set(rng.sample(range(args.identifiers), args.identifiers // 10))
+    by_field_identifiers = {
+        "id": [f"missing-{i}" if i in missing else item["id"] for i, item in enumerate(picked)],
+        # 名前は空白・記号を混ぜ、正規化して一致することを確認する
+        "name": [f"missing-{i}" if i in missing else f" {item['name']}・" for i, item in enumerate(picked)],
+    }
+
+    started = time.perf_counter()
+    CardLookup(cards, service._normalize_title)
+    build = time.perf_counter() - started
+    print(f"cards={len(cards)} identifiers={args.identifiers} (missing {len(missing)}) index build={build * 1000:.1f}ms")
+    print(f"{'by':<5} {'scan est. total':>16} {'lookup total':>13} {'speedup':>9} found")
+    for by_field, identifiers in by_field_identifiers.items():
+        sample = identifiers[:args.scan_sample]
+        started = time.perf_counter()
+        expected = scan(service, sample, by_field)
+        scan_per_id = (time.perf_counter() - started) / len(sample)
+
+        started = time.perf_counter()
+        found = service.bulk_get_card_details(identifiers, by_field=by_field)
+        lookup_total = time.perf_counter() - started
+        assert service.bulk_get_card_details(sample, by_field=by_field) == expected
+
+        scan_total = scan_per_id * len(identifiers)
+        print(f"{by_field:<5} {scan_total:>15.2f}s {lookup_total * 1000:>11.1f}ms {scan_total / lookup_total:>8.0f}x {len(found)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
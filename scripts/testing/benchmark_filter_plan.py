@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+LLM 解析結果のフィルタ判定: カード毎の _match_filterable_llm とコンパイル済みプランの比較
+
+合成カタログの全件に対して同じ解析結果（conditions）を適用し、cards/sec と一致件数を出力します。
+- per-item: 従来どおりカード毎に await self._match_filterable_llm(item, analysis)
+- plan: compile_filter_plan でコンパイルし、述語だけを評価（索引なし）
+- plan+index: さらに CardIndex の posting list・数値列で候補行を絞り込む
+
+使い方:
+  python scripts/testing/benchmark_filter_plan.py --cards 100000 --repeat 3
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from app.services.filter_plan import compile_filter_plan, iter_matches  # type: ignore  # noqa: E402
+from benchmark_card_index import make_service, synthetic_cards  # noqa: E402
+
+ANALYSES: Dict[str, Dict[str, Any]] = {
+    "class+cost>=": {"conditions": {"class": "エルフ", "cost": {"value": 3, "operator": "以上"}}},
+    "rarity+hp range": {"conditions": {"rarity": "レジェンド", "hp": {"value": 4, "operator": "範囲", "max_value": 6}}},
+    "type+keywords": {"conditions": {"type": "マナリア", "keywords": ["守護", "ファンファーレ"]}},
+    "effect+attack≈": {"conditions": {"effect": "ダメージ", "attack": {"value": 6, "operator": "近似"}}},
+    "name": {"conditions": {"name": "合成カード99"}},
+}
+
+
+def measure(fn: Callable[[], List[Any]], repeat: int) -> tuple[float, int]:
+    samples = []
+    count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = len(fn())
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark compiled filter plans vs per-item LLM filter matching")
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards, args.seed)
+    service = make_service(cards, indexed=True)
+    index = service._get_card_index()
+
+    async def per_item(analysis: Dict[str, Any]) -> List[Any]:
+        return [item for item in cards if await service._match_filterable_llm(item, analysis)]
+
+    print(f"cards={len(cards)}")
+    print(f"{'analysis':<18} {'per-item c/s':>14} {'plan c/s':>14} {'plan+index c/s':>16} {'speedup':>8} matches")
+    for label, analysis in ANALYSES.items():
+        plan = compile_filter_plan(analysis)
+        old_t, old_n = measure(lambda: asyncio.run(per_item(analysis)), args.repeat)
+        plan_t, plan_n = measure(lambda: list(iter_matches([plan], cards)), args.repeat)
+        index_t, index_n = measure(lambda: list(iter_matches([plan], cards, index)), args.repeat)
+        assert old_n == plan_n == index_n
+        print(
+            f"{label:<18} {len(cards) / old_t:>14,.0f} {len(cards) / plan_t:>14,.0f} "
+            f"{len(cards) / index_t:>16,.0f} {old_t / index_t:>7.1f}x {old_n}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+カードファイル読み込み: json.load と逐次読み込み（JsonContainerStream）のピークメモリ・時間
+
+data.json と同じ形の合成カタログ（--base-cards × --scale 件。効果文・QA 付き）を一時ファイルに書き出し、
+読み込み方式毎に新しいプロセスで 1 回だけ読み込んで、読み込み時間とピーク RSS の増分を測ります。
+- storage: StorageService.load_json_data / DatabaseService の JsonFileStorageService.load_data（カード全件のリスト）
+- mvp_index: routers.rag._mvp_build_card_index（タイトル → 必要なフィールドのみの索引）
+
+使い方:
+  python scripts/testing/benchmark_json_loading.py --base-cards 2000 --scale 10
+"""
+from __future__ import annotations
+import gc
+import os
+import sys
+import json
+import time
+import random
+import resource
+import argparse
+import tempfile
+import subprocess
+from typing import Any, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+MODES = ["storage:json.load", "storage:stream", "mvp_index:json.load", "mvp_index:stream"]
+
+
+def write_catalogue(path: str, n: int, seed: int) -> None:
+    from benchmark_card_index import synthetic_cards
+
+    rng = random.Random(seed)
+    cards: List[Dict[str, Any]] = synthetic_cards(n, seed)
+    for card in cards:
+        card["effect_1"] = card["effect_1"] + "。" + "このフォロワーが場にいる限り、" * rng.randint(1, 4)
+        card["qa"] = [
+            {"question": f"{card['name']}の効果は進化時にも発動しますか？（{i}）", "answer": "はい、発動します。" * rng.randint(1, 3)}
+            for i in range(rng.randint(0, 4))
+        ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cards, f, ensure_ascii=False, indent=2)
+
+
+def peak_rss_mb() -> float:
+    # Linux の ru_maxrss は KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb() -> float:
+    """現在の RSS（/proc が無ければピーク値で代用）"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def child(mode: str, path: str) -> Dict[str, Any]:
+    """1 プロセスで 1 方式だけ読み込む（ピーク RSS は読み込み直前の RSS からの増分）"""
+    from app.routers import rag
+    from app.services.json_stream import JsonContainerStream
+    from app.services.storage_service import StorageService
+
+    gc.collect()
+    baseline = current_rss_mb()
+    started = time.perf_counter()
+    if mode == "storage:json.load":
+        with open(path, "r", encoding="utf-8") as f:
+            result: Any = json.load(f)
+    elif mode == "storage:stream":
+        with open(path, "r", encoding="utf-8") as f:
+            result = list(JsonContainerStream(f).values())
+    elif mode == "mvp_index:json.load":
+        # 逐次読み込み導入前の _mvp_load_card_index
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        result = {}
+        for item in data:
+            title = item.get("title") or item.get("name")
+            if title and title not in result:
+                result[title] = {k: v for k, v in item.items() if k in rag.MVP_CARD_INDEX_FIELDS}
+        del data
+    else:
+        StorageService.get_file_path = lambda self, key: path if key == "data" else None  # type: ignore[method-assign]
+        result = rag._mvp_build_card_index()
+    seconds = time.perf_counter() - started
+    return {"mode": mode, "seconds": seconds, "peak_mb": peak_rss_mb() - baseline, "count": len(result)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark json.load vs streaming card loading (time / peak RSS)")
+    parser.add_argument("--base-cards", type=int, default=2_000, help="現行カタログの件数")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return 0
+
+    n = args.base_cards * args.scale
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        write_catalogue(path, n, args.seed)
+        print(f"cards={n} file={os.path.getsize(path) / 1024 / 1024:.1f}MB")
+        print(f"{'mode':<22} {'load s':>8} {'peak RSS +MB':>13} {'items':>8}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            print(f"{mode:<22} {result['seconds']:>8.2f} {result['peak_mb']:>13.1f} {result['count']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+ローカルベクトルインデックス（VECTOR_BACKEND=local）の検索レイテンシ計測
+
+合成埋め込み（カード数 × namespace 数）で LocalVectorIndex を構築し、
+1クエリあたりの top-k 検索時間を測定します（Upstash への WAN 往復は通常 数十〜数百ms）。
+
+使い方:
+  python scripts/testing/benchmark_local_vector_index.py --cards 3000 --namespaces 4 --dim 1536
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from app.services.local_vector_index import LocalVectorIndex  # type: ignore  # noqa: E402
+
+
+def build_index(cards: int, namespaces: int, dim: int, seed: int) -> LocalVectorIndex:
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size=(cards * namespaces, dim)).astype(np.float32)
+    ns_names = [f"effect_{i + 1}" for i in range(namespaces)]
+    ids, titles, nss = [], [], []
+    for ns in ns_names:
+        for c in range(cards):
+            ids.append(f"card{c}:{ns}")
+            titles.append(f"カード{c}")
+            nss.append(ns)
+    return LocalVectorIndex(ids, titles, nss, matrix)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LocalVectorIndex top-k search")
+    parser.add_argument("--cards", type=int, default=3000)
+    parser.add_argument("--namespaces", type=int, default=4)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--query-dim", type=int, default=128, help="EmbeddingService は先頭128次元に切り詰める")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build_index(args.cards, args.namespaces, args.dim, args.seed)
+    print(f"rows={len(index)} dim={index.dimension} build={time.perf_counter() - started:.3f}s")
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = rng.normal(size=(args.queries, args.query_dim)).astype(np.float32)
+    index.query(queries[0], args.top_k, namespace="effect_1")  # ノルムの遅延計算を除外
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search_titles(q, args.top_k, namespace="effect_1")
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"top_k={args.top_k} query_dim={args.query_dim} mean={statistics.mean(samples):.3f}ms "
+          f"p50={statistics.median(samples):.3f}ms p95={p95:.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+search_cards_with_pagination: 連続したページ取得のコスト
+
+合成カタログの検索結果を先頭から --pages ページ分（page_size 件ずつ）順に取得し、1 ページあたりの時間を比較します。
+- scan: 索引なし（ページ毎に data_cache を走査・ソート）
+- resort: 索引あり・ページ毎に部分一致の行を求めて安定ソート（整列ビュー・結果行キャッシュ導入前の索引経路）
+- offset: page 番号指定（整列ビューを絞り込んだ結果行をクエリ毎にキャッシュし、2 ページ目以降は切り出しのみ）
+- cursor: next_cursor を渡して続きを取得（offset と同じ結果になることを確認）
+
+使い方:
+  python scripts/testing/benchmark_pagination.py --cards 20000 --pages 50 --page-size 20
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import argparse
+from typing import Any, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from benchmark_card_index import make_service, synthetic_cards  # noqa: E402
+from app.services.card_index import np  # noqa: E402
+
+CASES = [("", "cost", "desc"), ("ダメージ", "name", "asc"), ("ド", "hp", "asc")]
+
+
+def resort_page(service: Any, query: str, page: int, page_size: int, sort_by: str, sort_order: str) -> List[Dict[str, Any]]:
+    """整列ビュー導入前の索引経路（ページ毎に結果行を求め直してソート）"""
+    index = service._get_card_index()
+    rows = index.text_rows(query.lower()) if query else np.arange(index.size, dtype=np.int64)
+    rows = index.sort_rows(rows, sort_by, descending=(sort_order == "desc"))
+    start = (page - 1) * page_size
+    return index.take(rows[start:start + page_size])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming through consecutive result pages")
+    parser.add_argument("--cards", type=int, default=20_000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards, args.seed)
+    legacy = make_service(cards, indexed=False)
+    indexed = make_service(cards, indexed=True)
+    indexed._get_card_index(rebuild=True)
+
+    print(f"cards={len(cards)} pages={args.pages} page_size={args.page_size}")
+    print(f"{'query / sort':<22} {'scan':>10} {'resort':>10} {'offset':>10} {'cursor':>10}  (ms/page)")
+    for query, sort_by, sort_order in CASES:
+        kwargs = dict(query=query, page_size=args.page_size, sort_by=sort_by, sort_order=sort_order)
+        timings: Dict[str, float] = {}
+
+        started = time.perf_counter()
+        expected = [legacy.search_cards_with_pagination(page=page, **kwargs)["cards"] for page in range(1, args.pages + 1)]
+        timings["scan"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for page in range(1, args.pages + 1):
+            resort_page(indexed, query, page, args.page_size, sort_by, sort_order)
+        timings["resort"] = time.perf_counter() - started
+
+        indexed._get_card_index(rebuild=True)
+        started = time.perf_counter()
+        offset_pages = [indexed.search_cards_with_pagination(page=page, **kwargs)["cards"] for page in range(1, args.pages + 1)]
+        timings["offset"] = time.perf_counter() - started
+
+        indexed._get_card_index(rebuild=True)
+        started = time.perf_counter()
+        result = indexed.search_cards_with_pagination(**kwargs)
+        cursor_pages = [result["cards"]]
+        while result["pagination"]["next_cursor"] and len(cursor_pages) < args.pages:
+            result = indexed.search_cards_with_pagination(cursor=result["pagination"]["next_cursor"])
+            cursor_pages.append(result["cards"])
+        timings["cursor"] = time.perf_counter() - started
+
+        expected = [cards_on_page for cards_on_page in expected if cards_on_page]
+        assert offset_pages[:len(expected)] == expected and cursor_pages == expected
+        label = f"{query or '(all)'} / {sort_by} {sort_order}"
+        per_page = {name: seconds / args.pages * 1000 for name, seconds in timings.items()}
+        print(f"{label:<22} {per_page['scan']:>10.3f} {per_page['resort']:>10.3f} {per_page['offset']:>10.3f} {per_page['cursor']:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
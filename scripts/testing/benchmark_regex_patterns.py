@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+DatabaseService の正規表現を使う判定・スコア計算のカード 1 件あたりのコスト
+
+索引（CardIndex）を無効にし、カード毎に正規表現を評価する経路を測ります。
+- fallback: _match_filterable_fallback（コスト・HP・攻撃力・範囲指定のキーワード）
+- hp / damage score: _calculate_hp_score / _calculate_damage_score
+- normalize title: _normalize_title（カード名 1 件）
+- mock analysis / split query: _get_mock_query_analysis / _split_query_to_keywords（クエリ 1 件）
+
+--profile を付けると、全ケースを cProfile で実行し累積時間の上位関数を表示します。
+
+使い方:
+  python scripts/testing/benchmark_regex_patterns.py --cards 20000 --repeat 3
+  python scripts/testing/benchmark_regex_patterns.py --cards 5000 --profile
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import statistics
+from typing import Any, Callable, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from benchmark_card_index import make_service, synthetic_cards  # noqa: E402
+
+FALLBACK_KEYWORDS = ["コスト3", "5コスト", "HP5以上", "攻撃3以下", "HP2から6の間", "エルフ"]
+SCORE_KEYWORDS = [["HP", "5以上"], ["ダメージ", "3以上"]]
+QUERIES = [
+    "5コストのレジェンドカード",
+    "HP50から100の間のエルフ",
+    "攻撃力3または5のドラゴン",
+    "約コスト4の守護フォロワー",
+]
+
+
+def per_call(fn: Callable[[], Any], calls: int, repeat: int) -> float:
+    """1 呼び出しあたりのマイクロ秒（repeat 回の中央値）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) / calls * 1e6
+
+
+def cases(service: Any, cards: List[dict]) -> List[Tuple[str, Callable[[], Any], int]]:
+    result: List[Tuple[str, Callable[[], Any], int]] = []
+    for keyword in FALLBACK_KEYWORDS:
+        result.append((f"fallback {keyword}", lambda kw=keyword: [service._match_filterable_fallback(item, kw) for item in cards], len(cards)))
+    hp_keywords, damage_keywords = SCORE_KEYWORDS
+    result.append(("hp score", lambda: [service._calculate_hp_score(item, hp_keywords) for item in cards], len(cards)))
+    result.append(("damage score", lambda: [service._calculate_damage_score(item, damage_keywords, False) for item in cards], len(cards)))
+    names = [f" {item['name']}（{item['class']}）・　" for item in cards]
+    result.append(("normalize title", lambda: [service._normalize_title(name) for name in names], len(names)))
+    result.append(("mock analysis", lambda: [service._get_mock_query_analysis(query) for query in QUERIES * 250], len(QUERIES) * 250))
+    result.append(("split query", lambda: [service._split_query_to_keywords(query) for query in QUERIES * 250], len(QUERIES) * 250))
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-item cost of regex-based matching and scoring in DatabaseService")
+    parser.add_argument("--cards", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", action="store_true", help="cProfile で全ケースを実行し上位 20 関数を表示")
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards, args.seed)
+    service = make_service(cards, indexed=False)
+    benchmark_cases = cases(service, cards)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _, fn, _ in benchmark_cases:
+            fn()
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        return 0
+
+    print(f"cards={len(cards)}")
+    print(f"{'case':<24} {'us/call':>10}")
+    for label, fn, calls in benchmark_cases:
+        print(f"{label:<24} {per_call(fn, calls, args.repeat):>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
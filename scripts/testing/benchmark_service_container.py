@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+/chat サービス構築コストのベンチマーク
+
+リクエスト毎に EmbeddingService / VectorService / LLMService を構築する旧方式と、
+ServiceContainer でワーカー共有する方式を比較します。
+実クライアント（OpenAI / Upstash Index）を構築させるためダミーの認証情報を使用しますが、
+構築時にネットワークアクセスは発生しません。
+
+使い方:
+  python scripts/testing/benchmark_service_container.py --iterations 200
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+# 実クライアントを構築させる（モック判定を外す）ためのダミー設定
+os.environ["BACKEND_TESTING"] = "false"
+os.environ["BACKEND_MOCK_EXTERNAL_SERVICES"] = "false"
+os.environ.setdefault("BACKEND_OPENAI_API_KEY", "sk-benchmark-dummy")
+os.environ.setdefault("UPSTASH_VECTOR_REST_URL", "https://benchmark.invalid")
+os.environ.setdefault("UPSTASH_VECTOR_REST_TOKEN", "benchmark-dummy")
+os.environ.setdefault("BACKEND_LOG_LEVEL", "WARNING")
+
+import logging  # noqa: E402
+logging.disable(logging.INFO)
+
+from app.services.embedding_service import EmbeddingService  # type: ignore  # noqa: E402
+from app.services.vector_service import VectorService  # type: ignore  # noqa: E402
+from app.services.llm_service import LLMService  # type: ignore  # noqa: E402
+from app.services.service_container import get_default_container, reset_default_container  # type: ignore  # noqa: E402
+
+
+def _summarize(label: str, samples: list[float]) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1] if len(ms) >= 20 else ms[-1]
+    print(f"{label:<28} mean={statistics.mean(ms):8.3f}ms  p50={statistics.median(ms):8.3f}ms  p95={p95:8.3f}ms")
+
+
+def bench_per_request(iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        EmbeddingService()
+        VectorService()
+        LLMService()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_container(iterations: int) -> list[float]:
+    reset_default_container()
+    get_default_container()  # lifespan での構築に相当（計測対象外）
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        container = get_default_container()
+        _ = (container.embedding_service, container.vector_service, container.llm_service)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-request service construction vs shared container")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    # 初回 import コストを除外するため1度だけ構築
+    EmbeddingService(); VectorService(); LLMService()
+
+    per_request = bench_per_request(args.iterations)
+    shared = bench_container(args.iterations)
+    print(f"iterations={args.iterations}")
+    _summarize("per-request construction", per_request)
+    _summarize("shared ServiceContainer", shared)
+    saved = statistics.mean(per_request) - statistics.mean(shared)
+    print(f"saved per request: {saved * 1000:.3f}ms (HTTP keep-alive の再利用効果は含まない)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+get_statistics: 呼び出し毎の集計と、読み込み時に集計して差分更新する方式の比較
+
+- build (per card): カード毎の加算で集計（numpy なしの経路。従来は get_statistics の度にこれを行っていた）
+- build (bincount): CardIndex の列から np.bincount / np.unique で集計（reload_data で 1 度だけ）
+- get_statistics: 集計済みの値を返す
+- update_card: カード 1 件の更新（カードリスト・統計の写しへの差分更新と、新しいスナップショットの索引構築）
+
+使い方:
+  python scripts/testing/benchmark_statistics.py --cards 100000
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from typing import Any, Callable
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+os.environ.setdefault("TEST_MODE", "true")
+os.environ.setdefault("BACKEND_MOCK_EXTERNAL_SERVICES", "true")
+
+from benchmark_card_index import make_service, synthetic_cards  # noqa: E402
+from app.services.card_statistics import CardStatistics  # noqa: E402
+
+
+def per_call_ms(fn: Callable[[], Any], calls: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) / calls * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark statistics built at load time vs per call")
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards, args.seed)
+    service = make_service(cards, indexed=True)
+    index = service._get_card_index(rebuild=True)
+    assert CardStatistics.build(cards).snapshot() == CardStatistics.build(cards, index).snapshot()
+    service.get_statistics()
+
+    rng = random.Random(args.seed)
+    ids = [item["id"] for item in rng.sample(cards, 1000)]
+    cursor = iter(ids * args.repeat)
+
+    print(f"cards={len(cards)}")
+    print(f"{'case':<22} {'ms/call':>12}")
+    print(f"{'build (per card)':<22} {per_call_ms(lambda: CardStatistics.build(cards), 1, args.repeat):>12.3f}")
+    print(f"{'build (bincount)':<22} {per_call_ms(lambda: CardStatistics.build(cards, index), 1, args.repeat):>12.3f}")
+    print(f"{'get_statistics':<22} {per_call_ms(service.get_statistics, 1000, args.repeat):>12.4f}")
+    update = lambda: service.update_card(next(cursor), {"hp": rng.randint(1, 20)})  # noqa: E731
+    print(f"{'update_card':<22} {per_call_ms(update, 5, args.repeat):>12.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
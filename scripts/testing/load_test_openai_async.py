@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+/chat 同時実行の負荷試験（ローカル偽 OpenAI サーバー使用）
+
+偽 OpenAI サーバーを固定遅延付きで起動し、1プロセス（= gunicorn 1ワーカー相当）の
+FastAPI アプリへ /chat を同時に投げて、OpenAI 呼び出しが重なって処理されることを確認します。
+イベントループがブロックされる実装では所要時間が「リクエスト数 × 遅延 × 2（embedding + LLM）」に近づきます。
+
+使い方:
+  python scripts/testing/load_test_openai_async.py --requests 32 --delay 0.2
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+import logging  # noqa: E402
+logging.disable(logging.INFO)
+
+from app.tests.mocks.fake_openai_server import FakeOpenAIServer  # type: ignore  # noqa: E402
+
+
+async def run_load(requests: int) -> float:
+    import httpx
+    from app.main import app  # type: ignore
+    from app.services.service_container import reset_default_container  # type: ignore
+
+    reset_default_container()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/chat", json={"message": f"負荷試験の質問 {i}", "with_context": False})
+            for i in range(requests)
+        ))
+        elapsed = time.perf_counter() - started
+    failures = [r for r in responses if r.status_code != 200]
+    if failures:
+        print(f"failed responses: {len(failures)}")
+    container = reset_default_container()
+    if container is not None:
+        await container.close()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent /chat load test against a local fake OpenAI server")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--delay", type=float, default=0.2, help="偽サーバーの応答遅延（秒）")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(delay=args.delay) as server:
+        os.environ.update({
+            "BACKEND_TESTING": "false",
+            "BACKEND_MOCK_EXTERNAL_SERVICES": "false",
+            "BACKEND_OPENAI_API_KEY": "sk-local-fake",
+            "BACKEND_OPENAI_BASE_URL": server.base_url,
+            "OPENAI_MAX_RETRIES": "0",
+            # 前回実行の埋め込みがディスクキャッシュから返らないようメモリ層のみ
+            "EMBEDDING_CACHE_PATH": "",
+        })
+        os.environ.pop("UPSTASH_VECTOR_REST_URL", None)
+        elapsed = asyncio.run(run_load(args.requests))
+
+        serial = args.requests * 2 * args.delay
+        print(f"requests={args.requests} delay={args.delay}s upstream_calls={server.request_count}")
+        print(f"elapsed={elapsed:.2f}s (blocking implementation would need ~{serial:.2f}s)")
+        print(f"max concurrent upstream requests={server.max_in_flight}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())